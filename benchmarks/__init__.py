@@ -0,0 +1 @@
+"""Бенчмарки та інструменти навантажувального тестування бота."""
@@ -0,0 +1,207 @@
+"""Перевірка ідемпотентності: потік оновлень із дублікатами дає той самий результат, що й чистий.
+
+Кілька користувачів паралельно проходять повний діалог. Чистий потік подається у справжній
+``Dispatcher`` з ``bot.handlers.router``, відповіді записує заглушка Bot API. Потім той самий потік
+подається з дублікатами трьох видів: ``retry`` — повтор webhook-запиту, що обробляється одночасно з
+оригіналом; ``redeliver`` — те саме оновлення після перезапуску polling, кількома оновленнями пізніше;
+``new_id`` — те саме повідомлення під новим ``update_id``. Перед кожною повторною доставкою процес
+«перезапускається»: middleware створюється заново з порожніми ``RecentKeys``, а FSM-сховище (як SQLite)
+лишається, тож дублікат ловлять лише збережені ``Watermarks``. Для кожного чату порівнюються надіслані
+ботом тексти та кінцевий стан і дані FSM — з ``DeduplicationMiddleware`` і без неї.
+
+Запуск: ``python -m benchmarks.dedup_replay --users 50 --duplicates 0.3``; код виходу 1, якщо потік
+з дублікатами і захистом розійшовся з чистим.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import itertools
+import json
+import random
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from benchmarks.fake_telegram import FakeTelegramServer, make_message_update
+from benchmarks.hot_path import STEP_INPUTS
+from bot import metrics
+from bot.dedup import MESSAGE_KEY, UPDATE_KEY, DeduplicationMiddleware, RecentKeys, Watermarks
+from bot.dialogue import constants
+from bot.handlers import router
+
+
+RETRY = 'retry'
+REDELIVER = 'redeliver'
+NEW_ID = 'new_id'
+DUPLICATE_KINDS = (RETRY, REDELIVER, NEW_ID)
+
+# Оновлення, що подаються одночасно (як фонові задачі webhook); ``None`` у потоці — перезапуск процесу.
+Batch = List[Dict[str, Any]]
+RESTART = None
+Outcome = Dict[int, Tuple[List[str], Optional[str], Dict[str, Any]]]
+
+
+def clean_stream(users: int, chat_base: int, update_base: int) -> List[Dict[str, Any]]:
+    texts = ['/start', *(STEP_INPUTS[step] for step in constants.STEP_ORDER)]
+    update_ids = itertools.count(update_base)
+    return [
+        make_message_update(next(update_ids), chat_base + user, text, message_id=turn + 1)
+        for turn, text in enumerate(texts)
+        for user in range(users)
+    ]
+
+
+def duplicated_stream(
+    updates: List[Dict[str, Any]], probability: float, max_lag: int, rng: random.Random,
+) -> Tuple[List[Optional[Batch]], Dict[str, int]]:
+    """Розкладає потік на пачки й домішує дублікати; повертає пачки і скільки дублікатів якого виду."""
+    new_ids = itertools.count(max(update['update_id'] for update in updates) + 1)
+    delayed: Dict[int, List[Tuple[str, Dict[str, Any]]]] = {}
+    counts = dict.fromkeys(DUPLICATE_KINDS, 0)
+    batches: List[Optional[Batch]] = []
+    for position, update in enumerate(updates):
+        batch = [update]
+        if rng.random() < probability:
+            kind = rng.choice(DUPLICATE_KINDS)
+            counts[kind] += 1
+            duplicate = copy.deepcopy(update)
+            if kind == RETRY:
+                batch.append(duplicate)
+            else:
+                if kind == NEW_ID:
+                    duplicate['update_id'] = next(new_ids)
+                delayed.setdefault(position + rng.randint(1, max_lag), []).append((kind, duplicate))
+        batches.append(batch)
+        _append_late(batches, delayed.pop(position, []))
+    for position in sorted(delayed):
+        _append_late(batches, delayed[position])
+    return batches, counts
+
+
+def _append_late(batches: List[Optional[Batch]], late: List[Tuple[str, Dict[str, Any]]]) -> None:
+    for kind, update in late:
+        if kind == REDELIVER:
+            batches.append(RESTART)
+        batches.append([update])
+
+
+async def _replay(
+    dp: Dispatcher, bot: Bot, batches: List[Optional[Batch]], restart: Optional[Callable[[], None]] = None,
+) -> None:
+    for batch in batches:
+        if batch is RESTART:
+            if restart is not None:
+                restart()
+            continue
+        await asyncio.gather(*(dp.feed_raw_update(bot, update) for update in batch))
+
+
+class _Process:
+    """Middleware дедуплікації «процесу»: ``restart`` замінює її новою, як після перезапуску polling."""
+
+    def __init__(self, dp: Dispatcher, storage: MemoryStorage) -> None:
+        self.dp = dp
+        self.storage = storage
+        self.restarts = 0
+        self.middleware = self._build()
+        dp.update.outer_middleware(self.middleware)
+
+    def _build(self) -> DeduplicationMiddleware:
+        return DeduplicationMiddleware(
+            RecentKeys(100_000, 600.0), RecentKeys(100_000, 600.0), watermarks=Watermarks(self.storage),
+        )
+
+    def restart(self) -> None:
+        self.dp.update.outer_middleware.unregister(self.middleware)
+        self.middleware = self._build()
+        self.dp.update.outer_middleware(self.middleware)
+        self.restarts += 1
+
+    def stop(self) -> None:
+        self.dp.update.outer_middleware.unregister(self.middleware)
+
+
+async def _outcome(server: FakeTelegramServer, storage: MemoryStorage, bot: Bot, chats: List[int], chat_base: int) -> Outcome:
+    sent: Dict[int, List[str]] = {chat: [] for chat in chats}
+    for message in server.sent:
+        if message.chat_id in sent:
+            # Ім'я в привітанні містить номер чату, а він у кожного прогону свій.
+            sent[message.chat_id].append(message.text.replace(f'user{message.chat_id}', 'user'))
+    result: Outcome = {}
+    for chat in chats:
+        key = StorageKey(bot_id=bot.id, chat_id=chat, user_id=chat)
+        result[chat - chat_base] = (sent[chat], await storage.get_state(key), await storage.get_data(key))
+    return result
+
+
+def _mismatches(expected: Outcome, actual: Outcome) -> Dict[str, int]:
+    return {
+        'chats_with_other_replies': sum(expected[user][0] != actual[user][0] for user in expected),
+        'chats_with_other_fsm': sum(expected[user][1:] != actual[user][1:] for user in expected),
+        'extra_replies': sum(len(actual[user][0]) - len(expected[user][0]) for user in expected),
+    }
+
+
+async def run(users: int, probability: float, max_lag: int, seed: int) -> Dict[str, Any]:
+    server = FakeTelegramServer()
+    await server.start()
+    bot = server.build_bot()
+    storage = MemoryStorage()
+    dp = Dispatcher(storage=storage)
+    dp.include_router(router)
+    rng = random.Random(seed)
+    report: Dict[str, Any] = {'users': users, 'duplicate_probability': probability}
+    try:
+        # Кожен прогін — на своєму діапазоні чатів, тож стани FSM не перетинаються.
+        base = 1_000_000
+        chats = [base + user for user in range(users)]
+        await _replay(dp, bot, [[update] for update in clean_stream(users, base, base)])
+        expected = await _outcome(server, storage, bot, chats, base)
+
+        for index, protected in enumerate((True, False), start=2):
+            base = index * 1_000_000
+            chats = [base + user for user in range(users)]
+            batches, counts = duplicated_stream(clean_stream(users, base, base), probability, max_lag, rng)
+            process = _Process(dp, storage) if protected else None
+            dropped_before = {key: metrics.DUPLICATE_UPDATES.value(key) for key in (UPDATE_KEY, MESSAGE_KEY)}
+            try:
+                await _replay(dp, bot, batches, process.restart if process is not None else None)
+            finally:
+                if process is not None:
+                    process.stop()
+            actual = await _outcome(server, storage, bot, chats, base)
+            report['with_dedup' if protected else 'without_dedup'] = {
+                'updates': sum(len(batch) for batch in batches if batch is not RESTART),
+                'restarts': process.restarts if process is not None else 0,
+                'duplicates': counts,
+                'dropped': {key: int(metrics.DUPLICATE_UPDATES.value(key) - before) for key, before in dropped_before.items()},
+                **_mismatches(expected, actual),
+            }
+    finally:
+        await bot.session.close()
+        await server.stop()
+    protected_report = report['with_dedup']
+    report['identical'] = not (protected_report['chats_with_other_replies'] or protected_report['chats_with_other_fsm'])
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--duplicates', type=float, default=0.3, help='Частка оновлень, що приходять удруге')
+    parser.add_argument('--max-lag', type=int, default=20, help='Наскільки пізніше може прийти повторна доставка')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    report = asyncio.run(run(args.users, args.duplicates, args.max_lag, args.seed))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not report['identical']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
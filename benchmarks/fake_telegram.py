@@ -0,0 +1,192 @@
+"""Локальна заглушка Telegram Bot API для бенчмарків і навантажувальних тестів."""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import ClientSession, web
+
+
+@dataclass
+class SentMessage:
+    chat_id: int
+    text: str
+    received_at: float
+
+
+def make_message_update(update_id: int, chat_id: int, text: str, message_id: Optional[int] = None) -> Dict[str, Any]:
+    user = {'id': chat_id, 'is_bot': False, 'first_name': f'user{chat_id}'}
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': message_id if message_id is not None else update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private', 'first_name': user['first_name']},
+            'from': user,
+            'text': text,
+        },
+    }
+
+
+def make_callback_update(update_id: int, chat_id: int, data: str, message_id: int) -> Dict[str, Any]:
+    """Натискання inline-кнопки під повідомленням бота ``message_id``."""
+    user = {'id': chat_id, 'is_bot': False, 'first_name': f'user{chat_id}'}
+    return {
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'from': user,
+            'chat_instance': str(chat_id),
+            'data': data,
+            'message': {
+                'message_id': message_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private', 'first_name': user['first_name']},
+                'text': '',
+            },
+        },
+    }
+
+
+class FakeTelegramServer:
+    """Імітує методи Bot API, які використовує бот, і записує надіслані повідомлення.
+
+    ``network_delay`` додається до кожного напрямку запиту, тож виклик API коштує два такі інтервали.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, record: bool = True, network_delay: float = 0.0) -> None:
+        self.host = host
+        self.port = port
+        self.record = record
+        self.network_delay = network_delay
+        self.sent: List[SentMessage] = []
+        self.calls: Dict[str, int] = {}
+        self._updates: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        self._waiters: Dict[int, List[asyncio.Future[SentMessage]]] = {}
+        self._message_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self._in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_route('POST', '/bot{token}/{method}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host=self.host, port=self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def drain(self) -> None:
+        """Чекає, доки бот отримає відповіді на всі виклики, крім getUpdates."""
+        while self._in_flight:
+            await asyncio.sleep(0.005)
+
+    def push_update(self, update: Dict[str, Any]) -> None:
+        self._updates.put_nowait(update)
+
+    async def deliver_webhook(self, session: ClientSession, url: str, update: Dict[str, Any], secret: Optional[str] = None) -> None:
+        """Надсилає оновлення на webhook бота так, як це робить Telegram."""
+        if self.network_delay:
+            await asyncio.sleep(self.network_delay)
+        headers = {'X-Telegram-Bot-Api-Secret-Token': secret} if secret else None
+        async with session.post(url, json=update, headers=headers) as response:
+            response.raise_for_status()
+
+    def build_bot(self, token: str = '42:fake-token') -> Bot:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(self.base_url))
+        return Bot(token=token, session=session)
+
+    def wait_for_message(self, chat_id: int) -> asyncio.Future[SentMessage]:
+        future: asyncio.Future[SentMessage] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(chat_id, []).append(future)
+        return future
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method'].lower()
+        self.calls[method] = self.calls.get(method, 0) + 1
+        tracked = method != 'getupdates'
+        if tracked:
+            self._in_flight += 1
+        try:
+            params = await self._read_params(request)
+            if self.network_delay:
+                await asyncio.sleep(self.network_delay)
+            result = await self._dispatch(method, params)
+            if self.network_delay:
+                await asyncio.sleep(self.network_delay)
+            return self._ok(result)
+        finally:
+            if tracked:
+                self._in_flight -= 1
+
+    async def _dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == 'getme':
+            return {'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot'}
+        if method == 'getupdates':
+            return await self._next_updates(params)
+        if method in {'sendmessage', 'editmessagetext'}:
+            return self._register_message(params)
+        return True
+
+    @staticmethod
+    async def _read_params(request: web.Request) -> Dict[str, Any]:
+        if request.content_type == 'application/json':
+            return await request.json()
+        form = await request.post()
+        return {key: value for key, value in form.items()}
+
+    async def _next_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        timeout = float(params.get('timeout') or 0)
+        try:
+            first = await asyncio.wait_for(self._updates.get(), timeout=timeout or 0.01)
+        except asyncio.TimeoutError:
+            return []
+        batch = [first]
+        limit = int(params.get('limit') or 100)
+        while len(batch) < limit and not self._updates.empty():
+            batch.append(self._updates.get_nowait())
+        return batch
+
+    def _register_message(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chat_id = int(params.get('chat_id') or 0)
+        text = str(params.get('text') or '')
+        sent = SentMessage(chat_id=chat_id, text=text, received_at=time.perf_counter())
+        if self.record:
+            self.sent.append(sent)
+        waiters = self._waiters.get(chat_id)
+        if waiters:
+            future = waiters.pop(0)
+            if not future.done():
+                future.set_result(sent)
+            if not waiters:
+                del self._waiters[chat_id]
+        message_id = int(params.get('message_id') or next(self._message_ids))
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': text,
+        }
+
+    @staticmethod
+    def _ok(result: Any) -> web.Response:
+        return web.json_response({'ok': True, 'result': result})
+
+
+__all__ = ['FakeTelegramServer', 'SentMessage', 'make_callback_update', 'make_message_update']
@@ -0,0 +1,77 @@
+"""Легкі замінники об'єктів aiogram для вимірювання обробників без мережі."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from aiogram.fsm.state import State
+
+
+class FakeFSMContext:
+    """Повторює інтерфейс ``FSMContext``, зберігаючи стан у словнику."""
+
+    def __init__(self, state: Optional[str] = None, data: Optional[Dict[str, Any]] = None) -> None:
+        self.state = state
+        self.data: Dict[str, Any] = dict(data or {})
+
+    async def set_state(self, state: Any = None) -> None:
+        self.state = state.state if isinstance(state, State) else state
+
+    async def get_state(self) -> Optional[str]:
+        return self.state
+
+    async def set_data(self, data: Dict[str, Any]) -> None:
+        self.data = data.copy()
+
+    async def get_data(self) -> Dict[str, Any]:
+        return self.data.copy()
+
+    async def update_data(self, data: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        if data:
+            kwargs.update(data)
+        self.data.update(kwargs)
+        return self.data.copy()
+
+    async def clear(self) -> None:
+        self.state = None
+        self.data = {}
+
+
+class FakeUser:
+    def __init__(self, user_id: int, first_name: str = 'Тест') -> None:
+        self.id = user_id
+        self.first_name = first_name
+
+
+class FakeChat:
+    def __init__(self, chat_id: int) -> None:
+        self.id = chat_id
+
+
+class FakeMessage:
+    """Мінімальний ``Message``: текст, відправник і запис відповідей без мережевих викликів."""
+
+    def __init__(self, text: str, user_id: int = 1, message_id: int = 1) -> None:
+        self.text = text
+        self.message_id = message_id
+        self.from_user = FakeUser(user_id)
+        self.chat = FakeChat(user_id)
+        self.answers: List[str] = []
+
+    async def answer(self, text: str, **kwargs: Any) -> None:
+        self.answers.append(text)
+
+
+class FakeInlineQuery:
+    """Мінімальний ``InlineQuery``: текст запиту й запис відповідей без мережевих викликів."""
+
+    def __init__(self, query: str, user_id: int = 1, query_id: str = '1') -> None:
+        self.id = query_id
+        self.query = query
+        self.from_user = FakeUser(user_id)
+        self.answers: List[List[Any]] = []
+
+    async def answer(self, results: List[Any], **kwargs: Any) -> None:
+        self.answers.append(results)
+
+
+__all__ = ['FakeFSMContext', 'FakeInlineQuery', 'FakeMessage', 'FakeUser', 'FakeChat']
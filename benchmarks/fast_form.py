@@ -0,0 +1,96 @@
+"""Порівнює вартість одного рахунку: покроковий діалог проти швидкої форми в одному повідомленні.
+
+Рахуються вхідні оновлення, записи у FSM, вихідні повідомлення та час обробників на рахунок.
+
+Запуск: ``python -m benchmarks.fast_form --bills 500``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional
+
+from benchmarks.fakes import FakeFSMContext, FakeMessage
+from benchmarks.hot_path import STEP_INPUTS
+from bot.dialogue import constants
+from bot.handlers.messages import handle_fast_form, handle_plain_text
+from bot.handlers.start import start
+
+
+FORM_TEXT = '\n'.join(f'{constants.FORM_LABELS[step]}: {STEP_INPUTS[step]}' for step in constants.STEP_ORDER)
+
+
+class CountingFSMContext(FakeFSMContext):
+    """``FakeFSMContext``, що рахує записи стану й даних."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+
+    async def set_state(self, state: Any = None) -> None:
+        self.writes += 1
+        await super().set_state(state)
+
+    async def set_data(self, data: Dict[str, Any]) -> None:
+        self.writes += 1
+        await super().set_data(data)
+
+    async def update_data(self, data: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        self.writes += 1
+        return await super().update_data(data, **kwargs)
+
+    async def clear(self) -> None:
+        self.writes += 1
+        await super().clear()
+
+
+async def _stepwise_bill() -> Dict[str, int]:
+    state = CountingFSMContext()
+    message = FakeMessage('/start')
+    await start(message, state, raw_state=None)  # type: ignore[arg-type]
+    updates, sent = 1, len(message.answers)
+    for step in constants.STEP_ORDER:
+        message = FakeMessage(STEP_INPUTS[step])
+        await handle_plain_text(message, state)  # type: ignore[arg-type]
+        updates += 1
+        sent += len(message.answers)
+    return {'updates': updates, 'fsm_writes': state.writes, 'send_message': sent}
+
+
+async def _fast_form_bill() -> Dict[str, int]:
+    state = CountingFSMContext()
+    message = FakeMessage(FORM_TEXT)
+    await handle_fast_form(message, state, raw_state=None)  # type: ignore[arg-type]
+    return {'updates': 1, 'fsm_writes': state.writes, 'send_message': len(message.answers)}
+
+
+async def _measure(bill: Any, bills: int) -> Dict[str, Any]:
+    counts = await bill()
+    started = time.perf_counter()
+    for _ in range(bills):
+        await bill()
+    elapsed = time.perf_counter() - started
+    return {**counts, 'us_per_bill': round(elapsed / bills * 1e6, 1)}
+
+
+async def run(bills: int) -> Dict[str, Any]:
+    stepwise = await _measure(_stepwise_bill, bills)
+    fast = await _measure(_fast_form_bill, bills)
+    return {
+        'stepwise': stepwise,
+        'fast_form': fast,
+        'reduction': {key: round(stepwise[key] / fast[key], 1) for key in stepwise if fast[key]},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bills', type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.bills)), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+"""Цілочисельний ``Fixed`` проти ``Decimal``: диференційна перевірка від розбору до тексту і час.
+
+Еталон — шлях до ``Fixed``: розбір числа в ``Decimal``, рукописний розрахунок ``HandWrittenCalculator`` з
+``benchmarks.services`` і форматування без кешів (``UncachedFormatter``). Кандидат — розбір
+``PaymentFlow``, цілочисельні формули каталогу й форматування ``Fixed``. На випадкових і крайніх рядках
+(коми, пробіли, до шести знаків після коми, ``-0``, експоненти, величезні числа, ``NaN``) порівнюються
+розібрані значення, ``details``, ``summary``, ``brief``, суми ``amounts`` (число, знак нуля й текст),
+підтвердження профілю, inline-відповідь, копійки й тисячні для історії, а також значення після
+двійкового кодека сесії та JSON. Помилки теж мають збігатися: той самий тип винятку.
+Розширений каталог (світло, газ, сміття з округленням до копійок) порівнюється з власним ``Decimal``-шляхом.
+
+Запуск: ``python -m benchmarks.fixed_point --payloads 2000 --repeat 10``; код виходу 1, якщо щось розійшлося.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.services import EXTRA_INPUTS, HandWrittenCalculator, _extended_catalog
+from bot.dialogue import constants
+from bot.dialogue.calculator import CalculationSection, PaymentCalculator
+from bot.dialogue.fixed import Fixed, to_decimal
+from bot.dialogue.flow import DialogueState, PaymentFlow
+from bot.dialogue.inline import INLINE_STEPS, InlineAnswer, InlineRequest, parse_query, render
+from bot.dialogue.profile import confirmation_text
+from bot.storage import serialization, session_codec
+from bot.storage.history import _cents, _milli
+
+
+NUMBER_KEYS = sorted(constants.STEP_PAYLOAD_KEYS[step] for step in constants.NUMERIC_STEPS)
+AMOUNT_FIELDS = ('cold_usage', 'hot_usage', 'cold', 'hot', 'rent', 'heat', 'total')
+HISTORY_FIELDS = ('cold_usage', 'hot_usage', 'total')
+INLINE_ERROR_TITLE = 'Не вдалося порахувати'
+EDGE_INPUTS = (
+    '0', '-0', '+0', '0.000', '-0.0', '.5', '5.', '-.001', '0.0005', '-0.0004', '1,5', '1 234,5', '12,', '1_000',
+    '+7', '1e3', '1E-3', '-2.5e2', '1.2345', '30.38400', '99.5000001', '999999999.999', '1000000000',
+    '-999999999.999', '12345678901234567890.5', '1E+999999', '1e-999999', 'NaN', '-NaN', 'sNaN', 'Infinity',
+    '-inf', 'abc', '1.2.3', '', ' ', ',', '--1', '0x10', '٣',
+)
+
+
+def reference_parse(raw_text: str) -> Optional[Decimal]:
+    """``PaymentFlow._parse_decimal`` до ``Fixed``."""
+    trimmed = raw_text.strip()
+    if not trimmed:
+        return None
+    normalized = trimmed.replace(' ', '').replace(',', '.').rstrip('.').rstrip(',')
+    if not normalized:
+        return None
+    try:
+        return Decimal(normalized)
+    except InvalidOperation:
+        return None
+
+
+def number_text(rng: random.Random) -> str:
+    """Рядок, який користувач міг би надіслати: здебільшого звичайне число, зрідка — крайнє значення."""
+    roll = rng.random()
+    if roll < 0.05:
+        return rng.choice(EDGE_INPUTS)
+    places = rng.randint(0, 6)
+    value = rng.randint(0, 10 ** rng.randint(1, 9)) * rng.choice((1, 1, 1, -1))
+    text = str(Decimal(value).scaleb(-places))
+    if roll < 0.15:
+        text = text.replace('.', ',')
+    elif roll < 0.2:
+        text = f' {text} '
+    elif roll < 0.25 and 'E' not in text:
+        text = text + '0' * rng.randint(1, 3) if '.' in text else text + '.'
+    return text
+
+
+def _outcome(func: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return func(*args)
+    except Exception as exc:  # noqa: BLE001 — порівнюється й тип помилки
+        return f'<{type(exc).__name__}>'
+
+
+def _same_number(got: Any, expected: Any) -> bool:
+    """Однакові значення, включно зі знаком нуля; ``NaN`` дорівнює ``NaN`` того самого виду."""
+    if got is None or expected is None or isinstance(got, str) or isinstance(expected, str):
+        return got == expected
+    got, expected = to_decimal(got), to_decimal(expected)
+    if got.is_nan() or expected.is_nan():
+        return got.is_snan() == expected.is_snan() and got.is_qnan() == expected.is_qnan()
+    return got == expected and got.is_signed() == expected.is_signed()
+
+
+def _number_texts(formatter: Any, value: Any) -> List[Any]:
+    return [
+        _outcome(formatter.decimal_for_summary, value),
+        _outcome(formatter.quantity, value),
+        _outcome(formatter.tariff, value),
+        _outcome(formatter.money, value),
+    ]
+
+
+class _Checker:
+    def __init__(self) -> None:
+        self.reference = HandWrittenCalculator()
+        self.candidate = PaymentCalculator()
+        self.extended = _extended_catalog()
+        self.found: List[Dict[str, Any]] = []
+        self.checked: Dict[str, int] = {}
+
+    def expect(self, kind: str, got: Any, expected: Any, same: bool, **context: Any) -> None:
+        self.checked[kind] = self.checked.get(kind, 0) + 1
+        if not same:
+            self.found.append({'check': kind, 'fixed': repr(got), 'decimal': repr(expected), **context})
+
+    def parse(self, text: str) -> None:
+        expected = reference_parse(text)
+        got, _ = PaymentFlow.parse_value(constants.COLD_PREV_STEP, text)
+        self.expect('parse', got, expected, _same_number(got, expected), text=text)
+        if expected is not None and got is not None:
+            fmt = self.candidate.formatter
+            got_texts = _number_texts(fmt, got)
+            expected_texts = _number_texts(self.reference.formatter, expected)
+            self.expect('format', got_texts, expected_texts, got_texts == expected_texts, text=text)
+
+    def payload(self, texts: Dict[str, str], base: Dict[str, Any]) -> None:
+        expected = {**base, **{key: reference_parse(text) for key, text in texts.items()}}
+        got = {**base, **{key: PaymentFlow.parse_value(key, text)[0] for key, text in texts.items()}}
+        if any(value is None for value in expected.values()) or any(value is None for value in got.values()):
+            # Розбір уже порівняно; діалог не прийняв би такого значення.
+            return
+        context = {'texts': texts}
+        for method in ('details', 'summary', 'brief'):
+            got_text = _outcome(getattr(self.candidate, method), got)
+            expected_text = _outcome(getattr(self.reference, method), expected)
+            self.expect(method, got_text, expected_text, got_text == expected_text, **context)
+        self._amounts(got, expected, context)
+        got_text = _outcome(confirmation_text, got)
+        expected_text = _outcome(confirmation_text, expected, self.reference.formatter)
+        self.expect('profile', got_text, expected_text, got_text == expected_text, **context)
+        self._storage(got, expected, context)
+        self._extended(got, expected, context)
+
+    def _amounts(self, got: Dict[str, Any], expected: Dict[str, Any], context: Dict[str, Any]) -> None:
+        got_amounts = _outcome(self.candidate.amounts, got)
+        expected_amounts = _outcome(self.reference.amounts, expected)
+        if isinstance(got_amounts, str) or isinstance(expected_amounts, str):
+            self.expect('amounts', got_amounts, expected_amounts, got_amounts == expected_amounts, **context)
+            return
+        for field in AMOUNT_FIELDS:
+            got_value, expected_value = getattr(got_amounts, field), getattr(expected_amounts, field)
+            same = _same_number(got_value, expected_value) and (
+                _number_texts(self.candidate.formatter, got_value)
+                == _number_texts(self.reference.formatter, expected_value)
+            )
+            self.expect('amounts', got_value, expected_value, same, field=field, **context)
+        got_row = [_outcome(_series_value, got_amounts, field) for field in HISTORY_FIELDS]
+        expected_row = [_outcome(_series_value, expected_amounts, field) for field in HISTORY_FIELDS]
+        self.expect('history', got_row, expected_row, got_row == expected_row, **context)
+
+    def _storage(self, got: Dict[str, Any], expected: Dict[str, Any], context: Dict[str, Any]) -> None:
+        state = DialogueState(len(constants.STEP_ORDER) - 1, payload=got)
+        decoded = session_codec.decode(session_codec.encode(state)).payload
+        restored = serialization.loads(serialization.dumps(got))
+        expected_text = _outcome(self.reference.details, expected)
+        for kind, values in (('session_codec', decoded), ('json', restored)):
+            same = all(_same_number(values[key], expected[key]) for key in NUMBER_KEYS)
+            got_text = _outcome(self.candidate.details, values)
+            self.expect(kind, values, expected, same and got_text == expected_text, **context)
+
+    def _extended(self, got: Dict[str, Any], expected: Dict[str, Any], context: Dict[str, Any]) -> None:
+        """Розширений каталог: цілочисельний шлях проти ``Decimal``-шляху того самого каталогу."""
+        fmt = self.candidate.formatter
+        got = {**got, **{key: Fixed.from_decimal(value) or value for key, value in EXTRA_INPUTS.items()}}
+        expected = {key: to_decimal(value) for key, value in got.items()}
+        got_bodies, expected_bodies = _bodies(self.extended, got, fmt), _bodies(self.extended, expected, fmt)
+        self.expect('extended.sections', got_bodies, expected_bodies, got_bodies == expected_bodies, **context)
+        got_amounts, expected_amounts = _outcome(self.extended.amounts, got), _outcome(self.extended.amounts, expected)
+        if isinstance(got_amounts, str) or isinstance(expected_amounts, str):
+            self.expect('extended.amounts', got_amounts, expected_amounts, got_amounts == expected_amounts, **context)
+            return
+        got_total, expected_total = got_amounts[2], expected_amounts[2]
+        same = _same_number(got_total, expected_total) and fmt.money(got_total) == fmt.money(expected_total)
+        for name, value in got_amounts[1].items():
+            same = same and _same_number(value, expected_amounts[1][name])
+        self.expect('extended.amounts', got_amounts, expected_amounts, same, **context)
+
+    def inline(self, tokens: List[str]) -> None:
+        query = ' '.join(tokens)
+        got = _outcome(render, parse_query(query), self.candidate)
+        parsed = [reference_parse(token) for token in tokens]
+        if any(value is None for value in parsed):
+            same = isinstance(got, InlineAnswer) and got.title == INLINE_ERROR_TITLE
+            self.expect('inline', got, 'помилка розбору', same, query=query)
+            return
+        payload: Dict[str, Any] = {constants.STEP_PAYLOAD_KEYS[step]: Decimal(0) for step in constants.NUMERIC_STEPS}
+        for step, value in zip(INLINE_STEPS, parsed):
+            payload[constants.STEP_PAYLOAD_KEYS[step]] = value
+        expected = _outcome(render, InlineRequest(payload=payload), self.reference)
+        self.expect('inline', got, expected, got == expected, query=query)
+
+
+def _series_value(amounts: Any, field: str) -> int:
+    return _cents(amounts.total) if field == 'total' else _milli(getattr(amounts, field))
+
+
+def _bodies(catalog: Any, payload: Dict[str, Any], fmt: Any) -> Any:
+    return _outcome(lambda: [
+        section.body for section in catalog.sections(payload, fmt.quantity, fmt.tariff, fmt.money, CalculationSection)
+    ])
+
+
+def base_payload(index: int) -> Dict[str, Any]:
+    return {
+        'full_name': f'Мешканець {index}',
+        'address': f'вул. Шевченка, 1, кв. {index}',
+        'period': {'month': index % 12 + 1, 'year': 2026},
+    }
+
+
+def _best(func: Callable[[Any], Any], items: List[Any], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - started)
+    return round(best / len(items) * 1e6, 2)
+
+
+def _timings(rng: random.Random, count: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    texts = [str(Decimal(rng.randint(0, 10 ** 6)).scaleb(-rng.randint(0, 3))) for _ in range(count)]
+    decimal_payloads, fixed_payloads = [], []
+    for index in range(count):
+        row = {key: texts[(index * len(NUMBER_KEYS) + offset) % count] for offset, key in enumerate(NUMBER_KEYS)}
+        base = base_payload(index)
+        decimal_payloads.append({**base, **{key: reference_parse(text) for key, text in row.items()}})
+        fixed_payloads.append({**base, **{key: PaymentFlow._parse_decimal(text) for key, text in row.items()}})
+    calculator = PaymentCalculator()
+    timings = {'parse': {
+        'decimal_us': _best(reference_parse, texts, repeat),
+        'fixed_us': _best(PaymentFlow._parse_decimal, texts, repeat),
+    }}
+    for method in ('details', 'amounts'):
+        func = getattr(calculator, method)
+        timings[method] = {
+            'decimal_us': _best(func, decimal_payloads, repeat),
+            'fixed_us': _best(func, fixed_payloads, repeat),
+        }
+    encode = session_codec.encode
+    timings['session_codec'] = {
+        'decimal_us': _best(lambda payload: encode(DialogueState(0, payload=payload)), decimal_payloads, repeat),
+        'fixed_us': _best(lambda payload: encode(DialogueState(0, payload=payload)), fixed_payloads, repeat),
+    }
+    for timing in timings.values():
+        timing['ratio'] = round(timing['fixed_us'] / timing['decimal_us'], 3)
+    return timings
+
+
+def run(count: int, repeat: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    checker = _Checker()
+    for text in EDGE_INPUTS:
+        checker.parse(text)
+    for index in range(count):
+        texts = {key: number_text(rng) for key in NUMBER_KEYS}
+        for text in texts.values():
+            checker.parse(text)
+        checker.payload(texts, base_payload(index))
+        tokens = [number_text(rng).strip().replace(' ', '') or '0' for _ in range(rng.choice((5, 8, 9)))]
+        checker.inline(tokens)
+    found = checker.found
+    return {
+        'payloads': count,
+        'checked': checker.checked,
+        'mismatches': found[:10],
+        'mismatch_count': len(found),
+        'timings': _timings(rng, min(count, 1000), repeat),
+        'ok': not found,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payloads', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=25)
+    args = parser.parse_args(argv)
+    report = run(args.payloads, args.repeat, args.seed)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not report['ok']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
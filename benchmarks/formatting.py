@@ -0,0 +1,97 @@
+"""Вимірює виграш від кешування форматування на розрахунках зі спільними тарифами.
+
+Запуск: ``python -m benchmarks.formatting --payloads 500 --repeat 10``
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from bot.dialogue.calculator import PaymentCalculator
+from bot.dialogue.constants import THREE_DECIMALS, TWO_DECIMALS
+from bot.dialogue.formatting import ValueFormatter
+
+
+class UncachedFormatter(ValueFormatter):
+    """Форматування без кешів — поведінка до введення мемоізації."""
+
+    @classmethod
+    def quantity(cls, value: Decimal) -> str:
+        return cls.decimal_fixed(value, THREE_DECIMALS)
+
+    @classmethod
+    def tariff(cls, value: Decimal) -> str:
+        return cls.decimal_fixed(value, THREE_DECIMALS)
+
+    @classmethod
+    def money(cls, value: Decimal) -> str:
+        return cls.decimal_fixed(value, TWO_DECIMALS, strip_trailing=False)
+
+
+def building_payloads(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Квартири одного будинку: тарифи й період спільні, показники та площі різні."""
+    rng = random.Random(seed)
+    payloads = []
+    for index in range(count):
+        cold_prev = Decimal(rng.randint(0, 500_000)) / 1000
+        hot_prev = Decimal(rng.randint(0, 300_000)) / 1000
+        payloads.append({
+            'full_name': f'Мешканець {index}',
+            'address': f'вул. Шевченка, 1, кв. {index}',
+            'period': {'month': 1, 'year': 2026},
+            'cold_prev': cold_prev,
+            'cold_curr': cold_prev + Decimal(rng.randint(0, 15_000)) / 1000,
+            'hot_prev': hot_prev,
+            'hot_curr': hot_prev + Decimal(rng.randint(0, 8_000)) / 1000,
+            'cold_tariff': Decimal('30.384'),
+            'hot_tariff': Decimal('99.5'),
+            'rent_tariff': Decimal('8'),
+            'heat_tariff': Decimal('41.23'),
+            'apartment_area': Decimal(rng.choice(['38.5', '45', '52.3', '68.1', '74.9'])),
+        })
+    return payloads
+
+
+def _time(calculator: PaymentCalculator, payloads: List[Dict[str, Any]], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for payload in payloads:
+            calculator.details(payload)
+            calculator.summary(payload)
+        best = min(best, time.perf_counter() - started)
+    return best / len(payloads)
+
+
+def run(count: int, repeat: int) -> Dict[str, Any]:
+    payloads = building_payloads(count)
+    cached = PaymentCalculator()
+    uncached = PaymentCalculator(UncachedFormatter())
+    for payload in payloads[:50]:
+        assert cached.details(payload) == uncached.details(payload)
+    ValueFormatter.clear_caches()
+    uncached_us = _time(uncached, payloads, repeat) * 1e6
+    cached_us = _time(cached, payloads, repeat) * 1e6
+    return {
+        'payloads': count,
+        'uncached_us_per_bill': round(uncached_us, 2),
+        'cached_us_per_bill': round(cached_us, 2),
+        'speedup': round(uncached_us / cached_us, 2),
+        'caches': {name: info._asdict() for name, info in ValueFormatter.cache_info().items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payloads', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(run(args.payloads, args.repeat), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
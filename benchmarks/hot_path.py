@@ -0,0 +1,336 @@
+"""Мікробенчмарки гарячого шляху діалогу: час і алокації на одну операцію.
+
+Запуск:
+``python -m benchmarks.hot_path run -o benchmarks/baselines/hot_path.json`` — виміряти та зберегти базову лінію;
+``python -m benchmarks.hot_path compare benchmarks/baselines/hot_path.json --threshold 0.15`` — виміряти
+поточний код і завершитися з кодом 1, якщо якийсь випадок повільніший за базову лінію більше ніж на поріг,
+і з кодом 2, якщо базову лінію не вдалося прочитати. Базова лінія в репозиторії виміряна з типовими
+``--number`` і ``--repeat``; після зміни машини чи інтерпретатора її варто переміряти.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fakes import FakeFSMContext, FakeInlineQuery, FakeMessage
+from bot.dialogue import constants
+from bot.dialogue.calculator import PaymentCalculator
+from bot.dialogue.flow import DialogueState, PaymentFlow
+from bot.dialogue.states import Form
+from bot.dialogue.utils import is_back_command
+from bot.handlers import inline
+from bot.handlers.messages import handle_plain_text
+from bot.metrics.middleware import MetricsMiddleware
+from bot.storage.session_codec import dump_session
+from bot.tracing import Span, span
+
+
+DEFAULT_BASELINE = Path('benchmarks/baselines/hot_path.json')
+DEFAULT_THRESHOLD = 0.15
+
+STEP_INPUTS = {
+    constants.FULL_NAME_STEP: 'Корнієнко Сергій Іванович',
+    constants.PERIOD_STEP: '01-2026',
+    constants.ADDRESS_STEP: 'вул. Шевченка, 1, кв. 5',
+    constants.HOT_PREV_STEP: '45.2',
+    constants.HOT_CURR_STEP: '48,915',
+    constants.COLD_PREV_STEP: '123.4',
+    constants.COLD_CURR_STEP: '130.1',
+    constants.COLD_TARIFF_STEP: '30.384',
+    constants.HOT_TARIFF_STEP: '99.5',
+    constants.RENT_TARIFF_STEP: '8',
+    constants.HEAT_TARIFF_STEP: '41.23',
+    constants.AREA_STEP: '68.1',
+}
+
+DECIMAL_INPUTS = ['123.45', ' 1 234,5 ', '30.384', '0', '8.', 'abc', '']
+BACK_INPUTS = ['⬅️ Назад', '/back', 'назад!', '130.1', 'Корнієнко Сергій Іванович', '']
+
+
+@dataclass
+class Case:
+    """Одна вимірювана операція; ``func`` — звичайна функція або корутинна функція без аргументів."""
+
+    name: str
+    func: Callable[[], Any]
+    is_async: bool = False
+
+
+def _payload_before(step_index: int) -> Dict[str, Any]:
+    flow = PaymentFlow()
+    for step in constants.STEP_ORDER[:step_index]:
+        flow.process(STEP_INPUTS[step])
+    return flow.payload
+
+
+def _full_payload() -> Dict[str, Any]:
+    payload = _payload_before(len(constants.STEP_ORDER) - 1)
+    payload[constants.STEP_PAYLOAD_KEYS[constants.AREA_STEP]] = Decimal(STEP_INPUTS[constants.AREA_STEP])
+    return payload
+
+
+def _process_case(step_index: int) -> Callable[[], Any]:
+    payload = _payload_before(step_index)
+    text = STEP_INPUTS[constants.STEP_ORDER[step_index]]
+
+    def run() -> Any:
+        return PaymentFlow(DialogueState(step_index=step_index, payload=dict(payload))).process(text)
+
+    return run
+
+
+def _dialogue_round_trip(traced: bool = False) -> Callable[[], Any]:
+    """Повний діалог; ``traced`` — кожне оновлення всередині кореневого span, як при вибірці 100%."""
+    texts = [STEP_INPUTS[step] for step in constants.STEP_ORDER]
+
+    async def run() -> None:
+        state = FakeFSMContext(state=Form.collecting.state, data=dump_session(DialogueState()))
+        for text in texts:
+            if traced:
+                with Span('update'):
+                    await handle_plain_text(FakeMessage(text), state)  # type: ignore[arg-type]
+            else:
+                await handle_plain_text(FakeMessage(text), state)  # type: ignore[arg-type]
+
+    return run
+
+
+def _untraced_span() -> None:
+    with span('flow.process'):
+        pass
+
+
+def _metrics_middleware() -> Callable[[], Any]:
+    """Накладні витрати ``MetricsMiddleware`` навколо порожнього обробника."""
+    middleware = MetricsMiddleware()
+    message = FakeMessage('130.1')
+
+    async def handler(event: Any, data: Dict[str, Any]) -> None:
+        data['metrics_probe'].step = constants.COLD_CURR_STEP
+
+    async def run() -> None:
+        await middleware(handler, message, {})  # type: ignore[arg-type]
+
+    return run
+
+
+def _inline_query(cached: bool) -> Callable[[], Any]:
+    """Обробка inline-запиту: з готовою відповіддю в кеші або з розрахунком щоразу."""
+    query = FakeInlineQuery('123.4 130.1 30.384 68.1 8 45.2 48,915 99.5 41.23')
+
+    async def run() -> None:
+        if not cached:
+            inline._results.clear()
+        await inline.inline_calculator(query)  # type: ignore[arg-type]
+        query.answers.clear()
+
+    return run
+
+
+def build_cases() -> List[Case]:
+    calculator = PaymentCalculator()
+    payload = _full_payload()
+    cases = [
+        Case(f'flow.process.{step}', _process_case(index)) for index, step in enumerate(constants.STEP_ORDER)
+    ]
+    cases.extend([
+        Case('flow.parse_decimal', lambda: [PaymentFlow._parse_decimal(text) for text in DECIMAL_INPUTS]),
+        Case('utils.is_back_command', lambda: [is_back_command(text) for text in BACK_INPUTS]),
+        Case('calculator.details', lambda: calculator.details(payload)),
+        Case('calculator.summary', lambda: calculator.summary(payload)),
+        Case('handlers.handle_plain_text.dialogue', _dialogue_round_trip(), is_async=True),
+        Case('handlers.handle_plain_text.dialogue.traced', _dialogue_round_trip(traced=True), is_async=True),
+        Case('tracing.span.disabled', _untraced_span),
+        Case('metrics.middleware', _metrics_middleware(), is_async=True),
+        Case('handlers.inline.cached', _inline_query(cached=True), is_async=True),
+        Case('handlers.inline.uncached', _inline_query(cached=False), is_async=True),
+    ])
+    return cases
+
+
+def _time_sync(func: Callable[[], Any], number: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter_ns() - started)
+    return best / number
+
+
+async def _time_async(func: Callable[[], Any], number: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for _ in range(number):
+            await func()
+        best = min(best, time.perf_counter_ns() - started)
+    return best / number
+
+
+class _AllocationTracker:
+    """Рахує блоки й байти, виділені між ``start`` і ``stop`` та не звільнені до кінця виміру."""
+
+    def start(self) -> None:
+        gc.collect()
+        tracemalloc.start()
+        self._before = tracemalloc.take_snapshot()
+        self._base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+    def stop(self, number: int) -> Dict[str, float]:
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        diff = after.compare_to(self._before, 'traceback')
+        return {
+            'alloc_blocks_per_op': sum(stat.count_diff for stat in diff if stat.count_diff > 0) / number,
+            'alloc_bytes_per_op': sum(stat.size_diff for stat in diff if stat.size_diff > 0) / number,
+            'peak_bytes': float(peak - self._base),
+        }
+
+
+def _allocations(func: Callable[[], Any], number: int) -> Dict[str, float]:
+    func()
+    tracker = _AllocationTracker()
+    tracker.start()
+    for _ in range(number):
+        func()
+    return tracker.stop(number)
+
+
+async def _allocations_async(func: Callable[[], Any], number: int) -> Dict[str, float]:
+    await func()
+    tracker = _AllocationTracker()
+    tracker.start()
+    for _ in range(number):
+        await func()
+    return tracker.stop(number)
+
+
+def measure(case: Case, number: int, repeat: int) -> Dict[str, float]:
+    if case.is_async:
+        # Діалог містить 12 повідомлень, тому зменшуємо кількість повторів, зберігаючи час вимірювання.
+        async_number = max(1, number // 10)
+        ns_per_op = asyncio.run(_time_async(case.func, async_number, repeat))
+        allocations = asyncio.run(_allocations_async(case.func, max(1, async_number // 10)))
+    else:
+        ns_per_op = _time_sync(case.func, number, repeat)
+        allocations = _allocations(case.func, max(1, number // 10))
+    return {'ns_per_op': round(ns_per_op, 1), **{key: round(value, 1) for key, value in allocations.items()}}
+
+
+def run(number: int, repeat: int, only: Optional[str] = None) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, float]] = {}
+    for case in build_cases():
+        if only and only not in case.name:
+            continue
+        results[case.name] = measure(case, number, repeat)
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'number': number,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Повертає рядки порівняння; ``regression`` позначає випадки, повільніші за поріг."""
+    rows = []
+    for name, base in baseline['results'].items():
+        now = current['results'].get(name)
+        if now is None:
+            continue
+        change = now['ns_per_op'] / base['ns_per_op'] - 1 if base['ns_per_op'] else 0.0
+        rows.append({
+            'case': name,
+            'baseline_ns': base['ns_per_op'],
+            'current_ns': now['ns_per_op'],
+            'change': round(change, 3),
+            'alloc_blocks_change': round(now['alloc_blocks_per_op'] - base['alloc_blocks_per_op'], 1),
+            'regression': change > threshold,
+        })
+    return rows
+
+
+def _print_table(rows: List[Dict[str, Any]]) -> None:
+    width = max(len(row['case']) for row in rows)
+    for row in rows:
+        marker = 'REGRESSION' if row['regression'] else ''
+        print(
+            f"{row['case']:<{width}}  {row['baseline_ns']:>12.1f} ns  {row['current_ns']:>12.1f} ns  "
+            f"{row['change']:>+8.1%}  {row['alloc_blocks_change']:>+7.1f} blk  {marker}"
+        )
+
+
+def _load_report(path: Path) -> Dict[str, Any]:
+    try:
+        report = json.loads(path.read_text(encoding='utf-8'))
+    except OSError as exc:
+        raise ValueError(f'Не вдалося прочитати {path}: {exc.strerror or exc}. Збережіть базову лінію командою run -o.') from exc
+    except ValueError as exc:
+        raise ValueError(f'{path} не є JSON-звітом hot_path: {exc}') from exc
+    if not isinstance(report, dict) or not isinstance(report.get('results'), dict):
+        raise ValueError(f'{path} не є JSON-звітом hot_path: немає об\'єкта "results"')
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=2000, help='Викликів у одному вимірі')
+    parser.add_argument('--repeat', type=int, default=5, help='Кількість вимірів, береться найкращий')
+    parser.add_argument('--only', help='Запускати лише випадки, назва яких містить підрядок')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Виміряти й вивести або зберегти результати')
+    run_parser.add_argument('-o', '--output', type=Path, help='Куди зберегти JSON (типово — stdout)')
+
+    compare_parser = commands.add_parser('compare', help='Порівняти з базовою лінією')
+    compare_parser.add_argument('baseline', type=Path, nargs='?', default=DEFAULT_BASELINE)
+    compare_parser.add_argument('--current', type=Path, help='Готовий JSON замість нового виміру')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Допустиме сповільнення, частка')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run(args.number, args.repeat, args.only)
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if args.output:
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            args.output.write_text(text + '\n', encoding='utf-8')
+        else:
+            print(text)
+        return 0
+
+    try:
+        baseline = _load_report(args.baseline)
+        current = _load_report(args.current) if args.current else None
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    if current is None:
+        current = run(args.number, args.repeat, args.only)
+    rows = compare(baseline, current, args.threshold)
+    if not rows:
+        print('Немає спільних випадків для порівняння.')
+        return 1
+    _print_table(rows)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
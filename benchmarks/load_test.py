@@ -0,0 +1,237 @@
+"""Навантажувальний тест: тисячі віртуальних користувачів проходять повний діалог із 12 кроків.
+
+Оновлення подаються у справжній ``Dispatcher`` з ``bot.handlers.router``, а відповіді бота надходять на
+локальну заглушку Bot API, яка записує виклики ``sendMessage``. Користувачі час від часу натискають
+"⬅️ Назад" і надсилають некоректні значення. Для кожного рівня одночасних діалогів звіт містить
+пропускну здатність, p50/p95/p99 затримки відповіді за кроками та піковий RSS процесу.
+
+Запуск: ``python -m benchmarks.load_test --users 2000 --concurrency 100,500,1000``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import resource
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+
+from benchmarks.fake_telegram import FakeTelegramServer, make_message_update
+from benchmarks.hot_path import STEP_INPUTS
+from bot.dialogue import constants
+from bot.handlers import router
+
+
+START_LABEL = 'start'
+BACK_LABEL = 'back'
+INVALID_LABEL = 'invalid'
+BILL_LABEL = 'bill'
+
+INVALID_INPUTS = {
+    constants.PERIOD_STEP: 'січень двадцять шостого',
+    **{step: 'багато кубів' for step in constants.NUMERIC_STEPS},
+}
+
+REPORT_ORDER = [START_LABEL, *constants.STEP_ORDER, BACK_LABEL, INVALID_LABEL, BILL_LABEL]
+
+REPLY_TIMEOUT = 30.0
+
+
+@dataclass
+class LoadProfile:
+    users: int
+    concurrency: int
+    back_probability: float = 0.05
+    invalid_probability: float = 0.05
+    think_time: float = 0.0
+    seed: int = 1
+
+
+@dataclass
+class LevelReport:
+    concurrency: int
+    users: int
+    updates: int
+    replies: int
+    duration_s: float
+    errors: int
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'concurrency': self.concurrency,
+            'users': self.users,
+            'errors': self.errors,
+            'duration_s': round(self.duration_s, 3),
+            'updates': self.updates,
+            'replies': self.replies,
+            'updates_per_s': round(self.updates / self.duration_s, 1) if self.duration_s else 0.0,
+            'bills_per_s': round((self.users - self.errors) / self.duration_s, 1) if self.duration_s else 0.0,
+            'latency_ms': {
+                label: percentiles(self.latencies[label]) for label in REPORT_ORDER if label in self.latencies
+            },
+        }
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 2)
+
+    return {'count': len(ordered), 'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'max': pick(1.0)}
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux повертає кілобайти, macOS — байти.
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+class DialogueDriver:
+    """Подає оновлення в диспетчер і чекає відповідей заглушки для одного рівня навантаження."""
+
+    def __init__(self, dp: Dispatcher, bot: Bot, server: FakeTelegramServer, profile: LoadProfile, chat_base: int) -> None:
+        self.dp = dp
+        self.bot = bot
+        self.server = server
+        self.profile = profile
+        self.chat_base = chat_base
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.updates = 0
+        self.replies = 0
+        self.errors = 0
+        self._update_ids = itertools.count(chat_base)
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    async def run(self) -> LevelReport:
+        limiter = asyncio.Semaphore(self.profile.concurrency)
+
+        async def guarded(index: int) -> None:
+            async with limiter:
+                await self._user(self.chat_base + index, random.Random(self.profile.seed * 1_000_003 + index))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(guarded(index) for index in range(self.profile.users)))
+        duration = time.perf_counter() - started
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        return LevelReport(
+            concurrency=self.profile.concurrency,
+            users=self.profile.users,
+            updates=self.updates,
+            replies=self.replies,
+            duration_s=duration,
+            errors=self.errors,
+            latencies=dict(self.latencies),
+        )
+
+    async def _user(self, chat_id: int, rng: random.Random) -> None:
+        try:
+            bill_started = time.perf_counter()
+            await self._send(chat_id, '/start', START_LABEL, replies=2)
+            step_index = 0
+            while True:
+                await self._think(rng)
+                step = constants.STEP_ORDER[step_index]
+                roll = rng.random()
+                if roll < self.profile.back_probability:
+                    await self._send(chat_id, constants.BACK_BUTTON_TEXT, BACK_LABEL, replies=1)
+                    step_index = max(0, step_index - 1)
+                    continue
+                if step in INVALID_INPUTS and roll < self.profile.back_probability + self.profile.invalid_probability:
+                    await self._send(chat_id, INVALID_INPUTS[step], INVALID_LABEL, replies=1)
+                    continue
+                if step_index == len(constants.STEP_ORDER) - 1:
+                    await self._send(chat_id, STEP_INPUTS[step], step, replies=3)
+                    break
+                await self._send(chat_id, STEP_INPUTS[step], step, replies=1)
+                step_index += 1
+            self.latencies[BILL_LABEL].append(time.perf_counter() - bill_started)
+        except asyncio.TimeoutError:
+            self.errors += 1
+
+    async def _send(self, chat_id: int, text: str, label: str, replies: int) -> None:
+        waiters = [self.server.wait_for_message(chat_id) for _ in range(replies)]
+        update = make_message_update(next(self._update_ids), chat_id, text)
+        started = time.perf_counter()
+        task = asyncio.create_task(self.dp.feed_raw_update(self.bot, update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.updates += 1
+        first = await asyncio.wait_for(waiters[0], timeout=REPLY_TIMEOUT)
+        self.latencies[label].append(first.received_at - started)
+        for waiter in waiters[1:]:
+            await asyncio.wait_for(waiter, timeout=REPLY_TIMEOUT)
+        self.replies += replies
+
+    async def _think(self, rng: random.Random) -> None:
+        if self.profile.think_time:
+            await asyncio.sleep(rng.uniform(0, self.profile.think_time))
+
+
+async def run(levels: List[int], users: int, network_delay: float, **profile: Any) -> Dict[str, Any]:
+    server = FakeTelegramServer(network_delay=network_delay, record=False)
+    await server.start()
+    bot = server.build_bot()
+    dp = Dispatcher()
+    dp.include_router(router)
+    reports = []
+    try:
+        for level_index, concurrency in enumerate(levels):
+            load = LoadProfile(users=users, concurrency=concurrency, **profile)
+            driver = DialogueDriver(dp, bot, server, load, chat_base=(level_index + 1) * 10_000_000)
+            report = (await driver.run()).as_dict()
+            report['peak_rss_mib'] = peak_rss_mib()
+            report['send_message_calls'] = server.calls.get('sendmessage', 0)
+            reports.append(report)
+            await server.drain()
+    finally:
+        await bot.session.close()
+        await server.stop()
+    return {'network_delay_s': network_delay, 'levels': reports}
+
+
+def _levels(raw: str) -> List[int]:
+    try:
+        levels = [int(part) for part in raw.split(',') if part.strip()]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f'Очікується список чисел через кому, отримано {raw!r}') from exc
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError('Рівні паралельності мають бути додатними числами')
+    return levels
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000, help='Кількість діалогів на кожному рівні')
+    parser.add_argument('--concurrency', type=_levels, default=[100, 500, 1000], help='Рівні одночасних діалогів, через кому')
+    parser.add_argument('--back-probability', type=float, default=0.05)
+    parser.add_argument('--invalid-probability', type=float, default=0.05)
+    parser.add_argument('--think-time', type=float, default=0.0, help='Максимальна пауза користувача між повідомленнями, с')
+    parser.add_argument('--network-delay', type=float, default=0.0, help='Імітована одностороння мережева затримка, с')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    report = asyncio.run(run(
+        args.concurrency,
+        args.users,
+        args.network_delay,
+        back_probability=args.back_probability,
+        invalid_probability=args.invalid_probability,
+        think_time=args.think_time,
+        seed=args.seed,
+    ))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Вихідні виклики Bot API на один завершений розрахунок: звичайний діалог проти панелі.
+
+Кожен користувач проходить повний діалог (``/start`` і 12 кроків) з однією помилкою введення й одним
+поверненням назад — текстом у режимі ``messages``, кнопкою в режимі ``panel``. Оновлення подаються у
+справжній ``Dispatcher``, виклики рахує заглушка Bot API окремо за методами: нові повідомлення в чаті й
+усі виклики (правки теж проходять через ліміт чату планувальника). Режими панелі: ``panel`` —
+користувач відповідає після того, як панель оновилася; ``panel_burst`` — надсилає наступну відповідь
+раніше, ніж минає вікно об'єднання правок, тож кілька правок зливаються в одну.
+
+Запуск: ``python -m benchmarks.panel_calls --users 20 --edit-delay 0.05``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from benchmarks.fake_telegram import FakeTelegramServer, make_callback_update, make_message_update
+from benchmarks.hot_path import STEP_INPUTS
+from bot.config import MESSAGES_UI, PANEL_UI
+from bot.dialogue import constants
+from bot.handlers import router
+from bot.handlers.panel import PANEL_KEY
+from bot.ui.panel import PanelEditor
+
+
+INVALID_INPUT = 'багато кубів'
+# Після якого кроку користувач помиляється і після якого повертається назад.
+INVALID_AFTER = constants.HOT_PREV_STEP
+BACK_AFTER = constants.COLD_CURR_STEP
+PANEL_BURST = 'panel_burst'
+
+
+class _User:
+    def __init__(
+        self, dp: Dispatcher, bot: Bot, storage: MemoryStorage, chat_id: int, ui: str, editor: PanelEditor, pause: float,
+    ) -> None:
+        self.dp = dp
+        self.bot = bot
+        self.storage = storage
+        self.chat_id = chat_id
+        self.ui = ui
+        self.editor = editor
+        self.pause = pause
+        self._update_ids = itertools.count(chat_id * 100)
+
+    async def run(self) -> None:
+        await self._text('/start')
+        for step in constants.STEP_ORDER:
+            await self._text(STEP_INPUTS[step])
+            if step == INVALID_AFTER:
+                await self._text(INVALID_INPUT)
+            if step == BACK_AFTER:
+                await self._back()
+                await self._text(STEP_INPUTS[step])
+
+    async def _text(self, text: str) -> None:
+        await self._feed(make_message_update(next(self._update_ids), self.chat_id, text))
+
+    async def _back(self) -> None:
+        if self.ui == MESSAGES_UI:
+            await self._text(constants.BACK_BUTTON_TEXT)
+            return
+        key = StorageKey(bot_id=self.bot.id, chat_id=self.chat_id, user_id=self.chat_id)
+        panel_id = (await self.storage.get_data(key))[PANEL_KEY]
+        await self._feed(make_callback_update(next(self._update_ids), self.chat_id, constants.PANEL_BACK, panel_id))
+
+    async def _feed(self, update: Dict[str, Any]) -> None:
+        await self.dp.feed_raw_update(self.bot, update, dialogue_ui=self.ui, panel_editor=self.editor)
+        if self.pause:
+            await asyncio.sleep(self.pause)
+
+
+async def _scenario(
+    dp: Dispatcher, bot: Bot, storage: MemoryStorage, server: FakeTelegramServer,
+    ui: str, users: int, chat_base: int, edit_delay: float, pause: float,
+) -> Dict[str, Any]:
+    editor = PanelEditor(delay=edit_delay)
+    before = dict(server.calls)
+    await asyncio.gather(*(
+        _User(dp, bot, storage, chat_base + index, ui, editor, pause).run() for index in range(users)
+    ))
+    await editor.close()
+    await server.drain()
+    calls = {
+        method: round((count - before.get(method, 0)) / users, 2)
+        for method, count in sorted(server.calls.items())
+        if count != before.get(method, 0)
+    }
+    return {
+        'calls_per_bill': calls,
+        'new_messages_per_bill': calls.get('sendmessage', 0),
+        'api_calls_per_bill': round(sum(calls.values()), 2),
+    }
+
+
+async def run(users: int, edit_delay: float) -> Dict[str, Any]:
+    server = FakeTelegramServer(record=False)
+    await server.start()
+    bot = server.build_bot()
+    storage = MemoryStorage()
+    dp = Dispatcher(storage=storage)
+    dp.include_router(router)
+    report: Dict[str, Any] = {'users': users, 'edit_delay_s': edit_delay}
+    scenarios = (
+        (MESSAGES_UI, MESSAGES_UI, 0.0),
+        (PANEL_UI, PANEL_UI, edit_delay * 2),
+        (PANEL_BURST, PANEL_UI, edit_delay / 3),
+    )
+    try:
+        for index, (name, ui, pause) in enumerate(scenarios, start=1):
+            report[name] = await _scenario(dp, bot, storage, server, ui, users, index * 1_000_000, edit_delay, pause)
+    finally:
+        await bot.session.close()
+        await server.stop()
+    baseline = report[MESSAGES_UI]
+    for name in (PANEL_UI, PANEL_BURST):
+        for key in ('new_messages_per_bill', 'api_calls_per_bill'):
+            report[name][key.replace('_per_bill', '_saved')] = f'{1 - report[name][key] / baseline[key]:.0%}'
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--edit-delay', type=float, default=0.05, help="Вікно об'єднання правок панелі, секунди")
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args.users, args.edit_delay)), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Затримка циклу подій, поки одночасно малюється багато квитанцій.
+
+Поруч із рендерингом працює «пульс» — корутина, що засинає на ``--interval`` мс і записує, наскільки
+пізніше запланованого прокинулася. Режими: ``inline`` — квитанція малюється прямо в циклі подій (як
+було б без пулу), ``pool`` — через ``ReceiptRenderer`` з обмеженою чергою. Для пулу також рахується,
+скільки запитів відхилено через заповнену чергу.
+
+Запуск: ``python -m benchmarks.receipts --renders 32 --workers 2 --queue-limit 8``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.hot_path import _full_payload
+from benchmarks.load_test import percentiles
+from bot.dialogue.calculator import PaymentCalculator
+from bot.receipts import PNG_FORMAT, ReceiptData, ReceiptRenderer, RendererBusy, build_receipt, render_receipt
+
+
+def _receipts(count: int) -> List[ReceiptData]:
+    """Різні рахунки, щоб кеш за вмістом не підміняв рендеринг."""
+    base = build_receipt(_full_payload(), PaymentCalculator())
+    return [dataclasses.replace(base, full_name=f'{base.full_name} #{index}') for index in range(count)]
+
+
+async def _measure(render: Callable[[ReceiptData], Awaitable[Any]], receipts: List[ReceiptData], interval: float) -> Dict[str, Any]:
+    lags: List[float] = []
+    stopped = asyncio.Event()
+
+    async def heartbeat() -> None:
+        while not stopped.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - started - interval))
+
+    async def one(data: ReceiptData) -> bool:
+        try:
+            await render(data)
+        except RendererBusy:
+            return False
+        return True
+
+    pulse = asyncio.create_task(heartbeat())
+    await asyncio.sleep(interval * 2)
+    started = time.perf_counter()
+    done = await asyncio.gather(*(one(data) for data in receipts))
+    elapsed = time.perf_counter() - started
+    stopped.set()
+    await pulse
+    return {
+        'rendered': sum(done),
+        'rejected': len(done) - sum(done),
+        'seconds': round(elapsed, 2),
+        'loop_lag_ms': percentiles(lags),
+    }
+
+
+async def _inline(receipts: List[ReceiptData], interval: float) -> Dict[str, Any]:
+    async def render(data: ReceiptData) -> bytes:
+        await asyncio.sleep(0)
+        return render_receipt(data, PNG_FORMAT)
+
+    return await _measure(render, receipts, interval)
+
+
+async def _pool(receipts: List[ReceiptData], interval: float, workers: int, queue_limit: int) -> Dict[str, Any]:
+    renderer = ReceiptRenderer(workers=workers, queue_limit=queue_limit)
+    try:
+        # Запуск процесів і імпорт Pillow у них не входять у вимір.
+        await renderer.render(dataclasses.replace(receipts[0], title='warm-up'), PNG_FORMAT)
+        return await _measure(lambda data: renderer.render(data, PNG_FORMAT), receipts, interval)
+    finally:
+        await renderer.close()
+
+
+def run(renders: int, workers: int, queue_limit: int, interval_ms: float) -> Dict[str, Any]:
+    receipts = _receipts(renders)
+    interval = interval_ms / 1000
+    return {
+        'renders': renders,
+        'workers': workers,
+        'queue_limit': queue_limit,
+        'inline': asyncio.run(_inline(receipts, interval)),
+        'pool': asyncio.run(_pool(receipts, interval, workers, queue_limit)),
+        'pool_unbounded': asyncio.run(_pool(receipts, interval, workers, renders)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--renders', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--queue-limit', type=int, default=8)
+    parser.add_argument('--interval', type=float, default=5.0, help='Період «пульсу» циклу подій, мс')
+    args = parser.parse_args()
+    print(json.dumps(run(args.renders, args.workers, args.queue_limit, args.interval), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""Щомісячні нагадування на ``--subscribers`` підписниках: пам'ять, індекс, рівномірність і перезапуск.
+
+``memory`` — байти на запис ``MemoryReminderStore`` (tracemalloc) на десятій частині підписників і на
+всіх, а також після того, як половина змінила день: застарілі елементи купи тримають пам'ять на запис
+у сталих межах. ``sqlite`` — розмір бази на запис і вартість ``claim`` пачки та ``next_due`` на повному
+індексі. ``spread`` — усі підписалися на одне число: скільки нагадувань припадає на найзавантаженішу
+хвилину і чи вкладається це у ``--rate``. ``restart`` — наскрізна перевірка із заглушкою Bot API: бот
+«лежав» кілька годин, потім упав посеред пачки; після перезапуску кожен підписник отримує рівно одне
+нагадування, темп відправки не перевищує ``--rate``, а наступний час кожного — у наступному місяці.
+
+Запуск: ``python -m benchmarks.reminders --subscribers 100000``; код виходу 1, якщо ``restart`` не зійшовся.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from bot.reminders import MAX_REMINDER_DAY, ReminderCalendar, ReminderScheduler
+from bot.storage.reminders import MemoryReminderStore, SqliteReminderStore
+
+
+# 1 березня 2026, 00:00 UTC: перше число місяця, до якого є три тижні запасу.
+EPOCH = 1772323200.0
+BATCH = 100
+
+
+class _Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _user_id(index: int) -> int:
+    return 100_000_000 + index * 7
+
+
+async def _fill(store: Any, calendar: ReminderCalendar, count: int, rng: random.Random) -> None:
+    for index in range(count):
+        user_id = _user_id(index)
+        day = rng.randint(1, MAX_REMINDER_DAY)
+        await store.subscribe(user_id, user_id, day, calendar.next_due(user_id, day, EPOCH))
+
+
+async def _memory(subscribers: int) -> Dict[str, Any]:
+    calendar = ReminderCalendar()
+    report: Dict[str, Any] = {}
+    for label, count in (('tenth', subscribers // 10), ('all', subscribers)):
+        tracemalloc.start()
+        store = MemoryReminderStore()
+        await _fill(store, calendar, count, random.Random(1))
+        report[f'bytes_per_entry_{label}'] = round(tracemalloc.get_traced_memory()[0] / count, 1)
+        if label == 'all':
+            rng = random.Random(2)
+            for index in range(0, count, 2):
+                user_id = _user_id(index)
+                day = rng.randint(1, MAX_REMINDER_DAY)
+                await store.subscribe(user_id, user_id, day, calendar.next_due(user_id, day, EPOCH))
+            report['bytes_per_entry_after_churn'] = round(tracemalloc.get_traced_memory()[0] / count, 1)
+        tracemalloc.stop()
+        del store
+    return report
+
+
+async def _sqlite(subscribers: int, directory: Path) -> Dict[str, Any]:
+    calendar = ReminderCalendar()
+    path = directory / 'index.sqlite3'
+    store = SqliteReminderStore(path)
+    started = time.perf_counter()
+    await store._run(_bulk_insert, store, calendar, subscribers)
+    fill_s = time.perf_counter() - started
+    timings: Dict[str, List[float]] = {'claim': [], 'next_due': []}
+    now = EPOCH + 86400 * 15
+    for _ in range(20):
+        started = time.perf_counter()
+        await store.next_due(now)
+        timings['next_due'].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        batch = await store.claim(now, BATCH, 600.0)
+        timings['claim'].append(time.perf_counter() - started)
+        for reminder in batch:
+            await store.reschedule(reminder, calendar.next_due(reminder.user_id, reminder.day, now))
+    await store.close()
+    return {
+        'fill_s': round(fill_s, 2),
+        'bytes_per_entry_on_disk': round(path.stat().st_size / subscribers, 1),
+        'claim_batch_ms': round(sorted(timings['claim'])[len(timings['claim']) // 2] * 1000, 3),
+        'next_due_ms': round(sorted(timings['next_due'])[len(timings['next_due']) // 2] * 1000, 3),
+    }
+
+
+def _bulk_insert(store: SqliteReminderStore, calendar: ReminderCalendar, count: int) -> None:
+    rng = random.Random(1)
+    rows = []
+    for index in range(count):
+        user_id = _user_id(index)
+        day = rng.randint(1, MAX_REMINDER_DAY)
+        rows.append((user_id, user_id, day, calendar.next_due(user_id, day, EPOCH)))
+    connection = store._connect()
+    with connection:
+        connection.executemany('INSERT INTO reminders (user_id, chat_id, day, due_at) VALUES (?, ?, ?, ?)', rows)
+
+
+def _spread(subscribers: int, rate: float) -> Dict[str, Any]:
+    calendar = ReminderCalendar()
+    per_minute = Counter(int(calendar.slot(_user_id(index), 25, 2026, 3) // 60) for index in range(subscribers))
+    peak = max(per_minute.values())
+    window_minutes = calendar.window // 60
+    return {
+        'window_hours': calendar.window / 3600,
+        'mean_per_minute': round(subscribers / window_minutes, 1),
+        'peak_per_minute': peak,
+        'peak_rate_per_s': round(peak / 60, 2),
+        'fits_rate': peak / 60 <= rate,
+    }
+
+
+async def _restart(subscribers: int, rate: float, directory: Path) -> Dict[str, Any]:
+    calendar = ReminderCalendar()
+    path = directory / 'restart.sqlite3'
+    clock = _Clock(EPOCH)
+    store = SqliteReminderStore(path)
+    for index in range(subscribers):
+        user_id = _user_id(index)
+        # Усі на перше число: коли бот «прокинеться» о 22:00, вікно вже минуло.
+        await store.subscribe(user_id, user_id, 1, calendar.next_due(user_id, 1, clock.now))
+    # Процес забрав пачку і впав, не надіславши її.
+    clock.now = EPOCH + 22 * 3600
+    crashed = len(await store.claim(clock.now, BATCH, 600.0))
+    await store.close()
+
+    server = FakeTelegramServer()
+    await server.start()
+    bot = server.build_bot()
+    clock.now += 601
+    store = SqliteReminderStore(path)
+    scheduler = ReminderScheduler(store, calendar, rate=rate, batch_size=BATCH, clock=clock)
+    started = time.perf_counter()
+    try:
+        while await scheduler.run_due(bot):
+            pass
+        await server.drain()
+    finally:
+        await bot.session.close()
+        await server.stop()
+    elapsed = time.perf_counter() - started
+    received = Counter(message.chat_id for message in server.sent)
+    times = sorted(message.received_at for message in server.sent)
+    next_month = calendar.slot(0, 1, 2026, 4) - calendar.offset(0)
+    rescheduled = [await store.get(_user_id(index)) for index in range(subscribers)]
+    await scheduler.close()
+    return {
+        'subscribers': subscribers,
+        'claimed_before_crash': crashed,
+        'delivered': len(received),
+        'duplicates': sum(count - 1 for count in received.values()),
+        'elapsed_s': round(elapsed, 2),
+        'achieved_rate_per_s': round((len(times) - 1) / (times[-1] - times[0]), 2) if len(times) > 1 else None,
+        'all_rescheduled_next_month': all(
+            reminder is not None and next_month <= reminder.due_at < next_month + 86400 for reminder in rescheduled
+        ),
+    }
+
+
+async def run(subscribers: int, restart_subscribers: int, rate: float) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        report: Dict[str, Any] = {
+            'subscribers': subscribers,
+            'memory': await _memory(subscribers),
+            'sqlite': await _sqlite(subscribers, Path(directory)),
+            'spread': _spread(subscribers, rate),
+            'restart': await _restart(restart_subscribers, rate, Path(directory)),
+        }
+    restart = report['restart']
+    report['ok'] = (
+        restart['delivered'] == restart_subscribers
+        and not restart['duplicates']
+        and restart['all_rescheduled_next_month']
+    )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subscribers', type=int, default=100_000)
+    parser.add_argument('--restart-subscribers', type=int, default=300, help='Підписників у наскрізній перевірці')
+    parser.add_argument('--rate', type=float, default=100.0, help='Темп розсилки, повідомлень на секунду')
+    args = parser.parse_args(argv)
+    report = asyncio.run(run(args.subscribers, args.restart_subscribers, args.rate))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not report['ok']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""Каталог послуг проти рукописного розрахунку чотирьох послуг, який він замінив.
+
+``HandWrittenCalculator`` — копія ``PaymentCalculator`` до каталогу: ті самі формули, умови й шаблони,
+записані вручну. Спершу перевіряється, що на випадкових квартирах і крайніх значеннях (нульові тарифи,
+від'ємна витрата, ``-0``, експоненти, хвостові нулі) ``details``, ``summary``, ``brief`` і ``amounts``
+збігаються до байта, а каталог із додатковими послугами (світло день/ніч, газ, сміття) за нульових
+входів дає ті самі тексти секцій. Далі — час на розрахунок для обох шляхів і для розширеного каталогу.
+
+Запуск: ``python -m benchmarks.services --payloads 500 --repeat 10``; код виходу 1, якщо щось розійшлося.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.formatting import building_payloads
+from bot.dialogue import constants, templates
+from bot.dialogue.calculator import BillAmounts, CalculationSection, PaymentCalculator
+from bot.dialogue.services import ServiceCatalog
+
+
+SUMMARY = templates.compile_template('SUMMARY', (
+    'Ком.послуги за {month} {year}р. {full_name},{address};'
+    'ГВП(показники:{hot_prev}-{hot_curr}),'
+    'ХВП(показники:{cold_prev}-{cold_curr})'
+))
+READINGS_BLOCK = templates.compile_template('READINGS_BLOCK', (
+    '🔁 Повтор розрахунків:\n\n'
+    '📸 Показники (м³):\n'
+    'Вода — {prev_date} — {current_date} — Розхід\n'
+    'Холодна — {cold_prev} — {cold_curr} — {cold_usage} м³\n'
+    'Гаряча — {hot_prev} — {hot_curr} — {hot_usage} м³\n\n'
+))
+TARIFFS_BLOCK = templates.compile_template('TARIFFS_BLOCK', (
+    '⸻\n\n'
+    '💰 Тарифи:\n'
+    ' • Холодна вода: {cold} грн/м³\n'
+    ' • Гаряча вода: {hot} грн/м³\n'
+    ' • Технічне обслуговування будинку: {rent} грн/м²\n'
+    ' • Опалення: {heat} грн/м²\n\n'
+    '⸻\n\n'
+))
+COLD_SECTION = templates.compile_template('COLD_SECTION', '🔹 Холодна вода:\n\n{quantity} × {tariff} = {amount} грн')
+HOT_SECTION = templates.compile_template('HOT_SECTION', '🔸 Гаряча вода:\n\n{quantity} × {tariff} = {amount} грн')
+RENT_SECTION = templates.compile_template(
+    'RENT_SECTION', '🧱 Технічне обслуговування будинку:\n\n{quantity} × {tariff} = {amount} грн'
+)
+HEAT_SECTION = templates.compile_template(
+    'HEAT_SECTION', '♨️ Опалення (з урахуванням {quantity} м²):\n\n{quantity} × {tariff} = {amount} грн'
+)
+
+EXTRA_INPUTS = {
+    'electricity_day_prev': Decimal('10450.5'),
+    'electricity_day_curr': Decimal('10612.25'),
+    'electricity_night_prev': Decimal('4020'),
+    'electricity_night_curr': Decimal('4101.7'),
+    'electricity_day_tariff': Decimal('4.32'),
+    'electricity_night_tariff': Decimal('2.16'),
+    'gas_prev': Decimal('2210.412'),
+    'gas_curr': Decimal('2251.09'),
+    'gas_tariff': Decimal('7.95689'),
+    'residents': Decimal('3'),
+    'waste_tariff': Decimal('33.84'),
+}
+
+
+class HandWrittenCalculator(PaymentCalculator):
+    """Розрахунок чотирьох послуг, як його було написано до ``ServiceCatalog``."""
+
+    def summary(self, payload: Dict[str, Any]) -> str:
+        fmt = self.formatter
+        month_name, _, year = fmt.month_name(payload['period'])
+        return SUMMARY(
+            month=month_name,
+            year=year,
+            full_name=payload['full_name'],
+            address=payload['address'],
+            hot_prev=fmt.decimal_for_summary(payload['hot_prev']),
+            hot_curr=fmt.decimal_for_summary(payload['hot_curr']),
+            cold_prev=fmt.decimal_for_summary(payload['cold_prev']),
+            cold_curr=fmt.decimal_for_summary(payload['cold_curr']),
+        )
+
+    def details(self, payload: Dict[str, Any]) -> str:
+        fmt = self.formatter
+        cold_usage = payload['cold_curr'] - payload['cold_prev']
+        hot_usage = payload['hot_curr'] - payload['hot_prev']
+        sections = self.sections(payload)
+
+        period = payload['period']
+        _, month_locative, year = fmt.month_name(period)
+        prev_date, current_date = fmt.period_dates(period)
+        readings_block = READINGS_BLOCK(
+            prev_date=prev_date,
+            current_date=current_date,
+            cold_prev=fmt.decimal_for_summary(payload['cold_prev']),
+            cold_curr=fmt.decimal_for_summary(payload['cold_curr']),
+            cold_usage=fmt.quantity(cold_usage),
+            hot_prev=fmt.decimal_for_summary(payload['hot_prev']),
+            hot_curr=fmt.decimal_for_summary(payload['hot_curr']),
+            hot_usage=fmt.quantity(hot_usage),
+        )
+        tariffs_block = TARIFFS_BLOCK(
+            cold=fmt.tariff(payload['cold_tariff']),
+            hot=fmt.tariff(payload['hot_tariff']),
+            rent=fmt.tariff(payload['rent_tariff']),
+            heat=fmt.tariff(payload['heat_tariff']),
+        )
+
+        lines: List[str] = [readings_block, tariffs_block, '\n\n'.join(section.body for section in sections), '\n\n']
+        total = sum(section.amount for section in sections)
+        lines.append(templates.TOTAL_HEADER(month=month_locative, year=year))
+        for section in sections:
+            lines.append(templates.TOTAL_LINE(label=section.label, amount=section.amount_display))
+        lines.append(templates.TOTAL_FOOTER(total=fmt.money(total)))
+        return ''.join(lines)
+
+    def sections(self, payload: Dict[str, Any]) -> List[CalculationSection]:
+        formatter = self.formatter
+        cold_usage = payload['cold_curr'] - payload['cold_prev']
+        hot_usage = payload['hot_curr'] - payload['hot_prev']
+        area = payload['apartment_area']
+        cold_tariff = payload['cold_tariff']
+        hot_tariff = payload['hot_tariff']
+        rent_tariff = payload['rent_tariff']
+        heat_tariff = payload['heat_tariff']
+        sections: List[CalculationSection] = []
+
+        cold_amount = cold_usage * cold_tariff
+        cold_display = formatter.money(cold_amount)
+        cold_quantity = formatter.quantity(cold_usage)
+        cold_tariff_display = formatter.tariff(cold_tariff)
+        cold_body = COLD_SECTION(quantity=cold_quantity, tariff=cold_tariff_display, amount=cold_display)
+        sections.append(CalculationSection(
+            'Холодна вода', cold_body, cold_amount, cold_display, cold_quantity, cold_tariff_display,
+        ))
+
+        if hot_tariff > 0 and hot_usage > 0:
+            hot_amount = hot_usage * hot_tariff
+            hot_display = formatter.money(hot_amount)
+            hot_quantity = formatter.quantity(hot_usage)
+            hot_tariff_display = formatter.tariff(hot_tariff)
+            hot_body = HOT_SECTION(quantity=hot_quantity, tariff=hot_tariff_display, amount=hot_display)
+            sections.append(CalculationSection(
+                'Гаряча вода', hot_body, hot_amount, hot_display, hot_quantity, hot_tariff_display,
+            ))
+
+        rent_amount = area * rent_tariff
+        area_display = formatter.quantity(area)
+        rent_display = formatter.money(rent_amount)
+        rent_tariff_display = formatter.tariff(rent_tariff)
+        rent_body = RENT_SECTION(quantity=area_display, tariff=rent_tariff_display, amount=rent_display)
+        sections.append(CalculationSection(
+            'Технічне обслуговування будинку', rent_body, rent_amount, rent_display, area_display, rent_tariff_display,
+        ))
+
+        if heat_tariff > 0 and area > 0:
+            heat_amount = area * heat_tariff
+            heat_display = formatter.money(heat_amount)
+            heat_tariff_display = formatter.tariff(heat_tariff)
+            heat_body = HEAT_SECTION(quantity=area_display, tariff=heat_tariff_display, amount=heat_display)
+            sections.append(CalculationSection(
+                'Опалення', heat_body, heat_amount, heat_display, area_display, heat_tariff_display,
+            ))
+        return sections
+
+    def amounts(self, payload: Dict[str, Any]) -> BillAmounts:
+        cold_usage = payload['cold_curr'] - payload['cold_prev']
+        hot_usage = payload['hot_curr'] - payload['hot_prev']
+        area = payload['apartment_area']
+        hot_tariff = payload['hot_tariff']
+        heat_tariff = payload['heat_tariff']
+        cold = cold_usage * payload['cold_tariff']
+        rent = area * payload['rent_tariff']
+        hot = hot_usage * hot_tariff if hot_tariff > 0 and hot_usage > 0 else Decimal(0)
+        heat = area * heat_tariff if heat_tariff > 0 and area > 0 else Decimal(0)
+        return BillAmounts(cold_usage, hot_usage, cold, hot, rent, heat, cold + hot + rent + heat)
+
+
+def _extended_catalog() -> ServiceCatalog:
+    return ServiceCatalog(
+        header=(constants.FULL_NAME_FIELD, constants.PERIOD_FIELD, constants.ADDRESS_FIELD),
+        meters=constants.METERS,
+        services=constants.DEFAULT_SERVICES + constants.EXTRA_SERVICES,
+        texts=constants.CATALOG.texts,
+    )
+
+
+def edge_payloads() -> List[Dict[str, Any]]:
+    base = building_payloads(1)[0]
+    variants = [
+        {'hot_tariff': Decimal(0), 'heat_tariff': Decimal(0)},
+        {'apartment_area': Decimal(0), 'rent_tariff': Decimal(0)},
+        {'hot_curr': base['hot_prev'] - Decimal('1.5'), 'cold_curr': base['cold_prev'] - Decimal('0.001')},
+        {'hot_curr': base['hot_prev'], 'cold_prev': Decimal('-0'), 'cold_curr': Decimal('-0')},
+        {'cold_tariff': Decimal('3.0384E+1'), 'apartment_area': Decimal('6.81E1'), 'cold_curr': Decimal('1.3E+2')},
+        {'cold_tariff': Decimal('30.38400'), 'hot_tariff': Decimal('99.500'), 'apartment_area': Decimal('68.100')},
+        {'cold_prev': Decimal('0.0005'), 'cold_curr': Decimal('0.0015'), 'rent_tariff': Decimal('0.005')},
+        {'heat_tariff': Decimal('-1'), 'hot_tariff': Decimal('-99.5')},
+        {'apartment_area': Decimal('1E+3'), 'heat_tariff': Decimal('1234567.891')},
+        {'full_name': 'Ім{я} з дужками', 'address': "вул. О'Коннора, 1", 'period': {'month': 12, 'year': 2025}},
+    ]
+    return [{**base, **variant} for variant in variants]
+
+
+def _mismatches(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    catalog = PaymentCalculator()
+    hand = HandWrittenCalculator()
+    extended = _extended_catalog()
+    fmt = catalog.formatter
+    found: List[Dict[str, Any]] = []
+    for index, payload in enumerate(payloads):
+        for method in ('details', 'summary', 'brief', 'amounts'):
+            got, expected = getattr(catalog, method)(payload), getattr(hand, method)(payload)
+            if got != expected or repr(got) != repr(expected):
+                found.append({'payload': index, 'method': method, 'catalog': repr(got), 'hand_written': repr(expected)})
+        zero_extras = {**payload, **{key: Decimal(0) for key in EXTRA_INPUTS}}
+        sections = extended.sections(zero_extras, fmt.quantity, fmt.tariff, fmt.money, CalculationSection)
+        bodies = [section.body for section in sections]
+        if bodies != [section.body for section in hand.sections(payload)]:
+            found.append({'payload': index, 'method': 'extended.sections', 'catalog': repr(bodies)})
+    return found
+
+
+def _best(func: Callable[[Dict[str, Any]], Any], payloads: List[Dict[str, Any]], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for payload in payloads:
+            func(payload)
+        best = min(best, time.perf_counter() - started)
+    return round(best / len(payloads) * 1e6, 2)
+
+
+def run(count: int, repeat: int) -> Dict[str, Any]:
+    payloads = building_payloads(count)
+    rng = random.Random(3)
+    checked = payloads + edge_payloads() + [
+        {**payload, 'hot_tariff': rng.choice([Decimal(0), payload['hot_tariff']])} for payload in payloads
+    ]
+    mismatches = _mismatches(checked)
+
+    catalog = PaymentCalculator()
+    hand = HandWrittenCalculator()
+    timings: Dict[str, Dict[str, float]] = {}
+    for method in ('details', 'sections', 'amounts', 'summary'):
+        hand_us = _best(getattr(hand, method), payloads, repeat)
+        catalog_us = _best(getattr(catalog, method), payloads, repeat)
+        timings[method] = {'hand_written_us': hand_us, 'catalog_us': catalog_us, 'ratio': round(catalog_us / hand_us, 3)}
+
+    extended = _extended_catalog()
+    fmt = catalog.formatter
+    extended_payloads = [{**payload, **EXTRA_INPUTS} for payload in payloads]
+    timings['extended'] = {
+        'services': len(extended.services),
+        'sections_us': _best(
+            lambda payload: extended.sections(payload, fmt.quantity, fmt.tariff, fmt.money, CalculationSection),
+            extended_payloads, repeat,
+        ),
+        'amounts_us': _best(extended.amounts, extended_payloads, repeat),
+    }
+    started = time.perf_counter()
+    _extended_catalog()
+    return {
+        'payloads': count,
+        'checked': len(checked),
+        'mismatches': mismatches[:10],
+        'mismatch_count': len(mismatches),
+        'compile_extended_ms': round((time.perf_counter() - started) * 1000, 2),
+        'timings': timings,
+        'ok': not mismatches,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payloads', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args(argv)
+    report = run(args.payloads, args.repeat)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not report['ok']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Вартість прибирання покинутих сесій: тік колеса таймерів проти повного перебору всіх сесій.
+
+Сесії отримують звернення з рівномірно розподіленим часом, далі годинник іде тіками по ``idle_ttl / 64``.
+Для кожного тіку міряється час ``SessionLifecycle.sweep`` і час наївного перебору ``last_seen`` усіх сесій
+у двох сценаріях: ``abandoned`` — ніхто не повертається і за тік спливає 1/64 сесій; ``active`` — усі
+сесії отримують звернення щотіку, тож колесо лише переставляє ключі свого кошика. Окремо міряються
+накладні витрати обгортки на одне звернення ``get_state``.
+
+Запуск: ``python -m benchmarks.session_lifecycle --sessions 100000``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot.storage.lifecycle import WHEEL_SLOTS, SessionLifecycle
+
+
+IDLE_TTL = 3600.0
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _keys(sessions: int) -> List[StorageKey]:
+    return [StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id) for chat_id in range(sessions)]
+
+
+async def _populate(lifecycle: SessionLifecycle, clock: _Clock, keys: List[StorageKey]) -> None:
+    # Звернення рівномірно розкидані на один TTL, тож за тік спливає приблизно 1/64 сесій.
+    step = IDLE_TTL / len(keys)
+    for key in keys:
+        clock.now += step
+        await lifecycle.set_state(key, 'Form:collecting')
+
+
+async def _sweep_costs(sessions: int, ticks: int, keep_alive: bool) -> Dict[str, float]:
+    clock = _Clock()
+    lifecycle = SessionLifecycle(MemoryStorage(), idle_ttl=IDLE_TTL, clock=clock)
+    keys = _keys(sessions)
+    await _populate(lifecycle, clock, keys)
+    # Заповнення пройшло без тіків колеса; перший прохід розкладає ключі по справжніх дедлайнах.
+    await lifecycle.sweep()
+    tick = IDLE_TTL / WHEEL_SLOTS
+    wheel_s = scan_s = 0.0
+    evicted = 0
+    for _ in range(ticks):
+        clock.now += tick
+        if keep_alive:
+            for key in keys:
+                await lifecycle.get_state(key)
+        # Наївний варіант: перебрати всі сесії й знайти прострочені (без самого видалення).
+        started = time.perf_counter()
+        deadline = clock.now - IDLE_TTL
+        [key for key, seen in lifecycle._last_seen.items() if seen <= deadline]
+        scan_s += time.perf_counter() - started
+
+        started = time.perf_counter()
+        evicted += await lifecycle.sweep()
+        wheel_s += time.perf_counter() - started
+    return {
+        'evicted_per_tick': round(evicted / ticks, 1),
+        'wheel_ms_per_tick': round(wheel_s / ticks * 1000, 3),
+        'full_scan_ms_per_tick': round(scan_s / ticks * 1000, 3),
+    }
+
+
+async def _touch_overhead(sessions: int) -> Dict[str, float]:
+    keys = _keys(sessions)
+    plain = MemoryStorage()
+    clock = _Clock()
+    wrapped = SessionLifecycle(MemoryStorage(), idle_ttl=IDLE_TTL, max_sessions=sessions, clock=clock)
+    for key in keys:
+        await plain.set_state(key, 'Form:collecting')
+        await wrapped.set_state(key, 'Form:collecting')
+    result = {}
+    for name, storage in (('memory_us', plain), ('lifecycle_us', wrapped)):
+        started = time.perf_counter()
+        for key in keys:
+            await storage.get_state(key)
+        result[name] = round((time.perf_counter() - started) / sessions * 1e6, 3)
+    return result
+
+
+def run(sessions: int, ticks: int) -> Dict[str, Any]:
+    return {
+        'sessions': sessions,
+        'ticks': ticks,
+        'sweep_abandoned': asyncio.run(_sweep_costs(sessions, ticks, keep_alive=False)),
+        'sweep_active': asyncio.run(_sweep_costs(sessions, ticks, keep_alive=True)),
+        'get_state': asyncio.run(_touch_overhead(sessions)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=100_000)
+    parser.add_argument('--ticks', type=int, default=WHEEL_SLOTS)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sessions, args.ticks), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
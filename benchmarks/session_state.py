@@ -0,0 +1,117 @@
+"""Порівнює представлення незавершеної сесії: старий словник ``payload`` і двійковий ``session_codec``.
+
+Для кожного представлення міряються пам'ять на сесію (tracemalloc, сесії на всіх кроках діалогу
+порівну), розмір запису в SQLite і час запису/читання стану на одному оновленні.
+
+Запуск: ``python -m benchmarks.session_state --sessions 20000``
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.hot_path import STEP_INPUTS
+from bot.dialogue import constants
+from bot.dialogue.flow import DialogueState, PaymentFlow
+from bot.storage import serialization
+from bot.storage.session_codec import dump_session, load_session
+
+
+def _flow_at(step_index: int) -> PaymentFlow:
+    """Свіжий діалог на кроці ``step_index`` — з власними об'єктами значень, як у реальних чатах."""
+    flow = PaymentFlow()
+    for step in constants.STEP_ORDER[:step_index]:
+        flow.process(STEP_INPUTS[step])
+    return flow
+
+
+def legacy_data(flow: PaymentFlow) -> Dict[str, Any]:
+    """FSM-дані у форматі до ``session_codec``."""
+    return {'payload': flow.payload, 'step_index': flow.step_index, 'step': flow.current_step}
+
+
+def _memory_per_session(sessions: int, build: Callable[[PaymentFlow], Any]) -> float:
+    steps = len(constants.STEP_ORDER)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept: List[Any] = [build(_flow_at(index % steps)) for index in range(sessions)]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used / sessions
+
+
+def _per_call_us(func: Callable[[], Any], number: int) -> float:
+    best = float('inf')
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+def run(sessions: int, number: int) -> Dict[str, Any]:
+    flows = [_flow_at(index) for index in range(len(constants.STEP_ORDER))]
+    legacy = [legacy_data(flow) for flow in flows]
+    compact = [dump_session(flow.state) for flow in flows]
+    legacy_json = [serialization.dumps(data) for data in legacy]
+    compact_json = [serialization.dumps(data) for data in compact]
+
+    def legacy_update() -> None:
+        # Старий шлях обробника: копія FSM-даних, відновлення стану, запис payload назад.
+        for data in legacy:
+            restored = dict(data)
+            state = DialogueState(int(restored.get('step_index', 0)), dict(restored.get('payload') or {}))
+            restored.update(payload=state.payload, step_index=state.step_index, step='x')
+
+    def compact_update() -> None:
+        for data in compact:
+            dump_session(load_session(data))
+
+    def legacy_sqlite() -> None:
+        for raw in legacy_json:
+            serialization.dumps(serialization.loads(raw))
+
+    def compact_sqlite() -> None:
+        for raw in compact_json:
+            serialization.dumps(serialization.loads(raw))
+
+    steps = len(flows)
+    return {
+        'sessions': sessions,
+        'bytes_per_session': {
+            'legacy_dict': round(_memory_per_session(sessions, legacy_data)),
+            'slots_state': round(_memory_per_session(sessions, lambda flow: flow.state)),
+            'codec': round(_memory_per_session(sessions, lambda flow: dump_session(flow.state))),
+        },
+        'sqlite_record_bytes': {
+            'legacy_json': round(sum(len(raw.encode()) for raw in legacy_json) / steps),
+            'codec_json': round(sum(len(raw.encode()) for raw in compact_json) / steps),
+            'codec_raw': round(sum(len(data['session']) for data in compact) / steps),
+        },
+        'us_per_update': {
+            'legacy_memory': round(_per_call_us(legacy_update, number) / steps, 2),
+            'codec_memory': round(_per_call_us(compact_update, number) / steps, 2),
+            'legacy_sqlite_json': round(_per_call_us(legacy_sqlite, number) / steps, 2),
+            'codec_sqlite_json': round(_per_call_us(compact_sqlite, number) / steps, 2),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--number', type=int, default=500, help='Повторів одного виміру часу')
+    args = parser.parse_args()
+    print(json.dumps(run(args.sessions, args.number), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Показує, як пропускна здатність режиму супервізора зростає з кількістю воркерів.
+
+Кожен віртуальний чат проходить повний діалог (``/start`` і 12 відповідей). Оновлення подаються прямо в
+``Supervisor.route``, а воркери відповідають через сесію без мережі, яка лише серіалізує запит і розбирає
+типову відповідь Bot API, — тож вимірюється процесорна робота бота, а не мережа.
+
+Запуск: ``python -m benchmarks.sharding --chats 2000 --workers 1,2,4``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from benchmarks.fake_telegram import make_message_update
+from benchmarks.hot_path import STEP_INPUTS
+from bot.config import Settings
+from bot.dialogue import constants
+from bot.sharding import Supervisor
+
+
+RESULTS_ENV = 'SHARDING_BENCH_RESULTS'
+BOT_FACTORY = 'benchmarks.sharding:build_null_bot'
+
+
+class NullSession(BaseSession):
+    """Сесія без мережі: рахує виклики й повертає відповіді у форматі Bot API."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: Dict[str, int] = {}
+        self._message_id = 0
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None) -> TelegramType:
+        name = method.__api_method__
+        self.calls[name] = self.calls.get(name, 0) + 1
+        # Та сама підготовка полів, що й у AiohttpSession.build_form_data.
+        payload = {}
+        for key, value in method.model_dump(warnings=False).items():
+            value = self.prepare_value(value, bot=bot, files={})
+            if value:
+                payload[key] = value
+        self._message_id += 1
+        result: Any = True
+        if name == 'sendMessage':
+            result = {
+                'message_id': self._message_id,
+                'date': int(time.time()),
+                'chat': {'id': int(payload['chat_id']), 'type': 'private'},
+                'text': payload['text'],
+            }
+        response = self.check_response(bot, method, 200, self.json_dumps({'ok': True, 'result': result}))
+        return response.result  # type: ignore[return-value]
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> Any:  # pragma: no cover - не використовується
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        results = os.environ.get(RESULTS_ENV)
+        if results:
+            Path(results, f'{os.getpid()}.json').write_text(json.dumps(self.calls), encoding='utf-8')
+
+
+def build_null_bot(settings: Settings) -> Bot:
+    from bot.main import build_bot
+
+    bot = build_bot(settings)
+    session = NullSession()
+    for middleware in bot.session.middleware:
+        session.middleware(middleware)
+    bot.session = session
+    return bot
+
+
+def dialogue_updates(chats: int, chat_base: int = 1_000_000) -> List[Dict[str, Any]]:
+    """Оновлення всіх діалогів, перемежовані по кроках, як при одночасній роботі користувачів."""
+    texts = ['/start'] + [STEP_INPUTS[step] for step in constants.STEP_ORDER]
+    updates = []
+    update_id = 1
+    for text in texts:
+        for chat in range(chats):
+            updates.append(make_message_update(update_id, chat_base + chat, text))
+            update_id += 1
+    return updates
+
+
+async def measure(workers: int, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    settings = Settings(
+        bot_token='42:fake-token',
+        send_global_rate=1e9,
+        send_chat_rate=1e9,
+        send_chat_burst=1e9,
+    )
+    with tempfile.TemporaryDirectory() as results:
+        os.environ[RESULTS_ENV] = results
+        supervisor = Supervisor(settings, workers, bot_factory=BOT_FACTORY)
+        supervisor.start()
+        await supervisor.wait_ready()
+        started = time.perf_counter()
+        per_worker = [0] * workers
+        for update in updates:
+            per_worker[supervisor.route(update)] += 1
+        await supervisor.stop(timeout=600)
+        duration = time.perf_counter() - started
+        sent = sum(json.loads(path.read_text()).get('sendMessage', 0) for path in Path(results).glob('*.json'))
+    return {
+        'workers': workers,
+        'updates': len(updates),
+        'duration_s': round(duration, 3),
+        'updates_per_s': round(len(updates) / duration, 1),
+        'send_message_calls': sent,
+        'updates_per_worker': per_worker,
+    }
+
+
+async def run(chats: int, levels: List[int]) -> Dict[str, Any]:
+    updates = dialogue_updates(chats)
+    reports = [await measure(workers, updates) for workers in levels]
+    base = reports[0]['updates_per_s'] / reports[0]['workers']
+    for report in reports:
+        report['scaling_efficiency'] = round(report['updates_per_s'] / (base * report['workers']), 2)
+    return {'chats': chats, 'cpu_count': os.cpu_count(), 'levels': reports}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chats', type=int, default=2000)
+    parser.add_argument('--workers', default='1,2,4', help='Кількість воркерів для порівняння, через кому')
+    args = parser.parse_args()
+    levels = [int(part) for part in args.workers.split(',') if part.strip()]
+    print(json.dumps(asyncio.run(run(args.chats, levels)), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
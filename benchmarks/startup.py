@@ -0,0 +1,71 @@
+"""Бюджет холодного старту: час ``import bot.main`` і модулі, які на старті не повинні імпортуватися.
+
+Запуск:
+``python -m benchmarks.startup run`` — звіт про вартість імпортів за пакетами й модулями бота;
+``python -m benchmarks.startup check`` — порівняти з ``benchmarks/startup_budget.json`` і завершитися з
+кодом 1, якщо бюджет перевищено або на старті підтягнуто відкладений модуль (для CI).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from bot.startup import ImportRecord, format_report, measure_imports, total_us
+
+
+DEFAULT_BUDGET = Path('benchmarks/startup_budget.json')
+
+
+def measure(repeat: int) -> Dict[str, Any]:
+    """Медіана ``repeat`` запусків: загальний час, власний час модулів бота і список імпортованих модулів."""
+    runs: List[List[ImportRecord]] = [measure_imports() for _ in range(repeat)]
+    return {
+        'total_ms': round(statistics.median(total_us(records) for records in runs) / 1000, 1),
+        'bot_ms': round(statistics.median(
+            sum(record.self_us for record in records if record.package == 'bot') for records in runs
+        ) / 1000, 1),
+        'modules': sorted({record.module for record in runs[-1]}),
+        'report': format_report(runs[-1]),
+    }
+
+
+def check(result: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    problems = []
+    if result['total_ms'] > budget['total_ms']:
+        problems.append(f"import bot.main: {result['total_ms']} мс > бюджет {budget['total_ms']} мс")
+    if result['bot_ms'] > budget['bot_ms']:
+        problems.append(f"власні модулі бота: {result['bot_ms']} мс > бюджет {budget['bot_ms']} мс")
+    loaded = set(result['modules'])
+    for module in budget.get('deferred', ()):
+        if module in loaded:
+            problems.append(f'{module} імпортується на старті, хоча має імпортуватися лише за потреби')
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Кількість запусків інтерпретатора, береться медіана')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('run')
+    check_parser = subparsers.add_parser('check')
+    check_parser.add_argument('budget', type=Path, nargs='?', default=DEFAULT_BUDGET)
+    args = parser.parse_args(argv)
+
+    result = measure(args.repeat)
+    print(result['report'])
+    print(f"\nМедіана за {args.repeat} запусків: {result['total_ms']} мс, з них модулі бота — {result['bot_ms']} мс")
+    if args.command == 'run':
+        return 0
+
+    problems = check(result, json.loads(args.budget.read_text(encoding='utf-8')))
+    for problem in problems:
+        print(f'ПЕРЕВИЩЕНО: {problem}')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
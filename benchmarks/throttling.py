@@ -0,0 +1,118 @@
+"""Вартість захисту від флуду на одне оновлення і пам'ять лічильників.
+
+Міряється виклик ``ThrottlingMiddleware`` з порожнім обробником у сценаріях: ``baseline`` — обробник без
+middleware; ``allowed`` — багато користувачів у межах ліміту; ``flood`` — один користувач шле без
+перерви, і майже все відкидається; ``unique_flood`` — кожне оновлення від нового користувача, тож
+лічильник упирається в ``max_keys``. Годинник штучний і проходить ``--windows`` вікон за прогін, щоб у
+вимір потрапила і зміна вікон. Окремо — розмір словників лічильника на ``--users`` активних ключів.
+
+Запуск: ``python -m benchmarks.throttling --updates 200000 --users 10000``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.fakes import FakeMessage
+from bot.throttling import SlidingWindowCounter, ThrottlingMiddleware
+
+
+WINDOW = 10.0
+USER_LIMIT = 20
+CHAT_LIMIT = 30
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _handler(event: Any, data: Dict[str, Any]) -> None:
+    return None
+
+
+def _middleware(clock: _Clock, max_keys: int) -> ThrottlingMiddleware:
+    return ThrottlingMiddleware(
+        per_user=SlidingWindowCounter(USER_LIMIT, WINDOW, max_keys=max_keys, clock=clock),
+        per_chat=SlidingWindowCounter(CHAT_LIMIT, WINDOW, max_keys=max_keys, clock=clock),
+    )
+
+
+async def _per_update_ns(events: List[FakeMessage], windows: int, max_keys: int, wrapped: bool) -> Dict[str, Any]:
+    clock = _Clock()
+    middleware = _middleware(clock, max_keys)
+    step = WINDOW * windows / len(events)
+    data: Dict[str, Any] = {}
+    started = time.perf_counter()
+    for event in events:
+        clock.now += step
+        if wrapped:
+            await middleware(_handler, event, data)
+        else:
+            await _handler(event, data)
+    elapsed = time.perf_counter() - started
+    replies = sum(len(event.answers) for event in set(events))
+    return {'ns_per_update': round(elapsed / len(events) * 1e9), 'slow_down_replies': replies}
+
+
+def _dict_bytes(counter: SlidingWindowCounter) -> int:
+    return sum(sys.getsizeof(table) for table in (counter._current, counter._previous, counter._warned))
+
+
+def _memory(users: int) -> Dict[str, Any]:
+    clock = _Clock()
+    counter = SlidingWindowCounter(USER_LIMIT, WINDOW, clock=clock)
+    for user_id in range(users):
+        counter.hit(user_id)
+    # Наступне вікно: усі ключі переходять у попереднє, поточне заповнюється заново.
+    clock.now += WINDOW
+    for user_id in range(users):
+        counter.hit(user_id)
+    size = _dict_bytes(counter)
+    clock.now += 2 * WINDOW
+    counter.hit(0)
+    return {
+        'active_keys': users,
+        'bytes_two_windows': size,
+        'bytes_per_key': round(size / users, 1),
+        'keys_after_idle_windows': len(counter),
+    }
+
+
+def run(updates: int, users: int, windows: int, max_keys: int) -> Dict[str, Any]:
+    # У межах ліміту: кожен користувач пише рівно раз на вікно.
+    spread = [FakeMessage('1', user_id=index % users) for index in range(updates)]
+    single = FakeMessage('1', user_id=1)
+    flood = [single] * updates
+    unique = [FakeMessage('1', user_id=index) for index in range(updates)]
+    return {
+        'updates': updates,
+        'window_s': WINDOW,
+        'limits': {'user': USER_LIMIT, 'chat': CHAT_LIMIT},
+        'baseline': asyncio.run(_per_update_ns(spread, windows, max_keys, wrapped=False)),
+        'allowed': asyncio.run(_per_update_ns(spread, windows, max_keys, wrapped=True)),
+        'flood': asyncio.run(_per_update_ns(flood, windows, max_keys, wrapped=True)),
+        'unique_flood': asyncio.run(_per_update_ns(unique, windows, max_keys, wrapped=True)),
+        'memory': _memory(users),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', type=int, default=200_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--windows', type=int, default=20, help='Скільки вікон проходить годинник за прогін')
+    parser.add_argument('--max-keys', type=int, default=100_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.updates, args.users, args.windows, args.max_keys), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Порівнює наскрізну затримку відповіді у режимах polling і webhook.
+
+Запуск: ``python -m benchmarks.webhook_latency --messages 400 --concurrency 20 --network-delay 0.02``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import random
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from aiogram import Dispatcher
+from aiohttp import ClientSession, web
+
+from benchmarks.fake_telegram import FakeTelegramServer, make_message_update
+from bot.config import Settings, WEBHOOK_MODE
+from bot.handlers import router
+from bot.webhook import build_webhook_app
+
+
+WEBHOOK_PORT = 18081
+WEBHOOK_SECRET = 'bench-secret'
+
+Deliver = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+    }
+
+
+async def _drive(server: FakeTelegramServer, deliver: Deliver, messages: int, concurrency: int, chat_base: int) -> List[float]:
+    """Кожен віртуальний користувач надсилає /start, чекає обидві відповіді й робить коротку паузу."""
+    update_ids = itertools.count(1)
+    samples: List[float] = []
+    per_user = max(1, messages // concurrency)
+    rng = random.Random(chat_base)
+
+    async def user(chat_id: int) -> None:
+        for _ in range(per_user):
+            await asyncio.sleep(rng.uniform(0, 0.01))
+            welcome = server.wait_for_message(chat_id)
+            prompt = server.wait_for_message(chat_id)
+            started = time.perf_counter()
+            await deliver(make_message_update(next(update_ids), chat_id, '/start'))
+            sent = await asyncio.wait_for(welcome, timeout=10)
+            samples.append(sent.received_at - started)
+            await asyncio.wait_for(prompt, timeout=10)
+
+    await asyncio.gather(*(user(chat_base + index) for index in range(concurrency)))
+    return samples
+
+
+async def _measure_polling(dp: Dispatcher, server: FakeTelegramServer, messages: int, concurrency: int) -> List[float]:
+    bot = server.build_bot()
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, polling_timeout=10))
+
+    async def deliver(update: Dict[str, Any]) -> None:
+        server.push_update(update)
+
+    try:
+        await asyncio.sleep(0.2)
+        return await _drive(server, deliver, messages, concurrency, chat_base=10_000)
+    finally:
+        await server.drain()
+        await dp.stop_polling()
+        with contextlib.suppress(Exception):
+            await polling
+        await bot.session.close()
+
+
+async def _measure_webhook(dp: Dispatcher, server: FakeTelegramServer, messages: int, concurrency: int) -> List[float]:
+    bot = server.build_bot()
+    settings = Settings(
+        bot_token=bot.token,
+        mode=WEBHOOK_MODE,
+        webhook_secret=WEBHOOK_SECRET,
+        webhook_host='127.0.0.1',
+        webhook_port=WEBHOOK_PORT,
+    )
+    app = build_webhook_app(dp, bot, settings)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=settings.webhook_host, port=settings.webhook_port).start()
+    url = f'http://{settings.webhook_host}:{settings.webhook_port}{settings.webhook_path}'
+    try:
+        async with ClientSession() as session:
+
+            async def deliver(update: Dict[str, Any]) -> None:
+                await server.deliver_webhook(session, url, update, WEBHOOK_SECRET)
+
+            return await _drive(server, deliver, messages, concurrency, chat_base=20_000)
+    finally:
+        await server.drain()
+        await runner.cleanup()
+
+
+async def run(messages: int, concurrency: int, network_delay: float) -> Dict[str, Dict[str, float]]:
+    server = FakeTelegramServer(network_delay=network_delay, record=False)
+    await server.start()
+    dp = Dispatcher()
+    dp.include_router(router)
+    try:
+        polling = await _measure_polling(dp, server, messages, concurrency)
+        webhook = await _measure_webhook(dp, server, messages, concurrency)
+    finally:
+        await server.stop()
+    report = {'polling': _summarize(polling), 'webhook': _summarize(webhook)}
+    report['gain'] = {
+        'p50_ms': report['polling']['p50_ms'] - report['webhook']['p50_ms'],
+        'p99_ms': report['polling']['p99_ms'] - report['webhook']['p99_ms'],
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--network-delay', type=float, default=0.02, help='Імітована одностороння мережева затримка, с')
+    args = parser.parse_args()
+    report = asyncio.run(run(args.messages, args.concurrency, args.network_delay))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Пакетний розрахунок платежів із CSV-файлу.
+
+Вхідний CSV має заголовок із полями діалогу: ``full_name``, ``period`` (MM-YYYY), ``address``,
+``hot_prev``, ``hot_curr``, ``cold_prev``, ``cold_curr``, ``cold_tariff``, ``hot_tariff``,
+``rent_tariff``, ``heat_tariff``, ``apartment_area``. Інші колонки переносяться у результат без змін.
+
+Запуск: ``python -m bot.batch input.csv -o output.csv [--format csv|text]``
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from bot.dialogue import constants
+from bot.dialogue.calculator import PaymentCalculator
+from bot.dialogue.flow import PaymentFlow
+
+
+CSV_FORMAT = 'csv'
+TEXT_FORMAT = 'text'
+RESULT_COLUMNS = ['details', 'summary', 'error']
+INPUT_COLUMNS = [constants.STEP_PAYLOAD_KEYS[step] for step in constants.STEP_ORDER]
+
+
+class BatchRowError(ValueError):
+    """Рядок CSV не пройшов ту саму валідацію, що й діалог."""
+
+    def __init__(self, line: int, field: str, message: str) -> None:
+        super().__init__(f'Рядок {line}, поле {field}: {message}')
+        self.line = line
+        self.field = field
+        self.message = message
+
+
+@dataclass
+class BatchRow:
+    line: int
+    source: Dict[str, str]
+    payload: Optional[Dict[str, Any]] = None
+    error: Optional[BatchRowError] = None
+
+
+def payload_from_row(row: Dict[str, str], line: int = 0) -> Dict[str, Any]:
+    """Проганяє значення рядка через ``PaymentFlow``, щоб правила валідації збігалися з діалогом."""
+    flow = PaymentFlow()
+    for step in constants.STEP_ORDER:
+        field = constants.STEP_PAYLOAD_KEYS[step]
+        value = row.get(field)
+        if value is None:
+            raise BatchRowError(line, field, 'відсутня колонка')
+        result = flow.process(value)
+        if not result.success:
+            raise BatchRowError(line, field, result.error or 'некоректне значення')
+    return flow.payload
+
+
+def check_header(fieldnames: Optional[Iterable[str]]) -> None:
+    """Перевіряє заголовок CSV одразу, ще до першого рядка та до запису результату."""
+    present = set(fieldnames or [])
+    missing = [column for column in INPUT_COLUMNS if column not in present]
+    if missing:
+        raise BatchRowError(1, ', '.join(missing), 'відсутні колонки у заголовку')
+
+
+def read_rows(reader: csv.DictReader) -> Iterator[BatchRow]:
+    check_header(reader.fieldnames)
+    for row in reader:
+        line = reader.line_num
+        try:
+            yield BatchRow(line=line, source=row, payload=payload_from_row(row, line))
+        except BatchRowError as exc:
+            yield BatchRow(line=line, source=row, error=exc)
+
+
+class BatchEngine:
+    """Рахує великі набори payload ліниво, тримаючи в пам'яті лише поточний рядок."""
+
+    def __init__(self, calculator: PaymentCalculator | None = None) -> None:
+        self.calculator = calculator or PaymentCalculator()
+
+    def calculate(self, rows: Iterable[BatchRow]) -> Iterator[Dict[str, str]]:
+        for row in rows:
+            if row.payload is None:
+                yield {**row.source, 'details': '', 'summary': '', 'error': str(row.error)}
+                continue
+            details = self.calculator.details(row.payload)
+            summary = self.calculator.summary(row.payload)
+            yield {**row.source, 'details': details, 'summary': summary, 'error': ''}
+
+
+def write_csv(results: Iterable[Dict[str, str]], stream: TextIO, fieldnames: List[str], delimiter: str = ',') -> int:
+    writer = csv.DictWriter(stream, fieldnames=fieldnames + RESULT_COLUMNS, delimiter=delimiter, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for result in results:
+        writer.writerow(result)
+        count += 1
+    return count
+
+
+def write_text(results: Iterable[Dict[str, str]], stream: TextIO) -> int:
+    count = 0
+    for result in results:
+        if count:
+            stream.write('\n\n' + '=' * 20 + '\n\n')
+        if result['error']:
+            stream.write(f"❌ {result['error']}")
+        else:
+            stream.write(result['details'] + '\n\n' + result['summary'])
+        count += 1
+    stream.write('\n')
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m bot.batch', description='Пакетний розрахунок комунальних платежів із CSV.')
+    parser.add_argument('input', help='Вхідний CSV або "-" для stdin')
+    parser.add_argument('-o', '--output', default='-', help='Файл результату або "-" для stdout')
+    parser.add_argument('--format', choices=[CSV_FORMAT, TEXT_FORMAT], default=CSV_FORMAT)
+    parser.add_argument('--delimiter', default=',')
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8-sig')
+    target: Optional[TextIO] = None
+    try:
+        reader = csv.DictReader(source, delimiter=args.delimiter)
+        # Заголовок перевіряється до відкриття -o: інакше файл результату вже обрізаний і з шапкою.
+        check_header(reader.fieldnames)
+        target = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+        results = BatchEngine().calculate(read_rows(reader))
+        if args.format == CSV_FORMAT:
+            write_csv(results, target, list(reader.fieldnames or []), delimiter=args.delimiter)
+        else:
+            write_text(results, target)
+    except BatchRowError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not None and target is not sys.stdout:
+            target.close()
+    return 0
+
+
+__all__ = [
+    'BatchEngine',
+    'BatchRow',
+    'BatchRowError',
+    'check_header',
+    'payload_from_row',
+    'read_rows',
+    'write_csv',
+    'write_text',
+]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Обмежений кеш результатів асинхронних обчислень з об'єднанням однакових запитів."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+from bot import metrics
+
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+CACHE_JOINED = 'joined'
+
+
+class SingleFlightCache(Generic[K, V]):
+    """LRU-кеш на ``maxsize`` ключів.
+
+    Поки значення для ключа обчислюється, інші запити з тим самим ключем чекають на те саме
+    обчислення, а не запускають своє. Винятки не кешуються: наступний запит обчислює заново.
+    """
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError('Розмір кешу має бути додатним')
+        self.name = name
+        self.maxsize = maxsize
+        self._values: OrderedDict[K, V] = OrderedDict()
+        self._pending: Dict[K, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    async def get(self, key: K, compute: Callable[[], Awaitable[V]]) -> V:
+        values = self._values
+        if key in values:
+            values.move_to_end(key)
+            metrics.CACHE_REQUESTS.inc(self.name, CACHE_HIT)
+            return values[key]
+        pending = self._pending.get(key)
+        if pending is not None:
+            metrics.CACHE_REQUESTS.inc(self.name, CACHE_JOINED)
+            # shield: скасування одного з тих, хто чекає, не скасовує спільне обчислення.
+            return await asyncio.shield(pending)
+
+        metrics.CACHE_REQUESTS.inc(self.name, CACHE_MISS)
+        future: asyncio.Future[V] = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await compute()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                # Позначає виняток отриманим, навіть якщо ніхто інший не чекав.
+                future.exception()
+            raise
+        finally:
+            del self._pending[key]
+        future.set_result(value)
+        values[key] = value
+        if len(values) > self.maxsize:
+            values.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+__all__ = ['SingleFlightCache']
@@ -4,9 +4,16 @@ import os
 from dataclasses import dataclass
 from typing import Optional
 
-from dotenv import load_dotenv
+POLLING_MODE = 'polling'
+WEBHOOK_MODE = 'webhook'
+BOT_MODES = (POLLING_MODE, WEBHOOK_MODE)
+MESSAGES_UI = 'messages'
+PANEL_UI = 'panel'
+DIALOGUE_UIS = (MESSAGES_UI, PANEL_UI)
 
-load_dotenv()
+MEMORY_STORAGE = 'memory'
+SQLITE_STORAGE = 'sqlite'
+FSM_STORAGES = (MEMORY_STORAGE, SQLITE_STORAGE)
 
 
 @dataclass(frozen=True)
@@ -15,14 +22,228 @@ class Settings:
 
     bot_token: str
     parse_mode: Optional[str] = None
+    mode: str = POLLING_MODE
+    webhook_url: Optional[str] = None
+    webhook_path: str = '/webhook'
+    webhook_secret: Optional[str] = None
+    webhook_host: str = '0.0.0.0'
+    webhook_port: int = 8080
+    webhook_max_workers: int = 64
+    fsm_storage: str = MEMORY_STORAGE
+    fsm_db_path: str = 'data/fsm.sqlite3'
+    fsm_flush_interval: float = 0.05
+    metrics_port: Optional[int] = None
+    metrics_host: str = '0.0.0.0'
+    metrics_path: str = '/metrics'
+    send_global_rate: float = 30.0
+    send_chat_rate: float = 1.0
+    send_chat_burst: float = 3.0
+    workers: int = 1
+    tariffs_path: str = 'data/tariffs.json'
+    tariffs_reload_interval: float = 30.0
+    session_idle_ttl: float = 86400.0
+    session_max: int = 100_000
+    session_expired_notice: bool = True
+    inline_cache_time: int = 300
+    receipt_workers: int = 2
+    receipt_queue_limit: int = 8
+    receipt_font_path: str = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+    throttle_window: float = 10.0
+    throttle_user_limit: int = 20
+    throttle_chat_limit: int = 30
+    dedup_ttl: float = 600.0
+    dedup_capacity: int = 100_000
+    dialogue_ui: str = MESSAGES_UI
+    panel_edit_delay: float = 0.3
+    trace_sample_rate: float = 0.0
+    trace_path: str = 'data/traces.jsonl'
+    trace_flush_interval: float = 1.0
+    remind_rate: float = 5.0
+    remind_batch: int = 100
+    remind_window_start: int = 10
+    remind_window_end: int = 20
+    remind_utc_offset: float = 2.0
+
+    @property
+    def metrics_on_webhook_server(self) -> bool:
+        """Метрики віддає сам webhook-сервер, якщо для них указано той самий порт."""
+        return self.mode == WEBHOOK_MODE and self.metrics_port == self.webhook_port
+
+
+def _int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError as exc:
+        raise RuntimeError(f'Переменная {name} должна быть целым числом, получено {raw!r}') from exc
+
+
+def _path_env(name: str, default: str) -> str:
+    path = os.getenv(name) or default
+    if not path.startswith('/'):
+        path = '/' + path
+    return path
+
+
+def _float_env(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError as exc:
+        raise RuntimeError(f'Переменная {name} должна быть числом, получено {raw!r}') from exc
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    raw = (os.getenv(name) or '').strip().lower()
+    if not raw:
+        return default
+    if raw in ('1', 'true', 'yes', 'on'):
+        return True
+    if raw in ('0', 'false', 'no', 'off'):
+        return False
+    raise RuntimeError(f'Переменная {name} должна быть логическим значением (1/0, true/false), получено {raw!r}')
+
+
+def _choice_env(name: str, default: str, choices: tuple[str, ...]) -> str:
+    value = (os.getenv(name) or default).strip().lower()
+    if value not in choices:
+        raise RuntimeError(f'Неизвестное значение {name}={value!r}, допустимые значения: {", ".join(choices)}')
+    return value
 
 
 def get_settings() -> Settings:
-    """Читает настройки из окружения и валидирует обязательные поля."""
+    """Читает настройки из окружения (и файла ``.env``) и валидирует обязательные поля."""
+    # .env читается здесь, а не при импорте модуля: импорт остаётся дешёвым и не трогает диск.
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
     token = os.getenv('BOT_TOKEN')
     if not token:
         raise RuntimeError('Не указан BOT_TOKEN в переменных окружения или .env файле')
 
     parse_mode = os.getenv('BOT_PARSE_MODE') or None
-    return Settings(bot_token=token, parse_mode=parse_mode)
+
+    mode = _choice_env('BOT_MODE', POLLING_MODE, BOT_MODES)
+
+    max_workers = _int_env('WEBHOOK_MAX_WORKERS', 64)
+    if max_workers < 1:
+        raise RuntimeError('WEBHOOK_MAX_WORKERS должен быть положительным числом')
+
+    flush_interval = _float_env('FSM_FLUSH_INTERVAL', 0.05)
+    if flush_interval < 0:
+        raise RuntimeError('FSM_FLUSH_INTERVAL не может быть отрицательным')
+
+    metrics_port = _int_env('METRICS_PORT', 0) or None
+
+    send_global_rate = _float_env('SEND_GLOBAL_RATE', 30.0)
+    send_chat_rate = _float_env('SEND_CHAT_RATE', 1.0)
+    send_chat_burst = _float_env('SEND_CHAT_BURST', 3.0)
+    if min(send_global_rate, send_chat_rate) <= 0 or send_chat_burst < 1:
+        raise RuntimeError('SEND_GLOBAL_RATE і SEND_CHAT_RATE мають бути додатними, SEND_CHAT_BURST — не менше 1')
+
+    workers = _int_env('BOT_WORKERS', 1)
+    if workers < 1:
+        raise RuntimeError('BOT_WORKERS должен быть положительным числом')
+
+    tariffs_reload_interval = _float_env('TARIFFS_RELOAD_INTERVAL', 30.0)
+    if tariffs_reload_interval < 0:
+        raise RuntimeError('TARIFFS_RELOAD_INTERVAL не может быть отрицательным')
+
+    session_idle_ttl = _float_env('SESSION_IDLE_TTL', 86400.0)
+    session_max = _int_env('SESSION_MAX', 100_000)
+    if session_idle_ttl < 0 or session_max < 0:
+        raise RuntimeError('SESSION_IDLE_TTL и SESSION_MAX не могут быть отрицательными')
+
+    inline_cache_time = _int_env('INLINE_CACHE_TIME', 300)
+    if inline_cache_time < 0:
+        raise RuntimeError('INLINE_CACHE_TIME не может быть отрицательным')
+
+    receipt_workers = _int_env('RECEIPT_WORKERS', 2)
+    receipt_queue_limit = _int_env('RECEIPT_QUEUE_LIMIT', 8)
+    if receipt_workers < 1 or receipt_queue_limit < 0:
+        raise RuntimeError('RECEIPT_WORKERS должен быть положительным, а RECEIPT_QUEUE_LIMIT — не меньше 0')
+
+    throttle_window = _float_env('THROTTLE_WINDOW', 10.0)
+    throttle_user_limit = _int_env('THROTTLE_USER_LIMIT', 20)
+    throttle_chat_limit = _int_env('THROTTLE_CHAT_LIMIT', 30)
+    if throttle_window <= 0 or min(throttle_user_limit, throttle_chat_limit) < 0:
+        raise RuntimeError('THROTTLE_WINDOW должен быть положительным, а THROTTLE_*_LIMIT — не меньше 0')
+
+    dedup_ttl = _float_env('DEDUP_TTL', 600.0)
+    dedup_capacity = _int_env('DEDUP_CAPACITY', 100_000)
+    if dedup_ttl < 0 or dedup_capacity < 1:
+        raise RuntimeError('DEDUP_TTL не может быть отрицательным, а DEDUP_CAPACITY должен быть положительным')
+
+    panel_edit_delay = _float_env('PANEL_EDIT_DELAY', 0.3)
+    if panel_edit_delay < 0:
+        raise RuntimeError('PANEL_EDIT_DELAY не может быть отрицательным')
+
+    trace_sample_rate = _float_env('TRACE_SAMPLE_RATE', 0.0)
+    trace_flush_interval = _float_env('TRACE_FLUSH_INTERVAL', 1.0)
+    if not 0 <= trace_sample_rate <= 1 or trace_flush_interval <= 0:
+        raise RuntimeError('TRACE_SAMPLE_RATE должен быть от 0 до 1, а TRACE_FLUSH_INTERVAL — положительным')
+
+    remind_rate = _float_env('REMIND_RATE', 5.0)
+    remind_batch = _int_env('REMIND_BATCH', 100)
+    if remind_rate < 0 or remind_batch < 1 or remind_rate >= send_global_rate:
+        raise RuntimeError('REMIND_RATE должен быть от 0 до SEND_GLOBAL_RATE (не включая), а REMIND_BATCH — положительным')
+
+    remind_window_start = _int_env('REMIND_WINDOW_START', 10)
+    remind_window_end = _int_env('REMIND_WINDOW_END', 20)
+    if not 0 <= remind_window_start < remind_window_end <= 24:
+        raise RuntimeError('Окно напоминаний должно удовлетворять 0 <= REMIND_WINDOW_START < REMIND_WINDOW_END <= 24')
+
+    remind_utc_offset = _float_env('REMIND_UTC_OFFSET', 2.0)
+    if not -12 <= remind_utc_offset <= 14:
+        raise RuntimeError('REMIND_UTC_OFFSET должен быть в пределах от -12 до 14 часов')
+
+    return Settings(
+        bot_token=token,
+        parse_mode=parse_mode,
+        mode=mode,
+        webhook_url=os.getenv('WEBHOOK_URL') or None,
+        webhook_path=_path_env('WEBHOOK_PATH', '/webhook'),
+        webhook_secret=os.getenv('WEBHOOK_SECRET') or None,
+        webhook_host=os.getenv('WEBHOOK_HOST') or '0.0.0.0',
+        webhook_port=_int_env('WEBHOOK_PORT', 8080),
+        webhook_max_workers=max_workers,
+        fsm_storage=_choice_env('FSM_STORAGE', MEMORY_STORAGE, FSM_STORAGES),
+        fsm_db_path=os.getenv('FSM_DB_PATH') or 'data/fsm.sqlite3',
+        fsm_flush_interval=flush_interval,
+        metrics_port=metrics_port,
+        metrics_host=os.getenv('METRICS_HOST') or '0.0.0.0',
+        metrics_path=_path_env('METRICS_PATH', '/metrics'),
+        send_global_rate=send_global_rate,
+        send_chat_rate=send_chat_rate,
+        send_chat_burst=send_chat_burst,
+        workers=workers,
+        tariffs_path=os.getenv('TARIFFS_PATH') or 'data/tariffs.json',
+        tariffs_reload_interval=tariffs_reload_interval,
+        session_idle_ttl=session_idle_ttl,
+        session_max=session_max,
+        session_expired_notice=_bool_env('SESSION_EXPIRED_NOTICE', True),
+        inline_cache_time=inline_cache_time,
+        receipt_workers=receipt_workers,
+        receipt_queue_limit=receipt_queue_limit,
+        receipt_font_path=os.getenv('RECEIPT_FONT_PATH') or '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+        throttle_window=throttle_window,
+        throttle_user_limit=throttle_user_limit,
+        throttle_chat_limit=throttle_chat_limit,
+        dedup_ttl=dedup_ttl,
+        dedup_capacity=dedup_capacity,
+        dialogue_ui=_choice_env('DIALOGUE_UI', MESSAGES_UI, DIALOGUE_UIS),
+        panel_edit_delay=panel_edit_delay,
+        trace_sample_rate=trace_sample_rate,
+        trace_path=os.getenv('TRACE_PATH') or 'data/traces.jsonl',
+        trace_flush_interval=trace_flush_interval,
+        remind_rate=remind_rate,
+        remind_batch=remind_batch,
+        remind_window_start=remind_window_start,
+        remind_window_end=remind_window_end,
+        remind_utc_offset=remind_utc_offset,
+    )
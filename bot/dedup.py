@@ -0,0 +1,135 @@
+"""Ідемпотентна обробка: повторно доставлені оновлення відкидаються до обробників.
+
+Telegram повторює webhook-запит, на який не отримав відповіді, а після перезапуску в режимі polling
+може віддати ще не підтверджені оновлення вдруге. Без захисту ``PaymentFlow.process`` побачив би те
+саме повідомлення двічі: показник потрапив би в наступне поле, а користувач отримав би зайві підказки.
+
+``RecentKeys`` пам'ятає недавні ключі: черга в порядку надходження (кільцевий буфер на ``capacity``
+записів) плюс множина для перевірки за O(1). Записи старші за ``ttl`` знімаються з голови черги
+під час наступної перевірки. Ключі — ``update_id`` і пара (чат, ``message_id``): друга ловить те саме
+повідомлення, доставлене під новим ``update_id``.
+
+``RecentKeys`` живе лише в пам'яті процесу, а сесії в SQLite переживають перезапуск. Тому
+``Watermarks`` зберігає для кожного чату останні оброблені ``update_id`` і ``message_id`` у тому самому
+FSM-сховищі (окремий ``destiny``). Обидва номери в межах чату лише зростають, тож оновлення з номером, не
+більшим за збережений, уже оброблялося — зокрема до перезапуску.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Set, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.types import Message, TelegramObject, Update
+
+from bot import metrics
+
+
+UPDATE_KEY = 'update'
+MESSAGE_KEY = 'message'
+# ``destiny`` ключа FSM-сховища, під яким лежать номери останнього обробленого оновлення чату.
+WATERMARK_DESTINY = 'dedup'
+
+
+class RecentKeys:
+    """Ключі, побачені за останні ``ttl`` секунд, але не більше ``capacity`` найновіших."""
+
+    __slots__ = ('capacity', 'ttl', '_clock', '_order', '_keys')
+
+    def __init__(self, capacity: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if capacity < 1 or ttl <= 0:
+            raise ValueError('Місткість і TTL мають бути додатними')
+        self.capacity = capacity
+        self.ttl = ttl
+        self._clock = clock
+        # TTL однаковий для всіх, тож дедлайни в черзі зростають і прострочені завжди на голові.
+        self._order: Deque[Tuple[float, Hashable]] = deque()
+        self._keys: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable) -> bool:
+        """Запам'ятовує ключ; ``False``, якщо він уже траплявся."""
+        now = self._clock()
+        order, keys = self._order, self._keys
+        while order and order[0][0] <= now:
+            keys.discard(order.popleft()[1])
+        if key in keys:
+            return False
+        if len(order) >= self.capacity:
+            keys.discard(order.popleft()[1])
+        order.append((now + self.ttl, key))
+        keys.add(key)
+        return True
+
+
+class Watermarks:
+    """Останні оброблені ``update_id`` і ``message_id`` кожного чату у FSM-сховищі.
+
+    Сховище передається без ``SessionLifecycle``: позначки не є сесіями діалогу й не мають витіснятися
+    разом із ними.
+    """
+
+    def __init__(self, storage: BaseStorage) -> None:
+        self.storage = storage
+
+    async def advance(self, key: StorageKey, update_id: int, message: Optional[Message]) -> Optional[str]:
+        """Запам'ятовує оновлення; повертає ключ (``update`` чи ``message``), за яким воно вже оброблялося."""
+        key = replace(key, destiny=WATERMARK_DESTINY)
+        marks = await self.storage.get_data(key)
+        if update_id <= marks.get(UPDATE_KEY, -1):
+            return UPDATE_KEY
+        if message is not None and message.message_id <= marks.get(MESSAGE_KEY, -1):
+            return MESSAGE_KEY
+        marks[UPDATE_KEY] = update_id
+        if message is not None:
+            marks[MESSAGE_KEY] = message.message_id
+        await self.storage.set_data(key, marks)
+        return None
+
+
+class DeduplicationMiddleware(BaseMiddleware):
+    """Зовнішня middleware оновлень: дублікат за ``update_id`` або (чат, ``message_id``) не обробляється.
+
+    Ключ запам'ятовується до виклику обробника, тому і паралельний дублікат (webhook обробляє
+    оновлення у фонових задачах) відкидається, поки оригінал ще в роботі. З ``watermarks`` оновлення
+    чату додатково звіряється зі збереженими номерами, тож дублікат відкидається й після перезапуску;
+    middleware має стояти після ``FSMContextMiddleware``, яка кладе в дані ``state``.
+    """
+
+    def __init__(
+        self, update_ids: RecentKeys, messages: Optional[RecentKeys] = None, watermarks: Optional[Watermarks] = None,
+    ) -> None:
+        self.update_ids = update_ids
+        self.messages = messages
+        self.watermarks = watermarks
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not self.update_ids.add(event.update_id):
+            metrics.DUPLICATE_UPDATES.inc(UPDATE_KEY)
+            return None
+        message = event.message
+        if message is not None and self.messages is not None:
+            if not self.messages.add((message.chat.id, message.message_id)):
+                metrics.DUPLICATE_UPDATES.inc(MESSAGE_KEY)
+                return None
+        state: Optional[FSMContext] = data.get('state')
+        if self.watermarks is not None and state is not None:
+            seen = await self.watermarks.advance(state.key, event.update_id, message)
+            if seen is not None:
+                metrics.DUPLICATE_UPDATES.inc(seen)
+                return None
+        return await handler(event, data)
+
+
+__all__ = ['WATERMARK_DESTINY', 'DeduplicationMiddleware', 'RecentKeys', 'Watermarks']
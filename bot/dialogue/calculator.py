@@ -2,17 +2,41 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
+from bot.dialogue import templates
+from bot.dialogue.constants import CATALOG
+from bot.dialogue.fixed import Number
 from bot.dialogue.formatting import ValueFormatter
 
 
+_ZERO = Decimal(0)
+
+
 @dataclass
 class CalculationSection:
     label: str
     body: str
-    amount: Decimal
+    amount: Number
     amount_display: str
+    quantity_display: str = ''
+    tariff_display: str = ''
+
+
+@dataclass(frozen=True)
+class BillAmounts:
+    """Витрати (м³) і суми (грн) розрахунку без округлення; ``total`` — як у рядку «Всього».
+
+    Окремо зберігаються чотири базові послуги; ``total`` включає й решту послуг каталогу.
+    """
+
+    cold_usage: Number
+    hot_usage: Number
+    cold: Number
+    hot: Number
+    rent: Number
+    heat: Number
+    total: Number
 
 
 class PaymentCalculator:
@@ -22,133 +46,74 @@ class PaymentCalculator:
         self.formatter = formatter or ValueFormatter()
 
     def summary(self, payload: Dict[str, Any]) -> str:
-        period = payload['period']
-        month_name, _, year = self.formatter.month_name(period)
-        hot_prev = self.formatter.decimal_for_summary(payload['hot_prev'])
-        hot_curr = self.formatter.decimal_for_summary(payload['hot_curr'])
-        cold_prev = self.formatter.decimal_for_summary(payload['cold_prev'])
-        cold_curr = self.formatter.decimal_for_summary(payload['cold_curr'])
-        return (
-            f"Ком.послуги за {month_name} {year}р. {payload['full_name']},{payload['address']};"
-            f"ГВП(показники:{hot_prev}-{hot_curr}),"
-            f"ХВП(показники:{cold_prev}-{cold_curr})"
-        )
+        fmt = self.formatter
+        month_name, _, year = fmt.month_name(payload['period'])
+        return CATALOG.summary(payload, fmt.decimal_for_summary, month_name, year)
 
     def details(self, payload: Dict[str, Any]) -> str:
-        cold_usage = payload['cold_curr'] - payload['cold_prev']
-        hot_usage = payload['hot_curr'] - payload['hot_prev']
-        area = payload['apartment_area']
-        cold_tariff = payload['cold_tariff']
-        hot_tariff = payload['hot_tariff']
-        rent_tariff = payload['rent_tariff']
-        heat_tariff = payload['heat_tariff']
-
-        cold_amount = cold_usage * cold_tariff
-        hot_amount = hot_usage * hot_tariff
-        rent_amount = area * rent_tariff
-        heat_amount = area * heat_tariff
-
-        sections = self._build_sections(
-            cold_usage, hot_usage, area, cold_tariff, hot_tariff, rent_tariff, heat_tariff,
-            cold_amount, hot_amount, rent_amount, heat_amount,
-        )
+        fmt = self.formatter
+        sections = self.sections(payload)
 
         period = payload['period']
-        _, month_locative, year = self.formatter.month_name(period)
-        readings_block = self._build_readings_block(payload, cold_usage, hot_usage)
-        tariffs_block = self._build_tariffs_block(cold_tariff, hot_tariff, rent_tariff, heat_tariff)
+        _, month_locative, year = fmt.month_name(period)
+        prev_date, current_date = fmt.period_dates(period)
+        readings_block = CATALOG.readings(payload, fmt.decimal_for_summary, fmt.quantity, prev_date, current_date)
+        tariffs_block = CATALOG.tariffs(payload, fmt.tariff)
 
         lines: List[str] = [readings_block, tariffs_block, '\n\n'.join(section.body for section in sections), '\n\n']
 
         total = sum(section.amount for section in sections)
-        total_display = self.formatter.money(total)
+        total_display = fmt.money(total)
 
-        lines.append(f'✅ ПІДСУМОК до оплати у {month_locative} {year}р.:\n')
-        lines.append('Послуга — Сума (грн)\n')
+        lines.append(templates.TOTAL_HEADER(month=month_locative, year=year))
         for section in sections:
-            lines.append(f'{section.label} — {section.amount_display}\n')
-        lines.append(f'Всього — {total_display} грн ✅')
+            lines.append(templates.TOTAL_LINE(label=section.label, amount=section.amount_display))
+        lines.append(templates.TOTAL_FOOTER(total=total_display))
 
         return ''.join(lines)
 
-    def _build_sections(
-        self,
-        cold_usage: Decimal,
-        hot_usage: Decimal,
-        area: Decimal,
-        cold_tariff: Decimal,
-        hot_tariff: Decimal,
-        rent_tariff: Decimal,
-        heat_tariff: Decimal,
-        cold_amount: Decimal,
-        hot_amount: Decimal,
-        rent_amount: Decimal,
-        heat_amount: Decimal,
-    ) -> List[CalculationSection]:
-        formatter = self.formatter
-        sections: List[CalculationSection] = []
-
-        cold_body = (
-            '🔹 Холодна вода:\n\n'
-            f"{formatter.quantity(cold_usage)} × {formatter.tariff(cold_tariff)} = {formatter.money(cold_amount)} грн"
-        )
-        sections.append(CalculationSection('Холодна вода', cold_body, cold_amount, formatter.money(cold_amount)))
-
-        if hot_tariff > 0 and hot_usage > 0:
-            hot_body = (
-                '🔸 Гаряча вода:\n\n'
-                f"{formatter.quantity(hot_usage)} × {formatter.tariff(hot_tariff)} = {formatter.money(hot_amount)} грн"
-            )
-            sections.append(CalculationSection('Гаряча вода', hot_body, hot_amount, formatter.money(hot_amount)))
-
-        rent_body = (
-            '🧱 Технічне обслуговування будинку:\n\n'
-            f"{formatter.quantity(area)} × {formatter.tariff(rent_tariff)} = {formatter.money(rent_amount)} грн"
-        )
-        sections.append(CalculationSection('Технічне обслуговування будинку', rent_body, rent_amount, formatter.money(rent_amount)))
-
-        if heat_tariff > 0 and area > 0:
-            heat_body = (
-                f'♨️ Опалення (з урахуванням {formatter.quantity(area)} м²):\n\n'
-                f"{formatter.quantity(area)} × {formatter.tariff(heat_tariff)} = {formatter.money(heat_amount)} грн"
-            )
-            sections.append(CalculationSection('Опалення', heat_body, heat_amount, formatter.money(heat_amount)))
-
-        return sections
-
-    def _build_tariffs_block(
-        self,
-        cold_tariff: Decimal,
-        hot_tariff: Decimal,
-        rent_tariff: Decimal,
-        heat_tariff: Decimal,
-    ) -> str:
+    def sections(self, payload: Dict[str, Any]) -> List[CalculationSection]:
+        """Послуги, що входять у підсумок, з уже відформатованими кількістю, тарифом і сумою."""
         fmt = self.formatter
-        return (
-            '⸻\n\n'
-            '💰 Тарифи:\n'
-            f" • Холодна вода: {fmt.tariff(cold_tariff)} грн/м³\n"
-            f" • Гаряча вода: {fmt.tariff(hot_tariff)} грн/м³\n"
-            f" • Технічне обслуговування будинку: {fmt.tariff(rent_tariff)} грн/м²\n"
-            f" • Опалення: {fmt.tariff(heat_tariff)} грн/м²\n\n"
-            '⸻\n\n'
-        )
+        return CATALOG.sections(payload, fmt.quantity, fmt.tariff, fmt.money, CalculationSection)
 
-    def _build_readings_block(self, payload: Dict[str, Any], cold_usage: Decimal, hot_usage: Decimal) -> str:
-        fmt = self.formatter
-        period = payload['period']
-        prev_date, current_date = fmt.period_dates(period)
-        cold_prev = fmt.decimal_for_summary(payload['cold_prev'])
-        cold_curr = fmt.decimal_for_summary(payload['cold_curr'])
-        hot_prev = fmt.decimal_for_summary(payload['hot_prev'])
-        hot_curr = fmt.decimal_for_summary(payload['hot_curr'])
-        return (
-            '🔁 Повтор розрахунків:\n\n'
-            '📸 Показники (м³):\n'
-            f'Вода — {prev_date} — {current_date} — Розхід\n'
-            f'Холодна — {cold_prev} — {cold_curr} — {fmt.quantity(cold_usage)} м³\n'
-            f'Гаряча — {hot_prev} — {hot_curr} — {fmt.quantity(hot_usage)} м³\n\n'
+    def brief(self, payload: Dict[str, Any]) -> str:
+        """Секції послуг і підсумок без показників, тарифів і періоду (для швидкого розрахунку inline)."""
+        sections = self.sections(payload)
+        lines: List[str] = ['\n\n'.join(section.body for section in sections), '\n\n', templates.QUICK_TOTAL_HEADER()]
+        for section in sections:
+            lines.append(templates.TOTAL_LINE(label=section.label, amount=section.amount_display))
+        lines.append(templates.TOTAL_FOOTER(total=self.formatter.money(sum(section.amount for section in sections))))
+        return ''.join(lines)
+
+    def amounts(self, payload: Dict[str, Any]) -> BillAmounts:
+        """Ті самі суми, що й у ``details``, без побудови тексту (для історії розрахунків)."""
+        usages, amounts, total = CATALOG.amounts(payload)
+        # Послуги, яких немає в каталозі або які не увійшли в підсумок, дають нуль.
+        return BillAmounts(
+            usages.get('cold', _ZERO),
+            usages.get('hot', _ZERO),
+            amounts.get('cold_water', _ZERO),
+            amounts.get('hot_water', _ZERO),
+            amounts.get('maintenance', _ZERO),
+            amounts.get('heating', _ZERO),
+            total,
         )
 
+    def summary_many(self, payloads: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """Лениво повертає ``summary`` для кожного payload у тому ж порядку."""
+        for payload in payloads:
+            yield self.summary(payload)
+
+    def details_many(self, payloads: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """Лениво повертає ``details`` для кожного payload у тому ж порядку."""
+        for payload in payloads:
+            yield self.details(payload)
+
+    def calculate_many(self, payloads: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, str]]:
+        """Лениво повертає пари ``(details, summary)`` за один прохід по payload."""
+        for payload in payloads:
+            yield self.details(payload), self.summary(payload)
+
 
-__all__ = ['PaymentCalculator']
+__all__ = ['BillAmounts', 'CalculationSection', 'PaymentCalculator']
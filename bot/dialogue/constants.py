@@ -3,6 +3,10 @@ from __future__ import annotations
 from decimal import Decimal
 import re
 
+from bot.dialogue.services import (
+    NUMBER, PERIOD, QUANTITY, TARIFF, TEXT, BlockTexts, Field, Meter, Service, ServiceCatalog, Tariff,
+)
+
 
 FULL_NAME_STEP = 'full_name'
 PERIOD_STEP = 'period'
@@ -17,50 +21,208 @@ RENT_TARIFF_STEP = 'rent_tariff'
 HEAT_TARIFF_STEP = 'heat_tariff'
 AREA_STEP = 'apartment_area'
 
-STEP_ORDER = [
-    FULL_NAME_STEP,
-    PERIOD_STEP,
-    ADDRESS_STEP,
-    HOT_PREV_STEP,
-    HOT_CURR_STEP,
-    COLD_PREV_STEP,
-    COLD_CURR_STEP,
-    COLD_TARIFF_STEP,
-    HOT_TARIFF_STEP,
-    RENT_TARIFF_STEP,
-    HEAT_TARIFF_STEP,
+THREE_DECIMALS = Decimal('0.001')
+TWO_DECIMALS = Decimal('0.01')
+
+FULL_NAME_FIELD = Field(
+    FULL_NAME_STEP, 'Напишіть, будь ласка, Ваше ПІБ повністю (наприклад, Корнієнко Сергій Іванович).', 'ПІБ',
+    kind=TEXT, remember=True,
+)
+PERIOD_FIELD = Field(PERIOD_STEP, 'Вкажіть місяць і рік у форматі MM-YYYY (наприклад, 01-2026).', 'Період', kind=PERIOD)
+ADDRESS_FIELD = Field(
+    ADDRESS_STEP, 'Введіть адресу (вулиця, будинок, квартира).', 'Адреса', kind=TEXT, remember=True,
+)
+
+HOT_METER = Meter(
+    'hot', 'Гаряча', 'ГВП', 'м³',
+    Field(HOT_PREV_STEP, 'Напишіть попередні показники лічильника гарячої води.', 'Гаряча попередні'),
+    Field(HOT_CURR_STEP, 'Напишіть поточні показники лічильника гарячої води.', 'Гаряча поточні'),
+    group='Вода',
+)
+COLD_METER = Meter(
+    'cold', 'Холодна', 'ХВП', 'м³',
+    Field(COLD_PREV_STEP, 'Напишіть попередні показники лічильника холодної води.', 'Холодна попередні'),
+    Field(COLD_CURR_STEP, 'Напишіть поточні показники лічильника холодної води.', 'Холодна поточні'),
+    group='Вода',
+)
+ELECTRICITY_DAY_METER = Meter(
+    'electricity_day', 'Електроенергія (день)', 'ЕЕ-день', 'кВт·год',
+    Field(
+        'electricity_day_prev', 'Напишіть попередні показники лічильника електроенергії (денна зона).',
+        'Світло день попередні',
+    ),
+    Field(
+        'electricity_day_curr', 'Напишіть поточні показники лічильника електроенергії (денна зона).',
+        'Світло день поточні',
+    ),
+    group='Електроенергія',
+)
+ELECTRICITY_NIGHT_METER = Meter(
+    'electricity_night', 'Електроенергія (ніч)', 'ЕЕ-ніч', 'кВт·год',
+    Field(
+        'electricity_night_prev', 'Напишіть попередні показники лічильника електроенергії (нічна зона).',
+        'Світло ніч попередні',
+    ),
+    Field(
+        'electricity_night_curr', 'Напишіть поточні показники лічильника електроенергії (нічна зона).',
+        'Світло ніч поточні',
+    ),
+    group='Електроенергія',
+)
+GAS_METER = Meter(
+    'gas', 'Газ', 'ГАЗ', 'м³',
+    Field('gas_prev', 'Напишіть попередні показники лічильника газу.', 'Газ попередні'),
+    Field('gas_curr', 'Напишіть поточні показники лічильника газу.', 'Газ поточні'),
+)
+# Порядок, у якому діалог питає показники і в якому вони йдуть у призначенні платежу.
+METERS = (HOT_METER, COLD_METER, ELECTRICITY_DAY_METER, ELECTRICITY_NIGHT_METER, GAS_METER)
+
+AREA_FIELD = Field(
     AREA_STEP,
-]
+    'Вкажіть площу квартири (м²), наприклад 68.1. Якщо технічне обслуговування будинку не потрібне, введіть 0.',
+    'Площа',
+    remember=True,
+    unit='м²',
+)
+RESIDENTS_FIELD = Field(
+    'residents', 'Скільки людей зареєстровано у квартирі? Якщо вивіз сміття не оплачуєте, введіть 0.',
+    'Мешканців', remember=True, whole=True,
+)
 
-STEP_PROMPTS = {
-    FULL_NAME_STEP: 'Напишіть, будь ласка, Ваше ПІБ повністю (наприклад, Корнієнко Сергій Іванович).',
-    PERIOD_STEP: 'Вкажіть місяць і рік у форматі MM-YYYY (наприклад, 01-2026).',
-    ADDRESS_STEP: 'Введіть адресу (вулиця, будинок, квартира).',
-    HOT_PREV_STEP: 'Напишіть попередні показники лічильника гарячої води.',
-    HOT_CURR_STEP: 'Напишіть поточні показники лічильника гарячої води.',
-    COLD_PREV_STEP: 'Напишіть попередні показники лічильника холодної води.',
-    COLD_CURR_STEP: 'Напишіть поточні показники лічильника холодної води.',
-    COLD_TARIFF_STEP: 'Вкажіть тариф холодної води (грн/м³), наприклад 30.384.',
-    HOT_TARIFF_STEP: 'Вкажіть тариф гарячої води (грн/м³). Якщо не користуєтесь, введіть 0.',
-    RENT_TARIFF_STEP: 'Вкажіть тариф технічного обслуговування будинку (грн/м²), наприклад 8.',
-    HEAT_TARIFF_STEP: 'Вкажіть тариф опалення (грн/м²). Якщо опалення відсутнє, введіть 0.',
-    AREA_STEP: 'Вкажіть площу квартири (м²), наприклад 68.1. Якщо технічне обслуговування будинку не потрібне, введіть 0.',
-}
 
-STEP_PAYLOAD_KEYS = {
-    FULL_NAME_STEP: 'full_name',
-    PERIOD_STEP: 'period',
-    ADDRESS_STEP: 'address',
-    HOT_PREV_STEP: 'hot_prev',
-    HOT_CURR_STEP: 'hot_curr',
-    COLD_PREV_STEP: 'cold_prev',
-    COLD_CURR_STEP: 'cold_curr',
-    COLD_TARIFF_STEP: 'cold_tariff',
-    HOT_TARIFF_STEP: 'hot_tariff',
-    RENT_TARIFF_STEP: 'rent_tariff',
-    HEAT_TARIFF_STEP: 'heat_tariff',
-    AREA_STEP: 'apartment_area',
-}
+def _tariff(key: str, prompt: str, label: str, title: str, unit: str) -> Tariff:
+    return Tariff(Field(key, prompt, label, remember=True), title, unit)
+
+
+COLD_WATER = Service(
+    'cold_water', 'Холодна вода', '🔹 Холодна вода:\n\n{quantity} × {tariff} = {amount} грн',
+    amount='cold_usage * cold_tariff',
+    display=(('quantity', 'cold_usage', QUANTITY), ('tariff', 'cold_tariff', TARIFF)),
+    meters=(COLD_METER,),
+    tariffs=(_tariff(
+        COLD_TARIFF_STEP, 'Вкажіть тариф холодної води (грн/м³), наприклад 30.384.', 'Тариф холодної',
+        'Холодна вода', 'грн/м³',
+    ),),
+)
+HOT_WATER = Service(
+    'hot_water', 'Гаряча вода', '🔸 Гаряча вода:\n\n{quantity} × {tariff} = {amount} грн',
+    amount='hot_usage * hot_tariff',
+    condition='hot_tariff > 0 and hot_usage > 0',
+    display=(('quantity', 'hot_usage', QUANTITY), ('tariff', 'hot_tariff', TARIFF)),
+    meters=(HOT_METER,),
+    tariffs=(_tariff(
+        HOT_TARIFF_STEP, 'Вкажіть тариф гарячої води (грн/м³). Якщо не користуєтесь, введіть 0.', 'Тариф гарячої',
+        'Гаряча вода', 'грн/м³',
+    ),),
+)
+MAINTENANCE = Service(
+    'maintenance', 'Технічне обслуговування будинку',
+    '🧱 Технічне обслуговування будинку:\n\n{quantity} × {tariff} = {amount} грн',
+    amount='apartment_area * rent_tariff',
+    display=(('quantity', 'apartment_area', QUANTITY), ('tariff', 'rent_tariff', TARIFF)),
+    tariffs=(_tariff(
+        RENT_TARIFF_STEP, 'Вкажіть тариф технічного обслуговування будинку (грн/м²), наприклад 8.',
+        'Тариф обслуговування', 'Технічне обслуговування будинку', 'грн/м²',
+    ),),
+    quantities=(AREA_FIELD,),
+)
+HEATING = Service(
+    'heating', 'Опалення', '♨️ Опалення (з урахуванням {quantity} м²):\n\n{quantity} × {tariff} = {amount} грн',
+    amount='apartment_area * heat_tariff',
+    condition='heat_tariff > 0 and apartment_area > 0',
+    display=(('quantity', 'apartment_area', QUANTITY), ('tariff', 'heat_tariff', TARIFF)),
+    tariffs=(_tariff(
+        HEAT_TARIFF_STEP, 'Вкажіть тариф опалення (грн/м²). Якщо опалення відсутнє, введіть 0.', 'Тариф опалення',
+        'Опалення', 'грн/м²',
+    ),),
+    quantities=(AREA_FIELD,),
+)
+# Двозонний облік: кожна зона за своїм тарифом, сума зони округлюється до копійок, як у рахунку постачальника.
+ELECTRICITY = Service(
+    'electricity', 'Електроенергія',
+    '⚡ Електроенергія ({quantity} кВт·год):\n\n'
+    'день {day} × {day_tariff} + ніч {night} × {night_tariff} = {amount} грн',
+    amount='electricity_day_usage * electricity_day_tariff + electricity_night_usage * electricity_night_tariff',
+    condition='electricity_day_tariff > 0 or electricity_night_tariff > 0',
+    round_to=TWO_DECIMALS,
+    display=(
+        ('quantity', 'electricity_day_usage + electricity_night_usage', QUANTITY),
+        ('day', 'electricity_day_usage', QUANTITY),
+        ('day_tariff', 'electricity_day_tariff', TARIFF),
+        ('night', 'electricity_night_usage', QUANTITY),
+        ('night_tariff', 'electricity_night_tariff', TARIFF),
+    ),
+    meters=(ELECTRICITY_DAY_METER, ELECTRICITY_NIGHT_METER),
+    tariffs=(
+        _tariff(
+            'electricity_day_tariff',
+            'Вкажіть тариф електроенергії в денній зоні (грн/кВт·год). Якщо не оплачуєте, введіть 0.',
+            'Тариф світла день', 'Електроенергія (день)', 'грн/кВт·год',
+        ),
+        _tariff(
+            'electricity_night_tariff',
+            'Вкажіть тариф електроенергії в нічній зоні (грн/кВт·год). Якщо зона одна, введіть 0.',
+            'Тариф світла ніч', 'Електроенергія (ніч)', 'грн/кВт·год',
+        ),
+    ),
+)
+GAS = Service(
+    'gas', 'Газ', '🔥 Газ:\n\n{quantity} × {tariff} = {amount} грн',
+    amount='gas_usage * gas_tariff',
+    condition='gas_tariff > 0',
+    round_to=TWO_DECIMALS,
+    display=(('quantity', 'gas_usage', QUANTITY), ('tariff', 'gas_tariff', TARIFF)),
+    meters=(GAS_METER,),
+    tariffs=(_tariff(
+        'gas_tariff', 'Вкажіть тариф газу (грн/м³). Якщо газ не оплачуєте, введіть 0.', 'Тариф газу', 'Газ', 'грн/м³',
+    ),),
+)
+WASTE = Service(
+    'waste', 'Вивіз сміття', '🗑 Вивіз сміття ({quantity} мешк.):\n\n{quantity} × {tariff} = {amount} грн',
+    amount='residents * waste_tariff',
+    condition='waste_tariff > 0 and residents > 0',
+    round_to=TWO_DECIMALS,
+    display=(('quantity', 'residents', QUANTITY), ('tariff', 'waste_tariff', TARIFF)),
+    tariffs=(_tariff(
+        'waste_tariff', 'Вкажіть тариф вивозу сміття (грн з особи). Якщо не оплачуєте, введіть 0.', 'Тариф сміття',
+        'Вивіз сміття', 'грн/особу',
+    ),),
+    quantities=(RESIDENTS_FIELD,),
+)
+
+DEFAULT_SERVICES = (COLD_WATER, HOT_WATER, MAINTENANCE, HEATING)
+EXTRA_SERVICES = (ELECTRICITY, GAS, WASTE)
+# Послуги рахунку; діалог, швидка форма, CSV, профіль і тексти розрахунку будуються з них.
+SERVICES = DEFAULT_SERVICES
+
+CATALOG = ServiceCatalog(
+    header=(FULL_NAME_FIELD, PERIOD_FIELD, ADDRESS_FIELD),
+    meters=METERS,
+    services=SERVICES,
+    texts=BlockTexts(
+        readings_header=(
+            '🔁 Повтор розрахунків:\n\n📸 Показники{units}:\n{meters} — {prev_date} — {current_date} — Розхід\n'
+        ),
+        tariffs_header='⸻\n\n💰 Тарифи:\n',
+        tariffs_footer='\n⸻\n\n',
+        summary_prefix='Ком.послуги за {month} {year}р. {full_name},{address};',
+        summary_reading='{code}(показники:{{{prev}}}-{{{curr}}})',
+    ),
+)
+
+STEP_ORDER = CATALOG.step_order
+STEP_PROMPTS = {field.key: field.prompt for field in CATALOG.fields}
+# Підписи полів у швидкій формі (одне повідомлення з усіма значеннями).
+FORM_LABELS = {field.key: field.label for field in CATALOG.fields}
+STEP_PAYLOAD_KEYS = {step: step for step in STEP_ORDER}
+
+# Кроки, які можна заповнити одним набором із довідника тарифів.
+TARIFF_STEPS = (COLD_TARIFF_STEP, HOT_TARIFF_STEP, RENT_TARIFF_STEP, HEAT_TARIFF_STEP)
+TARIFF_PRESET_KEY = 'tariff_preset'
+TARIFF_PRESET_PREFIX = '📋 '
+TARIFF_PRESET_HINT = 'Або оберіть готовий набір тарифів кнопкою нижче.'
+
+SESSION_EXPIRED_TEXT = '⌛ Попередній розрахунок було скасовано через тривалу неактивність, введені дані не збережено.'
 
 PERIOD_PATTERN = re.compile(r'^(0[1-9]|1[0-2])-(\d{4,5})$')
 
@@ -97,21 +259,27 @@ MONTH_NAMES_LOCATIVE = {
 BACK_BUTTON_TEXT = '⬅️ Назад'
 BACK_TOKENS = {'назад', 'back', 'повернутися', 'повернутись', BACK_BUTTON_TEXT.strip().lower()}
 
-THREE_DECIMALS = Decimal('0.001')
-TWO_DECIMALS = Decimal('0.01')
+# Дані кнопок панелі (режим DIALOGUE_UI=panel): одне повідомлення бота, що редагується на кожному кроці.
+PANEL_CALLBACK_PREFIX = 'panel:'
+PANEL_BACK = PANEL_CALLBACK_PREFIX + 'back'
+PANEL_CONFIRM = PANEL_CALLBACK_PREFIX + 'confirm'
+PANEL_RESET = PANEL_CALLBACK_PREFIX + 'reset'
+PANEL_PRESET_PREFIX = PANEL_CALLBACK_PREFIX + 'preset:'
 
-TEXT_STEPS = {FULL_NAME_STEP, ADDRESS_STEP}
-NUMERIC_STEPS = {
-    HOT_PREV_STEP,
-    HOT_CURR_STEP,
-    COLD_PREV_STEP,
-    COLD_CURR_STEP,
-    COLD_TARIFF_STEP,
-    HOT_TARIFF_STEP,
-    RENT_TARIFF_STEP,
-    HEAT_TARIFF_STEP,
-    AREA_STEP,
-}
+CONFIRM_PROFILE_TEXT = '✅ Так, все вірно'
+RESET_PROFILE_TEXT = '✏️ Ввести заново'
+CONFIRM_TOKENS = {'так', 'yes', 'ok', 'ок', '+', 'вірно', CONFIRM_PROFILE_TEXT.strip().lower()}
+RESET_TOKENS = {'ні', 'no', 'заново', 'ввести заново', RESET_PROFILE_TEXT.strip().lower()}
+
+# Поля, які зберігаються з попереднього розрахунку без змін.
+PROFILE_KEYS = CATALOG.profile_keys
+# Поточні показники минулого розрахунку стають попередніми для наступного.
+PROFILE_READINGS = CATALOG.profile_readings
+
+TEXT_STEPS = set(CATALOG.steps_of_kind(TEXT))
+NUMERIC_STEPS = set(CATALOG.steps_of_kind(NUMBER))
+# Числові кроки, що приймають лише цілі невід'ємні значення.
+WHOLE_STEPS = {field.key for field in CATALOG.fields if field.whole}
 
 __all__ = [
     'FULL_NAME_STEP',
@@ -126,16 +294,34 @@ __all__ = [
     'RENT_TARIFF_STEP',
     'HEAT_TARIFF_STEP',
     'AREA_STEP',
+    'METERS',
+    'DEFAULT_SERVICES',
+    'EXTRA_SERVICES',
+    'SERVICES',
+    'CATALOG',
     'STEP_ORDER',
     'STEP_PROMPTS',
     'STEP_PAYLOAD_KEYS',
+    'FORM_LABELS',
+    'TARIFF_STEPS',
+    'TARIFF_PRESET_KEY',
+    'TARIFF_PRESET_PREFIX',
+    'TARIFF_PRESET_HINT',
+    'SESSION_EXPIRED_TEXT',
     'PERIOD_PATTERN',
     'MONTH_NAMES',
     'MONTH_NAMES_LOCATIVE',
     'BACK_BUTTON_TEXT',
     'BACK_TOKENS',
+    'CONFIRM_PROFILE_TEXT',
+    'RESET_PROFILE_TEXT',
+    'CONFIRM_TOKENS',
+    'RESET_TOKENS',
+    'PROFILE_KEYS',
+    'PROFILE_READINGS',
     'THREE_DECIMALS',
     'TWO_DECIMALS',
     'TEXT_STEPS',
     'NUMERIC_STEPS',
+    'WHOLE_STEPS',
 ]
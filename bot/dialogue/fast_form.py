@@ -0,0 +1,125 @@
+"""Швидка форма: усі поля діалогу в одному багаторядковому повідомленні.
+
+Підтримуються два записи: ``ключ: значення`` (ключ — підпис із ``FORM_LABELS``, назва поля payload
+або кроку, регістр не важливий) і позиційний — по рядку на кожен крок у порядку ``STEP_ORDER``. Значення
+перевіряються тими самими правилами, що й у покроковому діалозі, а всі помилки збираються разом.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.dialogue import constants
+from bot.dialogue.flow import PaymentFlow
+
+
+_SEPARATOR = re.compile(r'\s*[:=]\s*')
+_SPACES = re.compile(r'\s+')
+
+MISSING_ERROR = 'Значення не вказано.'
+UNKNOWN_KEY_ERROR = 'Невідоме поле.'
+DUPLICATE_ERROR = 'Поле вказано двічі.'
+
+
+def _normalize_key(key: str) -> str:
+    return _SPACES.sub(' ', key.strip().lower().replace('_', ' '))
+
+
+_KEY_ALIASES: Dict[str, str] = {}
+for _step in constants.STEP_ORDER:
+    for _alias in (constants.FORM_LABELS[_step], constants.STEP_PAYLOAD_KEYS[_step], _step):
+        _KEY_ALIASES[_normalize_key(_alias)] = _step
+
+
+@dataclass
+class FormResult:
+    payload: Dict[str, Any] = field(default_factory=dict)
+    # Пари ``(підпис поля або рядка, текст помилки)`` у порядку полів.
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
+
+def _split_line(line: str) -> Optional[Tuple[str, str]]:
+    parts = _SEPARATOR.split(line, maxsplit=1)
+    if len(parts) != 2:
+        return None
+    step = _KEY_ALIASES.get(_normalize_key(parts[0]))
+    return (step, parts[1]) if step else None
+
+
+def _lines(text: str) -> List[str]:
+    return [line for line in (raw.strip() for raw in text.splitlines()) if line]
+
+
+def looks_like_form(text: str) -> bool:
+    """Повідомлення схоже на швидку форму: два й більше рядків ``ключ: значення`` або по рядку на кожен крок."""
+    lines = _lines(text)
+    if len(lines) < 2:
+        return False
+    if len(lines) == len(constants.STEP_ORDER):
+        return True
+    return sum(1 for line in lines if _split_line(line)) >= 2
+
+
+def parse_form(text: str) -> FormResult:
+    """Розбирає форму за один прохід; payload заповнюється лише коли помилок немає."""
+    lines = _lines(text)
+    raw_values: Dict[str, str] = {}
+    result = FormResult()
+
+    keyed = [_split_line(line) for line in lines]
+    if any(keyed):
+        for line, parsed in zip(lines, keyed):
+            if parsed is None:
+                result.errors.append((line, UNKNOWN_KEY_ERROR))
+                continue
+            step, value = parsed
+            if step in raw_values:
+                result.errors.append((constants.FORM_LABELS[step], DUPLICATE_ERROR))
+                continue
+            raw_values[step] = value
+    elif len(lines) == len(constants.STEP_ORDER):
+        raw_values = dict(zip(constants.STEP_ORDER, lines))
+    else:
+        result.errors.append((
+            'Форма',
+            f'Очікується {len(constants.STEP_ORDER)} рядків у порядку полів або рядки виду "Поле: значення", '
+            f'отримано {len(lines)}.',
+        ))
+        return result
+
+    payload: Dict[str, Any] = {}
+    field_errors: List[Tuple[str, str]] = []
+    for step in constants.STEP_ORDER:
+        label = constants.FORM_LABELS[step]
+        raw = raw_values.get(step)
+        if raw is None:
+            field_errors.append((label, MISSING_ERROR))
+            continue
+        value, error = PaymentFlow.parse_value(step, raw)
+        if error:
+            field_errors.append((label, error))
+        else:
+            payload[constants.STEP_PAYLOAD_KEYS[step]] = value
+    result.errors = field_errors + result.errors
+    if result.success:
+        result.payload = payload
+    return result
+
+
+def form_template() -> str:
+    """Порожня форма для копіювання: підписи полів у порядку діалогу."""
+    return '\n'.join(f'{constants.FORM_LABELS[step]}: ' for step in constants.STEP_ORDER)
+
+
+def format_errors(errors: List[Tuple[str, str]]) -> str:
+    lines = ['Не вдалося прийняти форму, виправте, будь ласка:']
+    lines.extend(f'• {label}: {message}' for label, message in errors)
+    return '\n'.join(lines)
+
+
+__all__ = ['FormResult', 'format_errors', 'form_template', 'looks_like_form', 'parse_form']
@@ -0,0 +1,324 @@
+"""Числа з фіксованою комою: ціле число одиниць і кількість знаків після коми.
+
+Показники, тарифи й площа зберігаються в тисячних (``MILLI``), добутки — у мільйонних, гроші після
+округлення — у копійках. Додавання, віднімання, множення й округлення виконуються над цілими й дають
+рівно той самий результат, що й ``Decimal`` у контексті за замовчуванням: значення обмежені
+``MAX_UNITS``, тож жоден добуток чи сума послуг не виходить за 28 значущих цифр і ``Decimal`` теж
+рахував би їх точно. Правила округлення — ті самі константи, що й у ``decimal`` (``ROUND_HALF_EVEN``,
+``ROUND_HALF_UP`` тощо).
+
+Що не вміщується у ``Fixed`` — більше трьох знаків після коми, ``-0``, нескінченність, ``NaN``, числа
+понад ``MAX_UNITS`` — лишається ``Decimal``: ``parse_number`` і ``to_number`` повертають те чи інше, а
+змішані операції переходять до ``Decimal`` без втрати точності. ``-0`` буває й результатом множення на
+нуль від'ємного числа; тоді ``Fixed`` теж повертає ``Decimal``, щоб знак нуля в тексті не змінився.
+"""
+from __future__ import annotations
+
+from decimal import (
+    ROUND_05UP, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR, ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP,
+    Decimal,
+)
+from typing import Any, Optional, Tuple, Union
+
+
+MILLI = 3
+KOPECKS = 2
+# Значення до мільярда: різниця показників займає 13 цифр, добуток — 26, сума кількох добутків — 27.
+MAX_UNITS = 10 ** 12
+_MAX_DIGITS = len(str(MAX_UNITS))
+
+_POWERS = tuple(10 ** places for places in range(40))
+
+
+def _power(places: int) -> int:
+    return _POWERS[places] if places < len(_POWERS) else 10 ** places
+
+
+def rescale(units: int, places: int, target: int, rounding: str = ROUND_HALF_EVEN) -> int:
+    """Одиниці з ``places`` знаками, переведені до ``target`` знаків з округленням за ``rounding``."""
+    if target >= places:
+        return units * _power(target - places)
+    divisor = _power(places - target)
+    negative = units < 0
+    quotient, remainder = divmod(-units if negative else units, divisor)
+    if remainder:
+        if rounding == ROUND_HALF_EVEN:
+            twice = remainder * 2
+            if twice > divisor or twice == divisor and quotient & 1:
+                quotient += 1
+        elif rounding == ROUND_HALF_UP:
+            if remainder * 2 >= divisor:
+                quotient += 1
+        elif rounding == ROUND_HALF_DOWN:
+            if remainder * 2 > divisor:
+                quotient += 1
+        elif rounding == ROUND_UP:
+            quotient += 1
+        elif rounding == ROUND_CEILING:
+            quotient += not negative
+        elif rounding == ROUND_FLOOR:
+            quotient += negative
+        elif rounding == ROUND_05UP:
+            quotient += quotient % 10 in (0, 5)
+        elif rounding != ROUND_DOWN:
+            raise ValueError(f'Невідоме правило округлення {rounding!r}')
+    return -quotient if negative else quotient
+
+
+def units_text(units: int, places: int, target: int, strip_trailing: bool) -> str:
+    """Текст, який дав би ``format(value.quantize(Decimal(10) ** -target), 'f')`` з обрізанням нулів."""
+    # Від'ємне значення, округлене до нуля, у Decimal лишається "-0.00".
+    if units < 0:
+        sign, units = '-', -units
+    else:
+        sign = ''
+    if target < places:
+        units = rescale(units, places, target)
+    elif target > places:
+        units *= _power(target - places)
+    if not target:
+        return f'{sign}{units}'
+    digits = str(units)
+    if len(digits) <= target:
+        digits = digits.rjust(target + 1, '0')
+    whole, fraction = digits[:-target], digits[-target:]
+    if strip_trailing:
+        fraction = fraction.rstrip('0')
+        return f'{sign}{whole}.{fraction}' if fraction else f'{sign}{whole}'
+    return f'{sign}{whole}.{fraction}'
+
+
+class Fixed:
+    """Точне десяткове значення ``units / 10 ** places`` без ``-0``."""
+
+    __slots__ = ('units', 'places')
+
+    def __init__(self, units: int, places: int = MILLI) -> None:
+        self.units = units
+        self.places = places
+
+    @classmethod
+    def parse(cls, text: str) -> Optional['Fixed']:
+        """Тисячні з запису ``[+-]цифри[.цифри]``; ``None``, якщо запис інший або значення не вміщується."""
+        head = text[:1]
+        negative = head == '-'
+        if negative or head == '+':
+            text = text[1:]
+        whole, _, fraction = text.partition('.')
+        digits = whole + fraction
+        if not digits.isdigit() or not digits.isascii():
+            return None
+        fraction = fraction.rstrip('0')
+        if len(fraction) > MILLI:
+            return None
+        units = int(whole + fraction.ljust(MILLI, '0'))
+        if units >= MAX_UNITS or negative and not units:
+            return None
+        return cls(-units if negative else units)
+
+    @classmethod
+    def from_parts(cls, negative: bool, coefficient: int, exponent: int) -> Optional['Fixed']:
+        """Тисячні зі знаку, цілого коефіцієнта й десяткової експоненти, якщо значення вміщується."""
+        if negative and not coefficient:
+            return None
+        if not coefficient:
+            return cls(0)
+        digits = len(str(coefficient))
+        if digits + exponent + MILLI > _MAX_DIGITS:
+            return None
+        if exponent >= -MILLI:
+            units = coefficient * _power(exponent + MILLI)
+        else:
+            if -MILLI - exponent >= digits:
+                return None
+            units, remainder = divmod(coefficient, _power(-MILLI - exponent))
+            if remainder:
+                return None
+        if units >= MAX_UNITS:
+            return None
+        return cls(-units if negative else units)
+
+    @classmethod
+    def from_decimal(cls, value: Decimal) -> Optional['Fixed']:
+        sign, digits, exponent = value.as_tuple()
+        if not isinstance(exponent, int):
+            return None
+        coefficient = 0
+        for digit in digits:
+            coefficient = coefficient * 10 + digit
+        return cls.from_parts(bool(sign), coefficient, exponent)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(f'{self.units}E-{self.places}')
+
+    def rounded(self, places: int, rounding: str = ROUND_HALF_EVEN) -> int:
+        """Одиниці з ``places`` знаками після округлення."""
+        return rescale(self.units, self.places, places, rounding)
+
+    def _aligned(self, other: 'Fixed') -> Tuple[int, int, int]:
+        if self.places == other.places:
+            return self.units, other.units, self.places
+        if self.places > other.places:
+            return self.units, other.units * _power(self.places - other.places), self.places
+        return self.units * _power(other.places - self.places), other.units, other.places
+
+    def __add__(self, other: Any) -> Any:
+        if type(other) is Fixed:
+            left, right, places = self._aligned(other)
+            return Fixed(left + right, places)
+        if type(other) is int:
+            return Fixed(self.units + other * _power(self.places), self.places)
+        if isinstance(other, Decimal):
+            return self.to_decimal() + other
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any) -> Any:
+        if type(other) is Fixed:
+            left, right, places = self._aligned(other)
+            return Fixed(left - right, places)
+        if type(other) is int:
+            return Fixed(self.units - other * _power(self.places), self.places)
+        if isinstance(other, Decimal):
+            return self.to_decimal() - other
+        return NotImplemented
+
+    def __rsub__(self, other: Any) -> Any:
+        if type(other) is int:
+            return Fixed(other * _power(self.places) - self.units, self.places)
+        if isinstance(other, Decimal):
+            return other - self.to_decimal()
+        return NotImplemented
+
+    def __mul__(self, other: Any) -> Any:
+        if type(other) is Fixed:
+            units, places = self.units * other.units, self.places + other.places
+            if not units and (self.units < 0 or other.units < 0):
+                return Decimal(f'-0E-{places}')
+            return Fixed(units, places)
+        if type(other) is int:
+            if not other and self.units < 0 or not self.units and other < 0:
+                return Decimal(f'-0E-{self.places}')
+            return Fixed(self.units * other, self.places)
+        if isinstance(other, Decimal):
+            return self.to_decimal() * other
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Any:
+        if isinstance(other, (Fixed, int, Decimal)):
+            return self.to_decimal() / (other.to_decimal() if type(other) is Fixed else other)
+        return NotImplemented
+
+    def __rtruediv__(self, other: Any) -> Any:
+        if isinstance(other, (int, Decimal)):
+            return other / self.to_decimal()
+        return NotImplemented
+
+    def __neg__(self) -> 'Fixed':
+        return Fixed(-self.units, self.places)
+
+    def __pos__(self) -> 'Fixed':
+        return self
+
+    def __abs__(self) -> 'Fixed':
+        return Fixed(-self.units, self.places) if self.units < 0 else self
+
+    def __bool__(self) -> bool:
+        return self.units != 0
+
+    def _operands(self, other: Any) -> Optional[Tuple[int, int]]:
+        if type(other) is Fixed:
+            left, right, _ = self._aligned(other)
+            return left, right
+        if type(other) is int:
+            return self.units, other * _power(self.places)
+        return None
+
+    def __eq__(self, other: Any) -> Any:
+        operands = self._operands(other)
+        if operands is not None:
+            return operands[0] == operands[1]
+        if isinstance(other, Decimal):
+            return self.to_decimal() == other
+        return NotImplemented
+
+    def __lt__(self, other: Any) -> Any:
+        operands = self._operands(other)
+        if operands is not None:
+            return operands[0] < operands[1]
+        if isinstance(other, Decimal):
+            return self.to_decimal() < other
+        return NotImplemented
+
+    def __le__(self, other: Any) -> Any:
+        operands = self._operands(other)
+        if operands is not None:
+            return operands[0] <= operands[1]
+        if isinstance(other, Decimal):
+            return self.to_decimal() <= other
+        return NotImplemented
+
+    def __gt__(self, other: Any) -> Any:
+        operands = self._operands(other)
+        if operands is not None:
+            return operands[0] > operands[1]
+        if isinstance(other, Decimal):
+            return self.to_decimal() > other
+        return NotImplemented
+
+    def __ge__(self, other: Any) -> Any:
+        operands = self._operands(other)
+        if operands is not None:
+            return operands[0] >= operands[1]
+        if isinstance(other, Decimal):
+            return self.to_decimal() >= other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Як у рівного йому Decimal (і int, якщо значення ціле).
+        return hash(self.to_decimal())
+
+    def __str__(self) -> str:
+        return units_text(self.units, self.places, self.places, False)
+
+    def __repr__(self) -> str:
+        return f"Fixed('{self}')"
+
+    def __reduce__(self) -> Any:
+        return Fixed, (self.units, self.places)
+
+
+Number = Union[Fixed, Decimal]
+
+
+def to_number(value: Decimal) -> Number:
+    """``Fixed``, якщо значення вміщується в тисячні, інакше той самий ``Decimal``."""
+    fixed = Fixed.from_decimal(value)
+    return value if fixed is None else fixed
+
+
+def parse_number(text: str) -> Number:
+    """Як ``Decimal(text)``, але вміщуване значення повертається як ``Fixed``; помилки — ті самі."""
+    fixed = Fixed.parse(text)
+    return fixed if fixed is not None else to_number(Decimal(text))
+
+
+def to_decimal(value: Any) -> Any:
+    return value.to_decimal() if type(value) is Fixed else value
+
+
+__all__ = [
+    'KOPECKS',
+    'MAX_UNITS',
+    'MILLI',
+    'Fixed',
+    'Number',
+    'parse_number',
+    'rescale',
+    'to_decimal',
+    'to_number',
+    'units_text',
+]
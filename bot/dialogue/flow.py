@@ -1,16 +1,98 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from bot.dialogue import constants
+from bot.dialogue.fixed import Fixed, Number, parse_number, to_decimal, to_number
+
+
+EMPTY_TEXT_ERROR = 'Поле не може бути порожнім.'
+PERIOD_ERROR = 'Не впізнаю формат. Використайте MM-YYYY, наприклад 01-2026.'
+DECIMAL_ERROR = 'Будь ласка, введіть числове значення (наприклад, 123.45).'
+WHOLE_ERROR = 'Будь ласка, введіть ціле невід\'ємне число (наприклад, 3).'
+UNKNOWN_STEP_ERROR = 'Невідомий крок. Спробуйте почати заново через /start.'
+
+
+STEP_COUNT = len(constants.STEP_ORDER)
+STEP_POSITIONS = {step: index for index, step in enumerate(constants.STEP_ORDER)}
+PAYLOAD_POSITIONS = {constants.STEP_PAYLOAD_KEYS[step]: index for index, step in enumerate(constants.STEP_ORDER)}
 
 
-@dataclass
 class DialogueState:
-    step_index: int = 0
-    payload: Dict[str, Any] = field(default_factory=dict)
+    """Стан діалогу з фіксованими слотами: значення кроку лежить у ``values`` за його позицією в ``STEP_ORDER``.
+
+    Порожній слот — ``None``; кроки, заповнені з профілю, позначаються бітами ``prefilled_mask``.
+    ``payload`` збирає звичний словник для калькулятора, профілю та історії.
+    """
+
+    __slots__ = ('step_index', 'values', 'prefilled_mask', 'tariff_preset')
+
+    def __init__(
+        self,
+        step_index: int = 0,
+        payload: Optional[Dict[str, Any]] = None,
+        prefilled: Optional[List[str]] = None,
+    ) -> None:
+        self.step_index = step_index
+        self.values: List[Any] = [None] * STEP_COUNT
+        self.prefilled_mask = 0
+        self.tariff_preset: Optional[str] = None
+        if payload:
+            self.update(payload)
+        for step in prefilled or ():
+            self.prefilled_mask |= 1 << STEP_POSITIONS[step]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DialogueState):
+            return NotImplemented
+        return (
+            self.step_index == other.step_index
+            and self.values == other.values
+            and self.prefilled_mask == other.prefilled_mask
+            and self.tariff_preset == other.tariff_preset
+        )
+
+    def __repr__(self) -> str:
+        return f'DialogueState(step_index={self.step_index!r}, payload={self.payload!r}, prefilled={self.prefilled!r})'
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        payload = {
+            constants.STEP_PAYLOAD_KEYS[step]: value
+            for step, value in zip(constants.STEP_ORDER, self.values)
+            if value is not None
+        }
+        if self.tariff_preset is not None:
+            payload[constants.TARIFF_PRESET_KEY] = self.tariff_preset
+        return payload
+
+    @property
+    def prefilled(self) -> List[str]:
+        mask = self.prefilled_mask
+        return [step for index, step in enumerate(constants.STEP_ORDER) if mask >> index & 1]
+
+    def is_prefilled(self, index: int) -> bool:
+        return bool(self.prefilled_mask >> index & 1)
+
+    def get(self, step: str) -> Any:
+        return self.values[STEP_POSITIONS[step]]
+
+    def set(self, step: str, value: Any) -> None:
+        self.values[STEP_POSITIONS[step]] = value
+
+    def discard(self, step: str) -> None:
+        self.values[STEP_POSITIONS[step]] = None
+
+    def update(self, payload: Dict[str, Any]) -> None:
+        """Розкладає словник у форматі payload по слотах; невідомі ключі пропускаються."""
+        for key, value in payload.items():
+            position = PAYLOAD_POSITIONS.get(key)
+            if position is not None:
+                self.values[position] = value
+            elif key == constants.TARIFF_PRESET_KEY:
+                self.tariff_preset = value
 
 
 @dataclass
@@ -41,13 +123,43 @@ class PaymentFlow:
     def current_prompt(self) -> str:
         return constants.STEP_PROMPTS[self.current_step]
 
+    @property
+    def prefilled(self) -> List[str]:
+        return self.state.prefilled
+
+    def prefill(self, values: Dict[str, Any]) -> None:
+        """Заповнює кроки готовими значеннями; діалог далі питає лише про решту."""
+        self.state.update(values)
+        self.state.prefilled_mask = 0
+        for key in values:
+            position = PAYLOAD_POSITIONS.get(key)
+            if position is not None:
+                self.state.prefilled_mask |= 1 << position
+        self.state.step_index = 0
+        if self.state.is_prefilled(0):
+            self._advance()
+
+    def apply_tariffs(self, preset: str, values: Dict[str, Any]) -> bool:
+        """Заповнює всі кроки тарифів готовим набором; повертає ``False``, якщо далі питати нічого."""
+        self.state.update(values)
+        self.state.tariff_preset = preset
+        self.state.step_index = STEP_POSITIONS[constants.TARIFF_STEPS[-1]]
+        return self._advance()
+
     def go_back(self) -> bool:
-        if self.state.step_index == 0:
+        index = self.state.step_index - 1
+        while index >= 0 and self.state.is_prefilled(index):
+            index -= 1
+        if index < 0:
             return False
-        self.state.step_index -= 1
-        previous_step = constants.STEP_ORDER[self.state.step_index]
-        payload_key = constants.STEP_PAYLOAD_KEYS[previous_step]
-        self.state.payload.pop(payload_key, None)
+        if constants.STEP_ORDER[index] in constants.TARIFF_STEPS and self.state.tariff_preset is not None:
+            # Тарифи з набору скасовуються разом і діалог повертається до першого з них.
+            self.state.tariff_preset = None
+            index = STEP_POSITIONS[constants.TARIFF_STEPS[0]]
+            for step in constants.TARIFF_STEPS:
+                self.state.discard(step)
+        self.state.step_index = index
+        self.state.values[index] = None
         return True
 
     def process(self, text: str) -> FlowResult:
@@ -62,51 +174,91 @@ class PaymentFlow:
         if step in constants.NUMERIC_STEPS:
             return self._store_decimal(step, text)
 
-        return FlowResult(success=False, error='Невідомий крок. Спробуйте почати заново через /start.')
+        return FlowResult(success=False, error=UNKNOWN_STEP_ERROR)
+
+    @classmethod
+    def parse_value(cls, step: str, raw_text: str) -> Tuple[Any, Optional[str]]:
+        """Перевіряє значення кроку за тими самими правилами, що й ``process``, не змінюючи стан.
+
+        Повертає ``(значення, None)`` або ``(None, текст помилки)``.
+        """
+        if step in constants.TEXT_STEPS:
+            value = raw_text.strip()
+            return (value, None) if value else (None, EMPTY_TEXT_ERROR)
+        if step == constants.PERIOD_STEP:
+            period = cls._parse_period(raw_text)
+            return (period, None) if period is not None else (None, PERIOD_ERROR)
+        if step in constants.NUMERIC_STEPS:
+            return cls._parse_step_number(step, raw_text)
+        return None, UNKNOWN_STEP_ERROR
 
     def _store_text(self, step: str, value: str) -> FlowResult:
         if not value:
-            return FlowResult(success=False, error='Поле не може бути порожнім.')
-        self.state.payload[constants.STEP_PAYLOAD_KEYS[step]] = value
+            return FlowResult(success=False, error=EMPTY_TEXT_ERROR)
+        self.state.set(step, value)
         finished = not self._advance()
         return FlowResult(success=True, finished=finished)
 
     def _store_period(self, raw_text: str) -> FlowResult:
-        text = raw_text.strip()
-        match = constants.PERIOD_PATTERN.fullmatch(text)
-        if not match:
-            return FlowResult(success=False, error='Не впізнаю формат. Використайте MM-YYYY, наприклад 01-2026.')
-        month, year = int(match.group(1)), int(match.group(2))
-        self.state.payload['period'] = {'month': month, 'year': year}
+        period = self._parse_period(raw_text)
+        if period is None:
+            return FlowResult(success=False, error=PERIOD_ERROR)
+        self.state.set(constants.PERIOD_STEP, period)
         finished = not self._advance()
         return FlowResult(success=True, finished=finished)
 
     def _store_decimal(self, step: str, raw_text: str) -> FlowResult:
-        parsed = self._parse_decimal(raw_text)
-        if parsed is None:
-            return FlowResult(success=False, error='Будь ласка, введіть числове значення (наприклад, 123.45).')
-        self.state.payload[constants.STEP_PAYLOAD_KEYS[step]] = parsed
-        finished = step == constants.AREA_STEP
-        if not finished:
-            finished = not self._advance()
+        parsed, error = self._parse_step_number(step, raw_text)
+        if error is not None:
+            return FlowResult(success=False, error=error)
+        self.state.set(step, parsed)
+        finished = not self._advance()
         return FlowResult(success=True, finished=finished)
 
     def _advance(self) -> bool:
-        if self.state.step_index + 1 >= len(constants.STEP_ORDER):
+        index = self.state.step_index + 1
+        if self.state.prefilled_mask:
+            while index < STEP_COUNT and self.state.is_prefilled(index):
+                index += 1
+        if index >= STEP_COUNT:
             return False
-        self.state.step_index += 1
+        self.state.step_index = index
         return True
 
     @staticmethod
-    def _parse_decimal(raw_text: str) -> Optional[Decimal]:
+    def _parse_period(raw_text: str) -> Optional[Dict[str, int]]:
+        match = constants.PERIOD_PATTERN.fullmatch(raw_text.strip())
+        if not match:
+            return None
+        return {'month': int(match.group(1)), 'year': int(match.group(2))}
+
+    @classmethod
+    def _parse_step_number(cls, step: str, raw_text: str) -> Tuple[Optional[Number], Optional[str]]:
+        parsed = cls._parse_decimal(raw_text)
+        if parsed is None:
+            return None, DECIMAL_ERROR
+        if step in constants.WHOLE_STEPS:
+            # Кількість людей: ``3.0`` приймається як ``3``, дробові й від'ємні — ні.
+            number = to_decimal(parsed)
+            if not number.is_finite() or number < 0 or number != number.to_integral_value():
+                return None, WHOLE_ERROR
+            parsed = parse_number(str(int(number)))
+        return parsed, None
+
+    @staticmethod
+    def _parse_decimal(raw_text: str) -> Optional[Number]:
+        """Число кроку: ``Fixed`` у тисячних, а що в них не вміщується — ``Decimal`` як раніше."""
         trimmed = raw_text.strip()
         if not trimmed:
             return None
         normalized = trimmed.replace(' ', '').replace(',', '.').rstrip('.').rstrip(',')
         if not normalized:
             return None
+        fixed = Fixed.parse(normalized)
+        if fixed is not None:
+            return fixed
         try:
-            return Decimal(normalized)
+            return to_number(Decimal(normalized))
         except InvalidOperation:
             return None
 
@@ -1,16 +1,88 @@
 from __future__ import annotations
 
 from decimal import Decimal, InvalidOperation
-from typing import Dict
+from functools import lru_cache
+from typing import Any, Callable, Dict
 
 from bot.dialogue.constants import MONTH_NAMES, MONTH_NAMES_LOCATIVE, THREE_DECIMALS, TWO_DECIMALS
+from bot.dialogue.fixed import KOPECKS, MILLI, Fixed, Number, units_text
+
+
+class _Uncacheable(Exception):
+    """Значення не вдалося квантувати — його текст залежить від запису, а не лише від величини."""
+
+
+def _fixed_text(value: Decimal, quantum: Decimal, strip_trailing: bool) -> str:
+    try:
+        quantized = value.quantize(quantum)
+    except InvalidOperation:
+        raise _Uncacheable from None
+    text = format(quantized, 'f')
+    if strip_trailing:
+        text = text.rstrip('0').rstrip('.')
+    return text or '0'
+
+
+@lru_cache(maxsize=4096)
+def _cached_quantity(value: Decimal) -> str:
+    return _fixed_text(value, THREE_DECIMALS, True)
+
+
+@lru_cache(maxsize=1024)
+def _cached_tariff(value: Decimal) -> str:
+    return _fixed_text(value, THREE_DECIMALS, True)
+
+
+@lru_cache(maxsize=4096)
+def _cached_money(value: Decimal) -> str:
+    return _fixed_text(value, TWO_DECIMALS, False)
+
+
+@lru_cache(maxsize=256)
+def _cached_month_name(month: int, year: int) -> tuple[str, str, int]:
+    return MONTH_NAMES.get(month, ''), MONTH_NAMES_LOCATIVE.get(month, MONTH_NAMES.get(month, '')), year
+
+
+@lru_cache(maxsize=256)
+def _cached_period_dates(month: int, year: int) -> tuple[str, str]:
+    prev_month = month - 1
+    prev_year = year
+    if prev_month == 0:
+        prev_month = 12
+        prev_year -= 1
+    prev_date = f'01.{prev_month:02d}.{prev_year}'
+    current_date = f'01.{month:02d}.{year}'
+    return prev_date, current_date
+
+
+# ``Fixed`` кешується за цілими одиницями: хешувати ``int`` дешевше, ніж ``Decimal``.
+_cached_units_text = lru_cache(maxsize=4096)(units_text)
+
+
+_CACHES: Dict[str, Callable[..., Any]] = {
+    'quantity': _cached_quantity,
+    'tariff': _cached_tariff,
+    'money': _cached_money,
+    'fixed': _cached_units_text,
+    'month_name': _cached_month_name,
+    'period_dates': _cached_period_dates,
+}
 
 
 class ValueFormatter:
-    """Форматує числові та календарні значення для повідомлень."""
+    """Форматує числові та календарні значення для повідомлень.
+
+    ``Fixed`` форматується цілочисельно, без ``quantize``, і дає той самий текст, що й рівний йому
+    ``Decimal``. Для ``Decimal`` ``quantity``, ``tariff``, ``money``, а також ``month_name`` і
+    ``period_dates`` запам'ятовуються в обмежених LRU-кешах, спільних для всіх екземплярів: тарифи й
+    періоди повторюються від розрахунку до розрахунку.
+    """
 
     @staticmethod
-    def decimal_for_summary(value: Decimal) -> str:
+    def decimal_for_summary(value: Number) -> str:
+        if type(value) is Fixed:
+            # Як ``normalize``: без хвостових нулів дробової частини.
+            return _cached_units_text(value.units, value.places, value.places, True).replace('.', ',')
         text = format(value.normalize(), 'f')
         return text.replace('.', ',')
 
@@ -26,35 +98,56 @@ class ValueFormatter:
         return text or '0'
 
     @classmethod
-    def quantity(cls, value: Decimal) -> str:
-        return cls.decimal_fixed(value, THREE_DECIMALS)
+    def quantity(cls, value: Number) -> str:
+        if type(value) is Fixed:
+            return _cached_units_text(value.units, value.places, MILLI, True)
+        # -0 дорівнює 0, але форматується як "-0", тому такі значення оминають кеш.
+        if not value and value.is_signed():
+            return cls.decimal_fixed(value, THREE_DECIMALS)
+        try:
+            return _cached_quantity(value)
+        except _Uncacheable:
+            return cls.decimal_fixed(value, THREE_DECIMALS)
 
     @classmethod
-    def tariff(cls, value: Decimal) -> str:
-        return cls.decimal_fixed(value, THREE_DECIMALS)
+    def tariff(cls, value: Number) -> str:
+        if type(value) is Fixed:
+            return _cached_units_text(value.units, value.places, MILLI, True)
+        if not value and value.is_signed():
+            return cls.decimal_fixed(value, THREE_DECIMALS)
+        try:
+            return _cached_tariff(value)
+        except _Uncacheable:
+            return cls.decimal_fixed(value, THREE_DECIMALS)
 
     @classmethod
-    def money(cls, value: Decimal) -> str:
-        return cls.decimal_fixed(value, TWO_DECIMALS, strip_trailing=False)
+    def money(cls, value: Number) -> str:
+        if type(value) is Fixed:
+            return _cached_units_text(value.units, value.places, KOPECKS, False)
+        if not value and value.is_signed():
+            return cls.decimal_fixed(value, TWO_DECIMALS, strip_trailing=False)
+        try:
+            return _cached_money(value)
+        except _Uncacheable:
+            return cls.decimal_fixed(value, TWO_DECIMALS, strip_trailing=False)
 
     @staticmethod
     def month_name(period: Dict[str, int]) -> tuple[str, str, int]:
-        month = period['month']
-        year = period['year']
-        return MONTH_NAMES.get(month, ''), MONTH_NAMES_LOCATIVE.get(month, MONTH_NAMES.get(month, '')), year
+        return _cached_month_name(period['month'], period['year'])
 
     @staticmethod
     def period_dates(period: Dict[str, int]) -> tuple[str, str]:
-        month = period['month']
-        year = period['year']
-        prev_month = month - 1
-        prev_year = year
-        if prev_month == 0:
-            prev_month = 12
-            prev_year -= 1
-        prev_date = f'01.{prev_month:02d}.{prev_year}'
-        current_date = f'01.{month:02d}.{year}'
-        return prev_date, current_date
+        return _cached_period_dates(period['month'], period['year'])
+
+    @staticmethod
+    def cache_info() -> Dict[str, Any]:
+        """Лічильники влучань і промахів кожного кешу (``functools._CacheInfo``)."""
+        return {name: cached.cache_info() for name, cached in _CACHES.items()}
+
+    @staticmethod
+    def clear_caches() -> None:
+        for cached in _CACHES.values():
+            cached.cache_clear()
 
 
 __all__ = ['ValueFormatter']
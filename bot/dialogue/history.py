@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import List, Optional
+
+from bot.dialogue import templates
+from bot.dialogue.formatting import ValueFormatter
+from bot.storage.history import HistoryPoint, UsageSeries
+
+
+HISTORY_MONTHS = 6
+EMPTY_HISTORY_TEXT = 'Історія порожня: тут з\'являться Ваші розрахунки після першого /start.'
+SINGLE_PERIOD_TEXT = 'Для порівняння потрібні розрахунки хоча б за два місяці.'
+
+
+def _period_label(point: HistoryPoint) -> str:
+    return f'{point.month:02d}-{point.year}'
+
+
+def _change(previous: Decimal, current: Decimal, formatter: ValueFormatter, money: bool = False) -> str:
+    delta = current - previous
+    if not delta:
+        return 'без змін'
+    text = formatter.money(abs(delta)) if money else formatter.quantity(abs(delta))
+    sign = '+' if delta > 0 else '−'
+    if previous:
+        percent = (abs(delta) * 100 / abs(previous)).quantize(Decimal('0.1'))
+        return f'{sign}{text}, {sign}{percent}%'
+    return f'{sign}{text}'
+
+
+def history_text(series: UsageSeries, formatter: Optional[ValueFormatter] = None) -> str:
+    """Останні ``HISTORY_MONTHS`` місяців і середні значення по всій історії."""
+    average = series.average()
+    if average is None:
+        return EMPTY_HISTORY_TEXT
+    fmt = formatter or ValueFormatter()
+    lines: List[str] = [f'🗂 Останні розрахунки ({min(len(series), HISTORY_MONTHS)} з {len(series)}):\n']
+    for point in series.last(HISTORY_MONTHS):
+        lines.append(templates.HISTORY_LINE(
+            period=_period_label(point),
+            cold=fmt.quantity(point.cold_usage),
+            hot=fmt.quantity(point.hot_usage),
+            total=fmt.money(point.total),
+        ))
+    lines.append(
+        f'\nУ середньому за місяць: холодна {fmt.quantity(average.cold_usage)} м³, '
+        f'гаряча {fmt.quantity(average.hot_usage)} м³ — {fmt.money(average.total)} грн'
+    )
+    return ''.join(lines)
+
+
+def trend_text(series: UsageSeries, formatter: Optional[ValueFormatter] = None) -> str:
+    """Порівняння двох останніх періодів: споживання й сума до оплати."""
+    if not len(series):
+        return EMPTY_HISTORY_TEXT
+    if len(series) < 2:
+        return SINGLE_PERIOD_TEXT
+    fmt = formatter or ValueFormatter()
+    previous, current = series.last(2)
+    lines = [f'📈 {_period_label(current)} у порівнянні з {_period_label(previous)}:\n']
+    for label, before, after, unit in (
+        ('Холодна вода', previous.cold_usage, current.cold_usage, 'м³'),
+        ('Гаряча вода', previous.hot_usage, current.hot_usage, 'м³'),
+    ):
+        lines.append(templates.TREND_LINE(
+            label=label, previous=fmt.quantity(before), current=fmt.quantity(after), unit=unit,
+            change=_change(before, after, fmt),
+        ))
+    lines.append(templates.TREND_LINE(
+        label='До оплати', previous=fmt.money(previous.total), current=fmt.money(current.total), unit='грн',
+        change=_change(previous.total, current.total, fmt, money=True),
+    ))
+    return ''.join(lines).rstrip('\n')
+
+
+__all__ = ['history_text', 'trend_text']
@@ -0,0 +1,97 @@
+"""Швидкий розрахунок в inline-режимі: ``@бот 123.4 130.1 30.384 68.1 8``.
+
+Числа йдуть у порядку ``INLINE_STEPS``: показники й тариф холодної води, площа й тариф обслуговування,
+далі за бажанням — показники й тариф гарячої води та тариф опалення. Пропущені значення дорівнюють нулю,
+тож ці послуги не входять у підсумок. Кожне число перевіряється тими самими правилами, що й у діалозі.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from bot.dialogue import constants
+from bot.dialogue.calculator import PaymentCalculator
+from bot.dialogue.fixed import Fixed
+from bot.dialogue.flow import PaymentFlow
+
+
+INLINE_STEPS = (
+    constants.COLD_PREV_STEP,
+    constants.COLD_CURR_STEP,
+    constants.COLD_TARIFF_STEP,
+    constants.AREA_STEP,
+    constants.RENT_TARIFF_STEP,
+    constants.HOT_PREV_STEP,
+    constants.HOT_CURR_STEP,
+    constants.HOT_TARIFF_STEP,
+    constants.HEAT_TARIFF_STEP,
+)
+# Допустима кількість чисел: без гарячої води й опалення, з гарячою водою, з усім.
+INLINE_COUNTS = (5, 8, 9)
+
+INLINE_USAGE = (
+    'Швидкий розрахунок без діалогу: числа через пробіл у такому порядку —\n'
+    'холодна попередні, холодна поточні, тариф холодної, площа, тариф обслуговування\n'
+    '[, гаряча попередні, гаряча поточні, тариф гарячої [, тариф опалення]].\n'
+    'Наприклад: 123.4 130.1 30.384 68.1 8'
+)
+INLINE_USAGE_TITLE = 'Швидкий розрахунок'
+INLINE_USAGE_DESCRIPTION = 'хол. попер. · хол. поточ. · тариф · площа · тариф обслуг. [· гаряча · опалення]'
+
+_ZERO = Fixed(0)
+
+
+@dataclass(frozen=True)
+class InlineRequest:
+    payload: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class InlineAnswer:
+    title: str
+    description: str
+    text: str
+
+
+def normalize_query(query: str) -> str:
+    """Ключ кешу без розбору чисел: однакові пробіли й десяткова крапка замість коми."""
+    return ' '.join(query.replace(',', '.').split())
+
+
+def parse_query(query: str) -> InlineRequest:
+    tokens = query.split()
+    if not tokens:
+        return InlineRequest()
+    if len(tokens) not in INLINE_COUNTS:
+        counts = ', '.join(str(count) for count in INLINE_COUNTS[:-1])
+        return InlineRequest(
+            error=f'Потрібно {counts} або {INLINE_COUNTS[-1]} чисел, отримано {len(tokens)}.',
+        )
+
+    # Нулі й для послуг каталогу, яких немає в запиті: за нульових входів вони не входять у підсумок.
+    payload: Dict[str, Any] = {constants.STEP_PAYLOAD_KEYS[step]: _ZERO for step in constants.NUMERIC_STEPS}
+    for position, (step, token) in enumerate(zip(INLINE_STEPS, tokens), start=1):
+        value, error = PaymentFlow.parse_value(step, token)
+        if error:
+            return InlineRequest(error=f'{position}-е число ({token}): {error}')
+        payload[constants.STEP_PAYLOAD_KEYS[step]] = value
+    return InlineRequest(payload=payload)
+
+
+def render(request: InlineRequest, calculator: PaymentCalculator) -> InlineAnswer:
+    if request.payload is None:
+        if request.error:
+            return InlineAnswer('Не вдалося порахувати', request.error, INLINE_USAGE)
+        return InlineAnswer(INLINE_USAGE_TITLE, INLINE_USAGE_DESCRIPTION, INLINE_USAGE)
+    amounts = calculator.amounts(request.payload)
+    fmt = calculator.formatter
+    description = f'Холодна {fmt.money(amounts.cold)} · обслуговування {fmt.money(amounts.rent)}'
+    if amounts.hot:
+        description += f' · гаряча {fmt.money(amounts.hot)}'
+    if amounts.heat:
+        description += f' · опалення {fmt.money(amounts.heat)}'
+    return InlineAnswer(f'Всього — {fmt.money(amounts.total)} грн', description, calculator.brief(request.payload))
+
+
+__all__ = ['INLINE_STEPS', 'INLINE_USAGE', 'InlineAnswer', 'InlineRequest', 'normalize_query', 'parse_query', 'render']
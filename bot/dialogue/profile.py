@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from bot.dialogue import constants, templates
+from bot.dialogue.formatting import ValueFormatter
+from bot.dialogue.services import NUMBER
+
+
+def _lower_first(text: str) -> str:
+    return text[:1].lower() + text[1:]
+
+
+_CATALOG = constants.CATALOG
+_TARIFFS = [tariff for service in _CATALOG.services for tariff in service.tariffs]
+_TARIFF_KEYS = {tariff.field.key for tariff in _TARIFFS}
+# Запам'ятовані кількості (площа, мешканці): усе числове з профілю, крім тарифів.
+_QUANTITIES = [
+    field for field in _CATALOG.fields if field.remember and field.kind == NUMBER and field.key not in _TARIFF_KEYS
+]
+
+# Рядки показників, тарифів і кількостей будуються з каталогу послуг, тож підтвердження показує все, що
+# профіль підставить у наступний розрахунок.
+PROFILE_CONFIRMATION = templates.compile_template('PROFILE_CONFIRMATION', ''.join((
+    '📋 Знайшов дані з Вашого минулого розрахунку:\n\n',
+    'ПІБ: {full_name}\n',
+    'Адреса: {address}\n',
+    'Період: {period}\n',
+    'Попередні показники: ',
+    ', '.join(f'{_lower_first(meter.title)} {{{meter.prev.key}}} {meter.unit}' for meter in _CATALOG.meters),
+    '\nТарифи: ',
+    ', '.join(f'{_lower_first(tariff.title)} {{{tariff.field.key}}} {tariff.unit}' for tariff in _TARIFFS),
+    '\n',
+    ''.join(f'{field.label}: {{{field.key}}}{" " + field.unit if field.unit else ""}\n' for field in _QUANTITIES),
+    '\nЯкщо все вірно, натисніть «{confirm}» — залишиться ввести лише поточні показники. ',
+    'Щоб заповнити все заново, натисніть «{reset}».',
+)))
+
+
+def next_period(period: Dict[str, int]) -> Dict[str, int]:
+    month, year = period['month'] + 1, period['year']
+    if month > 12:
+        month, year = 1, year + 1
+    return {'month': month, 'year': year}
+
+
+def prefill_from_profile(saved: Dict[str, Any]) -> Dict[str, Any]:
+    """Значення для наступного розрахунку: ті самі дані й тарифи, наступний місяць, показники зі зсувом."""
+    values = {key: saved[key] for key in constants.PROFILE_KEYS if key in saved}
+    for prev_key, curr_key in constants.PROFILE_READINGS.items():
+        if curr_key in saved:
+            values[prev_key] = saved[curr_key]
+    if 'period' in saved:
+        values['period'] = next_period(saved['period'])
+    return values
+
+
+def is_complete_prefill(values: Dict[str, Any]) -> bool:
+    """Профіль корисний, лише якщо заповнює все, крім поточних показників."""
+    required = set(constants.PROFILE_KEYS) | set(constants.PROFILE_READINGS) | {'period'}
+    return required <= values.keys()
+
+
+def confirmation_text(values: Dict[str, Any], formatter: Optional[ValueFormatter] = None) -> str:
+    fmt = formatter or ValueFormatter()
+    period = values['period']
+    readings = {meter.prev.key: fmt.quantity(values[meter.prev.key]) for meter in _CATALOG.meters}
+    tariffs = {tariff.field.key: fmt.tariff(values[tariff.field.key]) for tariff in _TARIFFS}
+    quantities = {field.key: fmt.quantity(values[field.key]) for field in _QUANTITIES}
+    return PROFILE_CONFIRMATION(
+        full_name=values['full_name'],
+        address=values['address'],
+        period=f"{period['month']:02d}-{period['year']}",
+        confirm=constants.CONFIRM_PROFILE_TEXT,
+        reset=constants.RESET_PROFILE_TEXT,
+        **readings,
+        **tariffs,
+        **quantities,
+    )
+
+__all__ = ['PROFILE_CONFIRMATION', 'confirmation_text', 'is_complete_prefill', 'next_period', 'prefill_from_profile']
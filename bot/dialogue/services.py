@@ -0,0 +1,583 @@
+"""Декларативні послуги рахунку та їх компіляція у функції розрахунку.
+
+Послуга описує свої входи (лічильники, тарифи, кількості на кшталт площі), формулу суми, умову, за
+якої вона потрапляє в рахунок, округлення суми й текст секції. ``ServiceCatalog`` один раз при
+створенні перевіряє формули й генерує з усіх послуг вихідний код кількох функцій — як
+``compile_template`` робить f-рядки з шаблонів. Тож під час розрахунку формули не розбираються і
+визначення не обходяться: виконується той самий прямолінійний код, що написали б вручну. З того самого
+каталогу будуються кроки діалогу, підписи швидкої форми й поля профілю.
+
+Формула — вираз Python над назвами входів і витрат лічильників (``<лічильник>_usage``): числа,
+``+ - * /``, порівняння, ``and``/``or``/``not``. Дробові літерали заборонені, бо стали б ``float``.
+
+Формули без ділення компілюються ще й у цілочисельний варіант над одиницями ``Fixed``: добутки
+складають знаки після коми, доданки вирівнюються множенням на степінь десяти, округлення до копійок —
+``rescale``. Він обирається, коли всі числа payload — ``Fixed``, і дає ті самі значення, що й
+``Decimal``; нульові суми (де важливий знак нуля) і payload із ``Decimal`` рахуються ``Decimal``-шляхом.
+Чи вдалося побудувати цілочисельний варіант, показує ``ServiceCatalog.fixed``.
+"""
+from __future__ import annotations
+
+import ast
+import hashlib
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bot.dialogue.fixed import MAX_UNITS, MILLI, Fixed, rescale, to_decimal
+from bot.dialogue.templates import compile_template
+
+
+TEXT = 'text'
+PERIOD = 'period'
+NUMBER = 'number'
+
+QUANTITY = 'quantity'
+TARIFF = 'tariff'
+MONEY = 'money'
+DISPLAY_FORMATS = (QUANTITY, TARIFF, MONEY)
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.USub, ast.UAdd, ast.Not, ast.And, ast.Or,
+    ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq,
+)
+_COMPARISONS = {ast.Gt: '>', ast.GtE: '>=', ast.Lt: '<', ast.LtE: '<=', ast.Eq: '==', ast.NotEq: '!='}
+# Показники й тарифи менші за ``MAX_UNITS`` тисячних; ``Decimal`` рахує точно до 28 цифр.
+_INPUT_DIGITS = len(str(MAX_UNITS - 1))
+_PRECISION = 28
+
+
+@dataclass(frozen=True)
+class Field:
+    """Крок діалогу: ключ у payload, підказка й підпис у швидкій формі."""
+
+    key: str
+    prompt: str
+    label: str
+    kind: str = NUMBER
+    # Переноситься з профілю в наступний розрахунок без змін.
+    remember: bool = False
+    # Одиниця кількості (площа, мешканці) у підтвердженні профілю.
+    unit: str = ''
+    # Лише цілі невід'ємні значення (кількість людей).
+    whole: bool = False
+
+
+@dataclass(frozen=True)
+class Meter:
+    """Лічильник: попередні й поточні показники, рядок у блоці показників і в призначенні платежу."""
+
+    key: str
+    title: str
+    code: str
+    unit: str
+    prev: Field
+    curr: Field
+    # Заголовок колонки показників, якщо всі лічильники блоку з однієї групи (``Вода``); порожня — ``title``.
+    group: str = ''
+
+    @property
+    def usage(self) -> str:
+        return f'{self.key}_usage'
+
+
+@dataclass(frozen=True)
+class Tariff:
+    field: Field
+    title: str
+    unit: str
+
+
+@dataclass(frozen=True)
+class Service:
+    """Послуга рахунку.
+
+    ``amount`` — формула суми, ``condition`` — формула, за якої послуга входить у рахунок (порожня —
+    завжди), ``round_to`` — квант, до якого сума округлюється за ``rounding`` перед підсумком (``None`` —
+    сума точна, округлюється лише при показі). ``display`` — поля шаблону ``section``: ``(поле, формула,
+    формат)``, де формат — ``quantity``, ``tariff`` або ``money``; поле ``amount`` додається саме. Поля
+    ``quantity`` і ``tariff`` стають колонками квитанції.
+    """
+
+    key: str
+    label: str
+    section: str
+    amount: str
+    display: Tuple[Tuple[str, str, str], ...]
+    meters: Tuple[Meter, ...] = ()
+    tariffs: Tuple[Tariff, ...] = ()
+    quantities: Tuple[Field, ...] = ()
+    condition: str = ''
+    round_to: Optional[Decimal] = None
+    rounding: str = ROUND_HALF_UP
+
+
+@dataclass(frozen=True)
+class BlockTexts:
+    """Незмінні частини блоків розрахунку, між якими стоять рядки лічильників і тарифів.
+
+    У ``readings_header`` каталог підставляє ``{units}`` — `` (м³)``, якщо в усіх лічильників блоку одна
+    одиниця, — і ``{meters}`` — спільну групу лічильників або ``readings_column``, якщо групи різні.
+    """
+
+    readings_header: str
+    tariffs_header: str
+    tariffs_footer: str
+    summary_prefix: str
+    summary_reading: str
+    readings_column: str = 'Лічильник'
+
+
+def step_fingerprint(steps: Iterable[Tuple[str, str]]) -> bytes:
+    """Чотири байти хешу пар ``(крок, вид)`` у порядку діалогу."""
+    return hashlib.blake2b('|'.join(f'{key}:{kind}' for key, kind in steps).encode(), digest_size=4).digest()
+
+
+def _literal(text: str) -> str:
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def _rename(expression: str, names: Sequence[str], prefix: str, where: str) -> str:
+    """Перевіряє формулу і повертає її код, де кожна назва входу замінена локальною змінною."""
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as exc:
+        raise ValueError(f'{where}: формула {expression!r} не розбирається') from exc
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f'{where}: у формулі {expression!r} недопустимий елемент {type(node).__name__}')
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, int)):
+            raise ValueError(f'{where}: у формулі {expression!r} допустимі лише цілі літерали')
+        if isinstance(node, ast.Name):
+            if node.id not in names:
+                raise ValueError(f'{where}: формула {expression!r} посилається на невідоме {node.id!r}')
+            node.id = prefix + node.id
+    return ast.unparse(tree)
+
+
+class _NotFixed(Exception):
+    """Формулу не можна порахувати в цілих одиницях з тим самим результатом, що й у ``Decimal``."""
+
+
+@dataclass(frozen=True)
+class _Formulas:
+    """Формули послуги, перевірені й переписані в код над локальними змінними ``v_*``."""
+
+    index: int
+    service: Service
+    where: str
+    names: List[str]
+    usages: List[str]
+    amount: str
+    condition: str
+    display: List[Tuple[str, str, str]]
+
+    def section_call(self) -> str:
+        fields = [name for name, _, _ in self.display]
+        arguments = ''.join(f'{name}=d_{name}, ' for name in fields)
+        quantity = 'd_quantity' if 'quantity' in fields else "''"
+        tariff = 'd_tariff' if 'tariff' in fields else "''"
+        return (
+            f'section(LABEL_{self.index}, SECTION_{self.index}({arguments}amount=amount_text), '
+            f'amount, amount_text, {quantity}, {tariff})'
+        )
+
+
+def _fixed(expression: str, digits: Dict[str, int], where: str, condition: bool = False) -> Tuple[str, int, int]:
+    """Код формули над цілими ``u_*``: ``(код, знаків після коми, найбільша кількість цифр)``.
+
+    Вхідні значення мають ``MILLI`` знаків, добуток складає знаки множників, сума й порівняння
+    зводять доданки до більшої кількості знаків множенням на степінь десяти.
+    """
+    code, places, size, number = _fixed_node(ast.parse(expression, mode='eval').body, digits)
+    if not number and not condition:
+        raise ValueError(f'{where}: формула {expression!r} має давати число')
+    return code, places, size
+
+
+def _fixed_node(node: ast.AST, digits: Dict[str, int]) -> Tuple[str, int, int, bool]:
+    if isinstance(node, ast.Name):
+        return f'u_{node.id}', MILLI, digits[node.id], True
+    if isinstance(node, ast.Constant):
+        return repr(node.value), 0, len(str(abs(node.value))), True
+    if isinstance(node, ast.UnaryOp):
+        code, places, size, number = _fixed_node(node.operand, digits)
+        if isinstance(node.op, ast.Not):
+            return f'(not {code})', 0, 0, False
+        if not number:
+            raise _NotFixed
+        return f'({"-" if isinstance(node.op, ast.USub) else "+"}{code})', places, size, True
+    if isinstance(node, ast.BinOp):
+        left = _fixed_node(node.left, digits)
+        right = _fixed_node(node.right, digits)
+        if not left[3] or not right[3] or isinstance(node.op, ast.Div):
+            raise _NotFixed
+        if isinstance(node.op, ast.Mult):
+            code, places, size = f'({left[0]} * {right[0]})', left[1] + right[1], left[2] + right[2]
+        else:
+            places = max(left[1], right[1])
+            operator = '+' if isinstance(node.op, ast.Add) else '-'
+            code = f'({_align(left, places)} {operator} {_align(right, places)})'
+            size = max(left[2] + places - left[1], right[2] + places - right[1]) + 1
+        if size > _PRECISION:
+            raise _NotFixed
+        return code, places, size, True
+    if isinstance(node, ast.Compare):
+        operands = [_fixed_node(operand, digits) for operand in (node.left, *node.comparators)]
+        if not all(operand[3] for operand in operands):
+            raise _NotFixed
+        places = max(operand[1] for operand in operands)
+        parts = [_align(operands[0], places)]
+        for operator, operand in zip(node.ops, operands[1:]):
+            parts.append(_COMPARISONS[type(operator)])
+            parts.append(_align(operand, places))
+        return f'({" ".join(parts)})', 0, 0, False
+    if isinstance(node, ast.BoolOp):
+        values = [_fixed_node(value, digits)[0] for value in node.values]
+        operator = ' and ' if isinstance(node.op, ast.And) else ' or '
+        return f'({operator.join(values)})', 0, 0, False
+    raise _NotFixed
+
+
+def _align(operand: Tuple[str, int, int, bool], places: int) -> str:
+    code, own = operand[0], operand[1]
+    return code if own == places else f'{code} * {10 ** (places - own)}'
+
+
+class ServiceCatalog:
+    """Кроки діалогу й функції розрахунку, згенеровані з переліку послуг."""
+
+    def __init__(
+        self,
+        header: Sequence[Field],
+        meters: Sequence[Meter],
+        services: Sequence[Service],
+        texts: BlockTexts,
+    ) -> None:
+        self.services = tuple(services)
+        used = {meter.key for service in self.services for meter in service.meters}
+        # Порядок лічильників у діалозі й призначенні платежу задає ``meters``, у блоці показників — послуги.
+        self.meters = tuple(meter for meter in meters if meter.key in used)
+        unknown = used - {meter.key for meter in self.meters}
+        if unknown:
+            raise ValueError(f'Лічильники {sorted(unknown)} не входять до переліку лічильників каталогу')
+        self.texts = texts
+
+        fields: Dict[str, Field] = {}
+        for field in (
+            *header,
+            *(field for meter in self.meters for field in (meter.prev, meter.curr)),
+            *(tariff.field for service in self.services for tariff in service.tariffs),
+            *(field for service in self.services for field in service.quantities),
+        ):
+            if fields.setdefault(field.key, field) != field:
+                raise ValueError(f'Поле {field.key!r} описане в каталозі двічі по-різному')
+        self.fields = tuple(fields.values())
+
+        self.summary: Callable[..., str]
+        self.readings: Callable[..., str]
+        self.tariffs: Callable[..., str]
+        self.sections: Callable[..., List[Any]]
+        self.amounts: Callable[[Dict[str, Any]], Tuple[Dict[str, Decimal], Dict[str, Decimal], Decimal]]
+        self.source = self._compile()
+
+    @property
+    def step_order(self) -> List[str]:
+        return [field.key for field in self.fields]
+
+    def steps_of_kind(self, kind: str) -> List[str]:
+        return [field.key for field in self.fields if field.kind == kind]
+
+    @property
+    def profile_keys(self) -> Tuple[str, ...]:
+        return tuple(field.key for field in self.fields if field.remember)
+
+    @property
+    def profile_readings(self) -> Dict[str, str]:
+        return {meter.prev.key: meter.curr.key for meter in self.meters}
+
+    @property
+    def reading_meters(self) -> Tuple[Meter, ...]:
+        """Лічильники блоку показників — у порядку послуг, а не діалогу."""
+        seen: Dict[str, Meter] = {}
+        for service in self.services:
+            for meter in service.meters:
+                seen.setdefault(meter.key, meter)
+        return tuple(seen.values())
+
+    @property
+    def readings_unit(self) -> str:
+        """Спільна одиниця лічильників блоку показників; порожня, якщо одиниці різні."""
+        units = {meter.unit for meter in self.reading_meters}
+        return units.pop() if len(units) == 1 else ''
+
+    @property
+    def readings_column(self) -> str:
+        groups = {meter.group or meter.title for meter in self.reading_meters}
+        return groups.pop() if len(groups) == 1 else self.texts.readings_column
+
+    @property
+    def fingerprint(self) -> bytes:
+        """Відбиток кроків діалогу: за ним ``session_codec`` не прочитає сесію, записану з іншим набором послуг."""
+        return step_fingerprint((field.key, field.kind) for field in self.fields)
+
+    def _compile(self) -> str:
+        namespace: Dict[str, Any] = {
+            'ZERO': Decimal(0), 'FIXED': Fixed, 'RESCALE': rescale, 'DECIMAL': to_decimal,
+        }
+        texts = self.texts
+        meters = self.reading_meters
+
+        summary_text = texts.summary_prefix + ','.join(
+            texts.summary_reading.format(code=_literal(meter.code), prev=meter.prev.key, curr=meter.curr.key)
+            for meter in self.meters
+        )
+        namespace['SUMMARY'] = compile_template('SUMMARY', summary_text)
+        unit = self.readings_unit
+        readings_header = texts.readings_header.replace('{units}', _literal(f' ({unit})' if unit else '')).replace(
+            '{meters}', _literal(self.readings_column),
+        )
+        readings_text = readings_header + ''.join(
+            f'{_literal(meter.title)} — {{{meter.prev.key}}} — {{{meter.curr.key}}} — '
+            f'{{{meter.usage}}} {_literal(meter.unit)}\n'
+            for meter in meters
+        ) + '\n'
+        namespace['READINGS'] = compile_template('READINGS', readings_text)
+        tariffs_text = texts.tariffs_header + ''.join(
+            f' • {_literal(tariff.title)}: {{{tariff.field.key}}} {_literal(tariff.unit)}\n'
+            for service in self.services for tariff in service.tariffs
+        ) + texts.tariffs_footer
+        namespace['TARIFFS'] = compile_template('TARIFFS', tariffs_text)
+
+        summary_args = ''.join(
+            f', {key}=exact(payload[{key!r}])' for meter in self.meters for key in (meter.prev.key, meter.curr.key)
+        )
+        readings_args = ''.join(
+            f', {meter.prev.key}=exact(payload[{meter.prev.key!r}]), {meter.curr.key}=exact(payload[{meter.curr.key!r}]), '
+            f'{meter.usage}=quantity(payload[{meter.curr.key!r}] - payload[{meter.prev.key!r}])'
+            for meter in meters
+        )
+        tariffs_args = ', '.join(
+            f'{tariff.field.key}=tariff(payload[{tariff.field.key!r}])'
+            for service in self.services for tariff in service.tariffs
+        )
+        lines = [
+            'def summary(payload, exact, month, year):',
+            '    return SUMMARY(month=month, year=year, full_name=payload["full_name"], '
+            f'address=payload["address"]{summary_args})',
+            '',
+            'def readings(payload, exact, quantity, prev_date, current_date):',
+            f'    return READINGS(prev_date=prev_date, current_date=current_date{readings_args})',
+            '',
+            'def tariffs(payload, tariff):',
+            f'    return TARIFFS({tariffs_args})',
+            '',
+        ]
+        formulas = [self._formulas(index, service, namespace) for index, service in enumerate(self.services)]
+        lines.extend(self._decimal_code(formulas))
+        try:
+            lines.extend(self._fixed_code(formulas))
+            self.fixed = True
+        except _NotFixed:
+            # Ділення або надто великі проміжні значення: цілочисельний шлях не гарантує тих самих цифр.
+            lines.extend(['sections = decimal_sections', 'amounts = decimal_amounts'])
+            self.fixed = False
+        source = '\n'.join(lines) + '\n'
+        exec(compile(source, '<service catalog>', 'exec'), namespace)
+        self.summary = namespace['summary']
+        self.readings = namespace['readings']
+        self.tariffs = namespace['tariffs']
+        self.sections = namespace['sections']
+        self.amounts = namespace['amounts']
+        return source
+
+    def _inputs(self) -> List[str]:
+        return [field.key for field in self.fields if field.kind == NUMBER]
+
+    def _loads(self, load: str) -> List[str]:
+        lines = [f'    v_{key} = {load}(payload[{key!r}])' for key in self._inputs()]
+        lines.extend(
+            f'    v_{meter.usage} = v_{meter.curr.key} - v_{meter.prev.key}' for meter in self.meters
+        )
+        return lines
+
+    def _formulas(self, index: int, service: Service, namespace: Dict[str, Any]) -> _Formulas:
+        where = f'Послуга {service.key!r}'
+        meter_names = [meter.usage for meter in service.meters]
+        names = [
+            *(field for meter in service.meters for field in (meter.prev.key, meter.curr.key)),
+            *meter_names,
+            *(tariff.field.key for tariff in service.tariffs),
+            *(field.key for field in service.quantities),
+        ]
+        fields = [name for name, _, _ in service.display]
+        if 'amount' in fields or len(set(fields)) != len(fields):
+            raise ValueError(f'{where}: поля секції мають бути різними й не називатися amount')
+        for name, _, display in service.display:
+            if display not in DISPLAY_FORMATS:
+                raise ValueError(f'{where}: невідомий формат {display!r} поля {name!r}')
+        namespace[f'SECTION_{index}'] = compile_template(f'SECTION_{index}', service.section)
+        namespace[f'LABEL_{index}'] = service.label
+        amount = _rename(service.amount, names, 'v_', where)
+        if service.round_to is not None:
+            namespace[f'QUANTUM_{index}'] = service.round_to
+            amount = f'({amount}).quantize(QUANTUM_{index}, rounding={service.rounding!r})'
+        return _Formulas(
+            index=index,
+            service=service,
+            where=where,
+            names=names,
+            usages=meter_names,
+            amount=amount,
+            condition=_rename(service.condition, names, 'v_', where) if service.condition else '',
+            display=[
+                (name, _rename(expression, names, 'v_', where), display) for name, expression, display in service.display
+            ],
+        )
+
+    def _decimal_code(self, formulas: List[_Formulas]) -> List[str]:
+        """Розрахунок у ``Decimal``: для payload, де не всі числа ``Fixed``, і для нульових сум."""
+        loads = self._loads('DECIMAL')
+        sections: List[str] = []
+        amounts: List[str] = []
+        helpers: List[str] = []
+        for formula in formulas:
+            index, condition = formula.index, formula.condition
+            indent = '        ' if condition else '    '
+            body = [f'{indent}amount = {formula.amount}', f'{indent}amount_text = money(amount)']
+            for name, expression, display in formula.display:
+                body.append(f'{indent}d_{name} = {display}({expression})')
+                helpers.extend([f'def display_{index}_{name}(payload):', *loads, f'    return {expression}', ''])
+            body.append(f'{indent}sections.append({formula.section_call()})')
+            if condition:
+                sections.append(f'    if {condition}:')
+            sections.extend(body)
+            helpers.extend([f'def amount_{index}(payload):', *loads, f'    return {formula.amount}', ''])
+            if condition:
+                amounts.append(f'    a_{index} = {formula.amount} if {condition} else ZERO')
+            else:
+                amounts.append(f'    a_{index} = {formula.amount}')
+
+        usages = ', '.join(f'{meter.key!r}: v_{meter.usage}' for meter in self.meters)
+        by_service = ', '.join(f'{formula.service.key!r}: a_{formula.index}' for formula in formulas)
+        total = ' + '.join(f'a_{formula.index}' for formula in formulas) or 'ZERO'
+        return [
+            *helpers,
+            'def decimal_sections(payload, quantity, tariff, money, section):',
+            *loads,
+            '    sections = []',
+            *sections,
+            '    return sections',
+            '',
+            'def decimal_amounts(payload):',
+            *loads,
+            *amounts,
+            f'    return {{{usages}}}, {{{by_service}}}, {total}',
+            '',
+        ]
+
+    def _fixed_code(self, formulas: List[_Formulas]) -> List[str]:
+        """Розрахунок над цілими одиницями ``Fixed``; нульові суми беруться з ``Decimal`` заради знака нуля."""
+        inputs = self._inputs()
+        loads = ['    try:', *(f'        u_{key} = payload[{key!r}].units' for key in inputs)]
+        usages = [f'    u_{meter.usage} = u_{meter.curr.key} - u_{meter.prev.key}' for meter in self.meters]
+        digits = {key: _INPUT_DIGITS for key in inputs}
+        digits.update((meter.usage, _INPUT_DIGITS + 1) for meter in self.meters)
+
+        sections: List[str] = []
+        amounts: List[str] = []
+        results: List[Tuple[int, int]] = []
+        for formula in formulas:
+            index, service = formula.index, formula.service
+            code, places, size = _fixed(service.amount, digits, formula.where)
+            if service.round_to is not None:
+                quantum = service.round_to.as_tuple()
+                if quantum.digits != (1,) or not isinstance(quantum.exponent, int) or quantum.exponent > 0:
+                    raise _NotFixed
+                target = -quantum.exponent
+                code = f'RESCALE({code}, {places}, {target}, {service.rounding!r})'
+                # Округлення може додати розряд перенесенням.
+                size, places = max(size - places + target, 0) + 1, target
+            condition = _fixed(service.condition, digits, formula.where, condition=True)[0] if service.condition else ''
+            indent = '        ' if condition else '    '
+            body = [
+                f'{indent}m = {code}',
+                f'{indent}amount = FIXED(m, {places}) if m else amount_{index}(payload)',
+                f'{indent}amount_text = money(amount)',
+            ]
+            for name, expression, display in service.display:
+                value, value_places, _ = _fixed(expression, digits, formula.where)
+                body.append(f'{indent}x = {value}')
+                fallback = f'display_{index}_{name}(payload)'
+                body.append(f'{indent}d_{name} = {display}(FIXED(x, {value_places}) if x else {fallback})')
+            body.append(f'{indent}sections.append({formula.section_call()})')
+            if condition:
+                sections.append(f'    if {condition}:')
+            sections.extend(body)
+
+            if condition:
+                amounts.extend([
+                    f'    if {condition}:',
+                    f'        m_{index} = {code}',
+                    f'        a_{index} = FIXED(m_{index}, {places}) if m_{index} else amount_{index}(payload)',
+                    '    else:',
+                    f'        m_{index} = 0',
+                    f'        a_{index} = FIXED(0, {places})',
+                ])
+            else:
+                amounts.extend([
+                    f'    m_{index} = {code}',
+                    f'    a_{index} = FIXED(m_{index}, {places}) if m_{index} else amount_{index}(payload)',
+                ])
+            results.append((places, size))
+
+        top = max((places for places, _ in results), default=0)
+        if results and max(size + top - places for places, size in results) + len(str(len(results))) > _PRECISION:
+            raise _NotFixed
+        total = ' + '.join(
+            f'm_{index}' if places == top else f'm_{index} * {10 ** (top - places)}'
+            for index, (places, _) in enumerate(results)
+        ) or '0'
+        objects = ' + '.join(f'a_{formula.index}' for formula in formulas) or 'ZERO'
+        meters = ', '.join(f'{meter.key!r}: FIXED(u_{meter.usage}, {MILLI})' for meter in self.meters)
+        by_service = ', '.join(f'{formula.service.key!r}: a_{formula.index}' for formula in formulas)
+        return [
+            'def sections(payload, quantity, tariff, money, section):',
+            *loads,
+            '    except AttributeError:',
+            '        return decimal_sections(payload, quantity, tariff, money, section)',
+            *usages,
+            '    sections = []',
+            *sections,
+            '    return sections',
+            '',
+            'def amounts(payload):',
+            *loads,
+            '    except AttributeError:',
+            '        return decimal_amounts(payload)',
+            *usages,
+            *amounts,
+            f'    t = {total}',
+            f'    total = FIXED(t, {top}) if t else {objects}',
+            f'    return {{{meters}}}, {{{by_service}}}, total',
+            '',
+        ]
+
+
+__all__ = [
+    'DISPLAY_FORMATS',
+    'MONEY',
+    'NUMBER',
+    'PERIOD',
+    'QUANTITY',
+    'TARIFF',
+    'TEXT',
+    'BlockTexts',
+    'Field',
+    'Meter',
+    'Service',
+    'ServiceCatalog',
+    'Tariff',
+    'step_fingerprint',
+]
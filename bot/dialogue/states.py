@@ -5,6 +5,7 @@ from aiogram.fsm.state import State, StatesGroup
 
 class Form(StatesGroup):
     collecting = State()
+    confirming_profile = State()
 
 
 __all__ = ['Form']
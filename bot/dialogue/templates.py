@@ -0,0 +1,55 @@
+"""Шаблони текстових блоків розрахунку.
+
+Кожен шаблон при імпорті компілюється у функцію з f-рядком, тож під час розрахунку текст не розбирається
+заново, а лише підставляються вже відформатовані значення (за іменованими аргументами).
+"""
+from __future__ import annotations
+
+from string import Formatter
+from typing import Callable, List
+
+
+def compile_template(name: str, text: str) -> Callable[..., str]:
+    """Перетворює шаблон у стилі ``str.format`` з простими полями ``{name}`` на функцію."""
+    body: List[str] = []
+    fields: List[str] = []
+    for literal, field, spec, conversion in Formatter().parse(text):
+        body.append(
+            literal.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n').replace('{', '{{').replace('}', '}}')
+        )
+        if field is None:
+            continue
+        if not field.isidentifier() or spec or conversion:
+            raise ValueError(f'Шаблон {name}: підтримуються лише прості поля, отримано {{{field}}}')
+        if field not in fields:
+            fields.append(field)
+        body.append('{' + field + '}')
+    signature = f'*, {", ".join(fields)}' if fields else ''
+    source = f"def {name}({signature}):\n    return f'{''.join(body)}'\n"
+    namespace: dict = {}
+    exec(compile(source, f'<template {name}>', 'exec'), namespace)
+    return namespace[name]
+
+
+# Показники, тарифи й секції послуг будує ``ServiceCatalog`` (``bot.dialogue.services``) з опису послуг,
+# підтвердження профілю — ``bot.dialogue.profile`` з того самого каталогу.
+
+TOTAL_HEADER = compile_template('TOTAL_HEADER', '✅ ПІДСУМОК до оплати у {month} {year}р.:\nПослуга — Сума (грн)\n')
+TOTAL_LINE = compile_template('TOTAL_LINE', '{label} — {amount}\n')
+TOTAL_FOOTER = compile_template('TOTAL_FOOTER', 'Всього — {total} грн ✅')
+QUICK_TOTAL_HEADER = compile_template('QUICK_TOTAL_HEADER', '✅ ПІДСУМОК до оплати:\nПослуга — Сума (грн)\n')
+
+HISTORY_LINE = compile_template(
+    'HISTORY_LINE', '{period}: холодна {cold} м³, гаряча {hot} м³ — {total} грн\n'
+)
+TREND_LINE = compile_template('TREND_LINE', '{label}: {previous} → {current} {unit} ({change})\n')
+
+
+__all__ = [
+    'compile_template',
+    'TOTAL_HEADER',
+    'TOTAL_LINE',
+    'TOTAL_FOOTER',
+    'HISTORY_LINE',
+    'TREND_LINE',
+]
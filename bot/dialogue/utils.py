@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from bot.dialogue.constants import BACK_TOKENS
+from bot.dialogue.constants import BACK_TOKENS, CONFIRM_TOKENS, RESET_TOKENS
 
 
 def is_back_command(text: str) -> bool:
@@ -16,4 +16,16 @@ def is_back_command(text: str) -> bool:
     return first_token in BACK_TOKENS
 
 
-__all__ = ['is_back_command']
+def _normalize_answer(text: str) -> str:
+    return text.strip().lower().rstrip('.,!')
+
+
+def is_confirm_answer(text: str) -> bool:
+    return _normalize_answer(text) in CONFIRM_TOKENS
+
+
+def is_reset_answer(text: str) -> bool:
+    return _normalize_answer(text) in RESET_TOKENS
+
+
+__all__ = ['is_back_command', 'is_confirm_answer', 'is_reset_answer']
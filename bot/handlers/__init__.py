@@ -2,13 +2,28 @@ from __future__ import annotations
 
 from aiogram import Router
 
+from bot.metrics.middleware import HandlerLabelMiddleware, MetricsMiddleware
+
+from .history import router as history_router
+from .inline import router as inline_router
 from .messages import router as messages_router
+from .panel import router as panel_router
+from .receipt import router as receipt_router
+from .remind import router as remind_router
 from .start import router as start_router
 
 
 router = Router()
+# Панель першою: у режимі DIALOGUE_UI=panel вона перехоплює /start і кроки діалогу, інакше пропускає все.
+router.include_router(panel_router)
 router.include_router(start_router)
+router.include_router(history_router)
+router.include_router(remind_router)
+router.include_router(receipt_router)
 router.include_router(messages_router)
+router.include_router(inline_router)
+router.message.outer_middleware(MetricsMiddleware())
+router.message.middleware(HandlerLabelMiddleware())
 
 
 __all__ = ['router']
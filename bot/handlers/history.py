@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+if TYPE_CHECKING:
+    from bot.storage.history import HistoryStore
+
+
+router = Router()
+
+
+@router.message(Command('history'))
+async def show_history(message: Message, history: Optional[HistoryStore] = None) -> None:
+    # Звіти потрібні рідко, тож їх форматування імпортується при першій команді, а не на старті.
+    from bot.dialogue.history import EMPTY_HISTORY_TEXT, history_text
+
+    if history is None or not message.from_user:
+        await message.answer(EMPTY_HISTORY_TEXT)
+        return
+    await message.answer(history_text(await history.series(message.from_user.id)))
+
+
+@router.message(Command('trend'))
+async def show_trend(message: Message, history: Optional[HistoryStore] = None) -> None:
+    from bot.dialogue.history import EMPTY_HISTORY_TEXT, trend_text
+
+    if history is None or not message.from_user:
+        await message.answer(EMPTY_HISTORY_TEXT)
+        return
+    await message.answer(trend_text(await history.series(message.from_user.id)))
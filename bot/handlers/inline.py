@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import List
+
+from aiogram import Router
+from aiogram.types import (
+    InlineQuery,
+    InlineQueryResultArticle,
+    InlineQueryResultsButton,
+    InputTextMessageContent,
+)
+
+from bot.cache import SingleFlightCache
+from bot.dialogue.calculator import PaymentCalculator
+from bot.dialogue.inline import normalize_query, parse_query, render
+
+
+router = Router()
+calculator = PaymentCalculator()
+
+INLINE_CACHE_SIZE = 4096
+DEFAULT_INLINE_CACHE_TIME = 300
+FULL_DIALOGUE_BUTTON = InlineQueryResultsButton(text='Повний розрахунок у чаті з ботом', start_parameter='inline')
+
+# Відповіді не залежать від користувача, тож кеш спільний, а ключ — нормалізований запит.
+_results: SingleFlightCache[str, List[InlineQueryResultArticle]] = SingleFlightCache('inline', INLINE_CACHE_SIZE)
+
+
+async def _build_results(query: str) -> List[InlineQueryResultArticle]:
+    answer = render(parse_query(query), calculator)
+    return [InlineQueryResultArticle(
+        id='total',
+        title=answer.title,
+        description=answer.description,
+        input_message_content=InputTextMessageContent(message_text=answer.text),
+    )]
+
+
+@router.inline_query()
+async def inline_calculator(inline_query: InlineQuery, inline_cache_time: int = DEFAULT_INLINE_CACHE_TIME) -> None:
+    query = normalize_query(inline_query.query)
+    results = await _results.get(query, lambda: _build_results(query))
+    # Відповідь однакова для всіх, тож Telegram може віддавати її з власного кешу без запиту до бота.
+    await inline_query.answer(
+        results, cache_time=inline_cache_time, is_personal=False, button=FULL_DIALOGUE_BUTTON,
+    )
@@ -1,67 +1,200 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import logging
+from typing import Any, Dict, Optional, Tuple
 
 from aiogram import F, Router
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
-from aiogram.types import Message, ReplyKeyboardRemove
+from aiogram.types import Message, ReplyKeyboardMarkup, ReplyKeyboardRemove
 
+from bot import metrics
+from bot.dialogue import constants
 from bot.dialogue.calculator import PaymentCalculator
-from bot.dialogue.flow import DialogueState, PaymentFlow
+from bot.dialogue.fast_form import format_errors, looks_like_form, parse_form
+from bot.dialogue.flow import FlowResult, PaymentFlow
 from bot.dialogue.states import Form
-from bot.dialogue.utils import is_back_command
-from bot.ui.keyboards import back_keyboard
+from bot.dialogue.utils import is_back_command, is_confirm_answer, is_reset_answer
+from bot.metrics.middleware import UpdateProbe
+from bot.storage.history import HistoryStore
+from bot.storage.session_codec import dump_session, load_session
+from bot.storage.profiles import ProfileStore
+from bot.tariffs import TariffRegistry
+from bot.tracing import span
+from bot.ui.keyboards import back_keyboard, tariff_keyboard
 
 
+logger = logging.getLogger(__name__)
+
 router = Router()
 calculator = PaymentCalculator()
 
+FINISH_MESSAGE = 'Щоб підготувати ще одне повідомлення, натисніть /start. Квитанція для друку — /receipt.'
+
+
+@router.message(StateFilter(None, Form.collecting), F.text.func(looks_like_form))
+async def handle_fast_form(
+    message: Message,
+    state: FSMContext,
+    raw_state: Optional[str] = None,
+    profiles: Optional[ProfileStore] = None,
+    history: Optional[HistoryStore] = None,
+) -> None:
+    form = parse_form(message.text or '')
+    if not form.success:
+        metrics.VALIDATION_FAILURES.inc('fast_form', amount=len(form.errors))
+        await message.answer(format_errors(form.errors))
+        return
+
+    if raw_state is not None:
+        metrics.ACTIVE_SESSIONS.dec()
+    await _finish(message, state, form.payload, profiles, history, clear=raw_state is not None)
+
 
 @router.message(StateFilter(None), F.text)
-async def handle_without_session(message: Message) -> None:
-    await message.answer('Щоб почати, натисніть /start та дотримуйтеся підказок.', reply_markup=ReplyKeyboardRemove())
+async def handle_without_session(message: Message, session_expired: bool = False) -> None:
+    text = 'Щоб почати, натисніть /start та дотримуйтеся підказок.'
+    if session_expired:
+        text = f'{constants.SESSION_EXPIRED_TEXT}\n{text}'
+    await message.answer(text, reply_markup=ReplyKeyboardRemove())
+
+
+@router.message(Form.confirming_profile, F.text)
+async def handle_profile_confirmation(
+    message: Message,
+    state: FSMContext,
+    tariffs: Optional[TariffRegistry] = None,
+) -> None:
+    user_message = message.text or ''
+    if is_confirm_answer(user_message):
+        flow = await _load_flow(state)
+    elif is_reset_answer(user_message):
+        flow = PaymentFlow()
+    else:
+        await message.answer('Будь ласка, скористайтеся однією з кнопок нижче.')
+        return
+
+    await state.set_state(Form.collecting)
+    await state.set_data(dump_session(flow.state))
+    prompt, keyboard = _prompt(flow, tariffs)
+    await message.answer(prompt, reply_markup=keyboard)
 
 
 @router.message(Form.collecting, F.text)
-async def handle_plain_text(message: Message, state: FSMContext) -> None:
-    data = await state.get_data()
-    dialogue_state = DialogueState(
-        step_index=int(data.get('step_index', 0)),
-        payload=dict(data.get('payload') or {}),
-    )
-    flow = PaymentFlow(dialogue_state)
+async def handle_plain_text(
+    message: Message,
+    state: FSMContext,
+    metrics_probe: Optional[UpdateProbe] = None,
+    profiles: Optional[ProfileStore] = None,
+    tariffs: Optional[TariffRegistry] = None,
+    history: Optional[HistoryStore] = None,
+) -> None:
+    flow = await _load_flow(state)
+    if metrics_probe is not None:
+        metrics_probe.step = flow.current_step
     user_message = message.text or ''
 
     if is_back_command(user_message):
         if flow.go_back():
+            metrics.BACK_STEPS.inc()
             await _persist_state(state, flow)
-            await message.answer(
-                'Повертаємося до попереднього кроку.\n' + flow.current_prompt(),
-                reply_markup=back_keyboard(),
-            )
+            prompt, keyboard = _prompt(flow, tariffs)
+            await message.answer('Повертаємося до попереднього кроку.\n' + prompt, reply_markup=keyboard)
         else:
             await message.answer('Ви вже на першому кроці, повертатися нікуди.', reply_markup=back_keyboard())
         return
 
-    result = flow.process(user_message)
+    with span('flow.process', step=flow.current_step):
+        if flow.current_step == constants.COLD_TARIFF_STEP and user_message.startswith(constants.TARIFF_PRESET_PREFIX):
+            result = apply_preset(flow, user_message[len(constants.TARIFF_PRESET_PREFIX):].strip(), tariffs)
+        else:
+            result = flow.process(user_message)
     if not result.success:
+        metrics.VALIDATION_FAILURES.inc(flow.current_step)
         await message.answer(result.error or 'Помилка під час обробки введення.')
         return
 
     await _persist_state(state, flow)
 
     if result.finished:
-        details = calculator.details(flow.payload)
-        await message.answer(details, reply_markup=ReplyKeyboardRemove())
-        summary = calculator.summary(flow.payload)
-        await message.answer(summary)
-        await state.clear()
-        await message.answer('Щоб підготувати ще одне повідомлення, натисніть /start.')
+        metrics.ACTIVE_SESSIONS.dec()
+        await _finish(message, state, flow.payload, profiles, history)
         return
 
-    await message.answer(flow.current_prompt(), reply_markup=back_keyboard())
+    prompt, keyboard = _prompt(flow, tariffs)
+    await message.answer(prompt, reply_markup=keyboard)
+
+
+async def _finish(
+    message: Message,
+    state: FSMContext,
+    payload: Dict[str, Any],
+    profiles: Optional[ProfileStore],
+    history: Optional[HistoryStore] = None,
+    clear: bool = True,
+) -> None:
+    metrics.CALCULATIONS.inc()
+    with span('calculator.details'):
+        details = calculator.details(payload)
+    await message.answer(details, reply_markup=ReplyKeyboardRemove())
+    with span('calculator.summary'):
+        summary = calculator.summary(payload)
+    await message.answer(summary)
+    if message.from_user:
+        await save_results(message.from_user.id, payload, profiles, history)
+    if clear:
+        with span('fsm.clear'):
+            await state.clear()
+    await message.answer(FINISH_MESSAGE)
+
+
+async def save_results(
+    user_id: int,
+    payload: Dict[str, Any],
+    profiles: Optional[ProfileStore],
+    history: Optional[HistoryStore],
+) -> None:
+    """Профіль для наступного /start і запис в історії — спільне для обох інтерфейсів діалогу."""
+    if profiles is not None:
+        with span('profiles.save'):
+            await profiles.save(user_id, payload)
+    if history is not None:
+        # Історія — довідкова: збій запису не повинен лишати користувача посеред діалогу.
+        try:
+            with span('history.append'):
+                await history.append(user_id, payload, calculator.amounts(payload))
+        except Exception:
+            logger.exception('Не вдалося записати розрахунок користувача %s в історію', user_id)
+
+
+def _prompt(flow: PaymentFlow, tariffs: Optional[TariffRegistry]) -> Tuple[str, ReplyKeyboardMarkup]:
+    """Підказка поточного кроку; на кроці тарифів — разом із кнопками наборів, що діють у періоді."""
+    period = flow.state.get(constants.PERIOD_STEP)
+    if flow.current_step == constants.COLD_TARIFF_STEP and tariffs is not None and period:
+        presets = tariffs.presets_for(period)
+        if presets:
+            prompt = flow.current_prompt() + '\n' + constants.TARIFF_PRESET_HINT
+            return prompt, tariff_keyboard(preset.title for preset in presets)
+    return flow.current_prompt(), back_keyboard()
+
+
+def apply_preset(flow: PaymentFlow, title: str, tariffs: Optional[TariffRegistry]) -> FlowResult:
+    preset = tariffs.find(title, flow.state.get(constants.PERIOD_STEP)) if tariffs is not None else None
+    if preset is None:
+        return FlowResult(success=False, error='Такого набору тарифів немає. Оберіть інший або введіть тариф вручну.')
+    metrics.TARIFF_PRESETS.inc(preset.provider)
+    return FlowResult(success=True, finished=not flow.apply_tariffs(preset.provider, preset.values))
+
+
+def _restore_flow(data: Dict[str, Any]) -> PaymentFlow:
+    return PaymentFlow(load_session(data))
+
+
+async def _load_flow(state: FSMContext) -> PaymentFlow:
+    with span('fsm.get_data'):
+        return _restore_flow(await state.get_data())
 
 
 async def _persist_state(state: FSMContext, flow: PaymentFlow) -> None:
-    await state.update_data(payload=flow.payload, step_index=flow.step_index, step=flow.current_step)
+    with span('fsm.set_data'):
+        await state.set_data(dump_session(flow.state))
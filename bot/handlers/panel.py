@@ -0,0 +1,323 @@
+"""Діалог у режимі ``DIALOGUE_UI=panel``: одне повідомлення бота на сесію замість нового на кожен крок.
+
+Підказка, помилка введення й кнопки («Назад», набори тарифів, підтвердження профілю) живуть в одній
+панелі, яку ``PanelEditor`` редагує через ``editMessageText``; кнопки обробляються як callback-запити.
+Роутер підключений перед звичайним діалогом і пропускає оновлення, якщо інтерфейс інший. Результат
+розрахунку, як і раніше, окремими повідомленнями: деталі — у панелі, призначення платежу — новим
+повідомленням, щоб його було зручно скопіювати.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+from aiogram import Bot, F, Router
+from aiogram.filters import CommandStart
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message, TelegramObject
+
+from bot import metrics
+from bot.config import MESSAGES_UI, PANEL_UI
+from bot.dialogue import constants
+from bot.dialogue.flow import FlowResult, PaymentFlow
+from bot.dialogue.profile import confirmation_text
+from bot.dialogue.states import Form
+from bot.dialogue.utils import is_back_command, is_confirm_answer, is_reset_answer
+from bot.handlers.messages import FINISH_MESSAGE, apply_preset, calculator, save_results
+from bot.handlers.start import open_session
+from bot.metrics.middleware import UpdateProbe
+from bot.storage.history import HistoryStore
+from bot.storage.profiles import ProfileStore
+from bot.storage.session_codec import dump_session, load_session
+from bot.tariffs import TariffRegistry
+from bot.tracing import span
+from bot.ui.keyboards import panel_back_keyboard, panel_confirm_profile_keyboard, panel_tariff_keyboard
+from bot.ui.panel import PanelEditor, ResentCallback
+
+
+PANEL_KEY = 'panel'
+
+BACK_STATUS = 'Повертаємося до попереднього кроку.'
+FIRST_STEP_STATUS = 'Ви вже на першому кроці, повертатися нікуди.'
+USE_BUTTONS_STATUS = 'Будь ласка, скористайтеся однією з кнопок нижче.'
+STALE_BUTTON_TEXT = 'Ця кнопка вже не діє. Натисніть /start, щоб почати знову.'
+STALE_PRESET_STATUS = 'Довідник тарифів оновився. Оберіть набір ще раз або введіть тариф вручну.'
+
+_default_editor = PanelEditor()
+
+
+def panel_mode(event: TelegramObject, dialogue_ui: str = MESSAGES_UI) -> bool:
+    return dialogue_ui == PANEL_UI
+
+
+router = Router()
+# Фільтр на рівні роутера: у звичайному режимі жоден обробник панелі не перевіряється.
+router.message.filter(panel_mode)
+router.callback_query.filter(panel_mode)
+
+
+@router.message(CommandStart())
+async def panel_start(
+    message: Message,
+    state: FSMContext,
+    bot: Bot,
+    raw_state: Optional[str] = None,
+    profiles: Optional[ProfileStore] = None,
+    session_expired: bool = False,
+) -> None:
+    welcome, flow = await open_session(message, state, raw_state, profiles, session_expired)
+    if flow.prefilled:
+        text, keyboard = welcome + '\n\n' + confirmation_text(flow.payload), panel_confirm_profile_keyboard()
+    else:
+        text, keyboard = welcome + '\n\n' + flow.current_prompt(), panel_back_keyboard()
+    panel = await message.answer(text, reply_markup=keyboard)
+    await _persist(state, flow, panel.message_id)
+
+
+@router.message(Form.confirming_profile, F.text)
+async def panel_profile_answer(
+    message: Message,
+    state: FSMContext,
+    bot: Bot,
+    tariffs: Optional[TariffRegistry] = None,
+    panel_editor: Optional[PanelEditor] = None,
+) -> None:
+    user_message = message.text or ''
+    confirmed = is_confirm_answer(user_message)
+    if not confirmed and not is_reset_answer(user_message):
+        flow, panel_id = await _load(state)
+        text = USE_BUTTONS_STATUS + '\n\n' + confirmation_text(flow.payload)
+        await _show(bot, state, message.chat.id, flow, panel_id, text, panel_confirm_profile_keyboard(), panel_editor)
+        return
+    await _resolve_profile(bot, state, message.chat.id, confirmed, tariffs, panel_editor)
+
+
+@router.callback_query(Form.confirming_profile, F.data.in_({constants.PANEL_CONFIRM, constants.PANEL_RESET}))
+async def panel_profile_button(
+    callback: CallbackQuery,
+    state: FSMContext,
+    bot: Bot,
+    tariffs: Optional[TariffRegistry] = None,
+    panel_editor: Optional[PanelEditor] = None,
+) -> None:
+    await callback.answer()
+    if callback.message is None:
+        return
+    await _resolve_profile(bot, state, callback.message.chat.id, callback.data == constants.PANEL_CONFIRM, tariffs, panel_editor)
+
+
+@router.message(Form.collecting, F.text)
+async def panel_text(
+    message: Message,
+    state: FSMContext,
+    bot: Bot,
+    metrics_probe: Optional[UpdateProbe] = None,
+    profiles: Optional[ProfileStore] = None,
+    tariffs: Optional[TariffRegistry] = None,
+    history: Optional[HistoryStore] = None,
+    panel_editor: Optional[PanelEditor] = None,
+) -> None:
+    flow, panel_id = await _load(state)
+    if metrics_probe is not None:
+        metrics_probe.step = flow.current_step
+    user_message = message.text or ''
+    if is_back_command(user_message):
+        await _go_back(bot, state, message.chat.id, flow, panel_id, tariffs, panel_editor)
+        return
+    with span('flow.process', step=flow.current_step):
+        result = flow.process(user_message)
+    await _apply_result(bot, message.chat.id, state, flow, panel_id, result, profiles, tariffs, history, panel_editor)
+
+
+@router.callback_query(Form.collecting, F.data == constants.PANEL_BACK)
+async def panel_back(
+    callback: CallbackQuery,
+    state: FSMContext,
+    bot: Bot,
+    tariffs: Optional[TariffRegistry] = None,
+    panel_editor: Optional[PanelEditor] = None,
+) -> None:
+    await callback.answer()
+    if callback.message is None:
+        return
+    flow, panel_id = await _load(state)
+    await _go_back(bot, state, callback.message.chat.id, flow, panel_id, tariffs, panel_editor)
+
+
+@router.callback_query(Form.collecting, F.data.startswith(constants.PANEL_PRESET_PREFIX))
+async def panel_preset(
+    callback: CallbackQuery,
+    state: FSMContext,
+    bot: Bot,
+    profiles: Optional[ProfileStore] = None,
+    tariffs: Optional[TariffRegistry] = None,
+    history: Optional[HistoryStore] = None,
+    panel_editor: Optional[PanelEditor] = None,
+) -> None:
+    await callback.answer()
+    flow, panel_id = await _load(state)
+    period = flow.state.get(constants.PERIOD_STEP)
+    presets = tariffs.presets_for(period) if tariffs is not None and period else []
+    index, _, fingerprint = callback.data[len(constants.PANEL_PRESET_PREFIX):].partition(':')
+    if callback.message is None or flow.current_step != constants.COLD_TARIFF_STEP or not index.isdigit():
+        return
+    preset = presets[int(index)] if int(index) < len(presets) else None
+    if preset is not None and preset.fingerprint == fingerprint:
+        result = apply_preset(flow, preset.title, tariffs)
+    else:
+        # Кнопку намальовано за іншою версією довідника: під тим самим номером тепер може бути інший набір.
+        result = FlowResult(success=False, error=STALE_PRESET_STATUS)
+    await _apply_result(bot, callback.message.chat.id, state, flow, panel_id, result, profiles, tariffs, history, panel_editor)
+
+
+@router.callback_query(F.data.startswith(constants.PANEL_CALLBACK_PREFIX))
+async def panel_stale_button(callback: CallbackQuery) -> None:
+    """Кнопка панелі із завершеної або скинутої сесії."""
+    await callback.answer(STALE_BUTTON_TEXT, show_alert=True)
+
+
+async def _resolve_profile(
+    bot: Bot,
+    state: FSMContext,
+    chat_id: int,
+    confirmed: bool,
+    tariffs: Optional[TariffRegistry],
+    editor: Optional[PanelEditor],
+) -> None:
+    flow, panel_id = await _load(state)
+    if not confirmed:
+        flow = PaymentFlow()
+    await state.set_state(Form.collecting)
+    text, keyboard = _view(flow, tariffs)
+    await _show(bot, state, chat_id, flow, panel_id, text, keyboard, editor)
+
+
+async def _go_back(
+    bot: Bot,
+    state: FSMContext,
+    chat_id: int,
+    flow: PaymentFlow,
+    panel_id: Optional[int],
+    tariffs: Optional[TariffRegistry],
+    editor: Optional[PanelEditor],
+) -> None:
+    if flow.go_back():
+        metrics.BACK_STEPS.inc()
+        status = BACK_STATUS
+    else:
+        status = FIRST_STEP_STATUS
+    text, keyboard = _view(flow, tariffs, status)
+    await _show(bot, state, chat_id, flow, panel_id, text, keyboard, editor)
+
+
+async def _apply_result(
+    bot: Bot,
+    chat_id: int,
+    state: FSMContext,
+    flow: PaymentFlow,
+    panel_id: Optional[int],
+    result: FlowResult,
+    profiles: Optional[ProfileStore],
+    tariffs: Optional[TariffRegistry],
+    history: Optional[HistoryStore],
+    editor: Optional[PanelEditor],
+) -> None:
+    if not result.success:
+        metrics.VALIDATION_FAILURES.inc(flow.current_step)
+        text, keyboard = _view(flow, tariffs, result.error or 'Помилка під час обробки введення.')
+        await _show(bot, state, chat_id, flow, panel_id, text, keyboard, editor, persist=False)
+        return
+    if result.finished:
+        metrics.ACTIVE_SESSIONS.dec()
+        await _finish(bot, state, chat_id, flow.payload, panel_id, profiles, history, editor)
+        return
+    text, keyboard = _view(flow, tariffs)
+    await _show(bot, state, chat_id, flow, panel_id, text, keyboard, editor)
+
+
+async def _finish(
+    bot: Bot,
+    state: FSMContext,
+    chat_id: int,
+    payload: Dict[str, Any],
+    panel_id: Optional[int],
+    profiles: Optional[ProfileStore],
+    history: Optional[HistoryStore],
+    editor: Optional[PanelEditor],
+) -> None:
+    metrics.CALCULATIONS.inc()
+    with span('calculator.details'):
+        details = calculator.details(payload)
+    final = details + '\n\n' + FINISH_MESSAGE
+    # Деталі — в панелі одразу, без вікна: призначення платежу має з'явитися після них.
+    if panel_id is None:
+        await bot.send_message(chat_id, final)
+    else:
+        await (editor or _default_editor).edit_now(bot, chat_id, panel_id, final)
+    with span('calculator.summary'):
+        summary = calculator.summary(payload)
+    await bot.send_message(chat_id, summary)
+    user_id = state.key.user_id
+    await save_results(user_id, payload, profiles, history)
+    with span('fsm.clear'):
+        await state.clear()
+
+
+def _view(flow: PaymentFlow, tariffs: Optional[TariffRegistry], status: str = '') -> Tuple[str, InlineKeyboardMarkup]:
+    """Текст і кнопки панелі для поточного кроку; ``status`` — рядок над підказкою (помилка, повернення)."""
+    position = f'Крок {flow.step_index + 1} з {len(constants.STEP_ORDER)}'
+    prompt = flow.current_prompt()
+    keyboard = panel_back_keyboard()
+    period = flow.state.get(constants.PERIOD_STEP)
+    if flow.current_step == constants.COLD_TARIFF_STEP and tariffs is not None and period:
+        presets = tariffs.presets_for(period)
+        if presets:
+            prompt += '\n' + constants.TARIFF_PRESET_HINT
+            keyboard = panel_tariff_keyboard((preset.title, preset.fingerprint) for preset in presets)
+    lines = [status, position, prompt] if status else [position, prompt]
+    return '\n\n'.join(lines), keyboard
+
+
+async def _show(
+    bot: Bot,
+    state: FSMContext,
+    chat_id: int,
+    flow: PaymentFlow,
+    panel_id: Optional[int],
+    text: str,
+    keyboard: InlineKeyboardMarkup,
+    editor: Optional[PanelEditor],
+    persist: bool = True,
+) -> None:
+    """Оновлює панель; сесія, почата без панелі (інший інтерфейс до перезапуску), отримує нову."""
+    if panel_id is None:
+        panel = await bot.send_message(chat_id, text, reply_markup=keyboard)
+        await _persist(state, flow, panel.message_id)
+        return
+    if persist:
+        await _persist(state, flow, panel_id)
+    (editor or _default_editor).schedule(bot, chat_id, panel_id, text, keyboard, on_resent=_rebind(state, panel_id))
+
+
+def _rebind(state: FSMContext, panel_id: int) -> ResentCallback:
+    """Панель надіслано заново: наступні кроки сесії редагують нове повідомлення, а не видалене."""
+
+    async def rebind(resent_id: int) -> None:
+        with span('fsm.get_data'):
+            data = await state.get_data()
+        # Сесію могли завершити або вже прив'язати до іншої панелі, поки правка чекала вікна.
+        if data.get(PANEL_KEY) == panel_id:
+            with span('fsm.set_data'):
+                await state.set_data({**data, PANEL_KEY: resent_id})
+
+    return rebind
+
+
+async def _load(state: FSMContext) -> Tuple[PaymentFlow, Optional[int]]:
+    with span('fsm.get_data'):
+        data = await state.get_data()
+    return PaymentFlow(load_session(data)), data.get(PANEL_KEY)
+
+
+async def _persist(state: FSMContext, flow: PaymentFlow, panel_id: int) -> None:
+    with span('fsm.set_data'):
+        await state.set_data({**dump_session(flow.state), PANEL_KEY: panel_id})
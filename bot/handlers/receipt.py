@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import BufferedInputFile, Message
+
+from bot.dialogue.calculator import PaymentCalculator
+from bot.receipts import PDF_FORMAT, RECEIPT_FORMATS, ReceiptRenderer, ReceiptUnavailable, RendererBusy, build_receipt
+from bot.storage.profiles import ProfileStore
+
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+calculator = PaymentCalculator()
+
+RECEIPT_USAGE = 'Квитанція останнього розрахунку: /receipt (PDF) або /receipt png.'
+NO_RECEIPT_MESSAGE = 'Квитанції ще немає: спершу завершіть розрахунок, натисніть /start.'
+BUSY_MESSAGE = 'Зараз готується забагато квитанцій, спробуйте, будь ласка, за хвилину.'
+UNAVAILABLE_MESSAGE = 'Квитанції на цьому боті зараз недоступні.'
+FAILED_MESSAGE = 'Не вдалося підготувати квитанцію, спробуйте, будь ласка, пізніше.'
+
+
+@router.message(Command('receipt'))
+async def send_receipt(
+    message: Message,
+    command: CommandObject,
+    profiles: Optional[ProfileStore] = None,
+    receipts: Optional[ReceiptRenderer] = None,
+) -> None:
+    fmt = (command.args or PDF_FORMAT).strip().lower()
+    if fmt not in RECEIPT_FORMATS:
+        await message.answer(RECEIPT_USAGE)
+        return
+    payload = await profiles.get(message.from_user.id) if profiles is not None and message.from_user else None
+    if not payload or receipts is None:
+        await message.answer(NO_RECEIPT_MESSAGE)
+        return
+
+    try:
+        content = await receipts.render(build_receipt(payload, calculator), fmt)
+    except RendererBusy:
+        await message.answer(BUSY_MESSAGE)
+        return
+    except ReceiptUnavailable:
+        await message.answer(UNAVAILABLE_MESSAGE)
+        return
+    except Exception:
+        logger.exception('Не вдалося намалювати квитанцію %s', fmt)
+        await message.answer(FAILED_MESSAGE)
+        return
+    period = payload['period']
+    filename = f"receipt-{period['year']}-{period['month']:02d}.{fmt}"
+    await message.answer_document(BufferedInputFile(content, filename=filename))
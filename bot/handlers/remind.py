@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from bot.reminders import MAX_REMINDER_DAY, MIN_REMINDER_DAY
+
+if TYPE_CHECKING:
+    from bot.reminders import ReminderScheduler
+
+
+REMIND_USAGE_TEXT = (
+    'Щоб щомісяця отримувати нагадування передати показники, надішліть /remind і день місяця '
+    f'від {MIN_REMINDER_DAY} до {MAX_REMINDER_DAY}, наприклад: /remind 25'
+)
+REMIND_DISABLED_TEXT = 'Нагадування на цьому боті вимкнені.'
+REMIND_OFF_TEXT = 'Нагадування вимкнено. Увімкнути знову: /remind і день місяця.'
+REMIND_NOT_SUBSCRIBED_TEXT = 'Нагадування й так не були увімкнені.'
+REMIND_OFF_WORDS = frozenset({'off', 'stop', 'вимкнути', 'ні'})
+
+router = Router()
+
+
+@router.message(Command('remind'))
+async def remind(message: Message, command: CommandObject, reminders: Optional[ReminderScheduler] = None) -> None:
+    if reminders is None or not message.from_user:
+        await message.answer(REMIND_DISABLED_TEXT)
+        return
+    user_id = message.from_user.id
+    argument = (command.args or '').strip().lower()
+    if not argument:
+        reminder = await reminders.get(user_id)
+        if reminder is None:
+            await message.answer(REMIND_USAGE_TEXT)
+        else:
+            await message.answer(_subscribed_text(reminders, reminder.day, reminder.due_at))
+        return
+    if argument in REMIND_OFF_WORDS:
+        removed = await reminders.unsubscribe(user_id)
+        await message.answer(REMIND_OFF_TEXT if removed else REMIND_NOT_SUBSCRIBED_TEXT)
+        return
+    if not argument.isdigit() or not MIN_REMINDER_DAY <= int(argument) <= MAX_REMINDER_DAY:
+        await message.answer(REMIND_USAGE_TEXT)
+        return
+    day = int(argument)
+    due_at = await reminders.subscribe(user_id, message.chat.id, day)
+    await message.answer(_subscribed_text(reminders, day, due_at))
+
+
+def _subscribed_text(reminders: ReminderScheduler, day: int, due_at: float) -> str:
+    moment = reminders.calendar.local(due_at)
+    return (
+        f'🔔 Нагадую щомісяця {day}-го числа. Наступне нагадування — {moment:%d.%m.%Y} о {moment:%H:%M}.\n'
+        'Змінити день: /remind і нове число, вимкнути: /remind off'
+    )
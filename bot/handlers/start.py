@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+from typing import Optional, Tuple
+
 from aiogram import Router
-from aiogram.filters import CommandStart
+from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
+from bot import metrics
+from bot.dialogue import constants
+from bot.dialogue.fast_form import form_template
 from bot.dialogue.flow import PaymentFlow
+from bot.dialogue.profile import confirmation_text, is_complete_prefill, prefill_from_profile
 from bot.dialogue.states import Form
-from bot.ui.keyboards import back_keyboard
+from bot.storage.profiles import ProfileStore
+from bot.storage.session_codec import dump_session
+from bot.ui.keyboards import back_keyboard, confirm_profile_keyboard
 
 
 router = Router()
@@ -17,16 +25,68 @@ WELCOME_MESSAGE = (
     'Давайте починати: надсилайте відповіді українською мовою. Для виправлень скористайтеся кнопкою "Назад".'
 )
 
+FORM_HELP_MESSAGE = (
+    '⚡ Швидка форма: скопіюйте шаблон нижче, заповніть значення й надішліть одним повідомленням — '
+    f'я одразу порахую платіж. Можна також надіслати {len(constants.STEP_ORDER)} рядків без підписів '
+    'у тому самому порядку.'
+)
+
+
+@router.message(Command('form'))
+async def form_help(message: Message) -> None:
+    await message.answer(FORM_HELP_MESSAGE)
+    await message.answer(form_template())
+
 
 @router.message(CommandStart())
-async def start(message: Message, state: FSMContext) -> None:
+async def start(
+    message: Message,
+    state: FSMContext,
+    raw_state: Optional[str] = None,
+    profiles: Optional[ProfileStore] = None,
+    session_expired: bool = False,
+) -> None:
+    welcome, flow = await open_session(message, state, raw_state, profiles, session_expired)
+    await state.set_data(dump_session(flow.state))
+    if flow.prefilled:
+        # Вітання й дані профілю — одним повідомленням, щоб повторний розрахунок коштував менше відправок.
+        await message.answer(
+            welcome + '\n\n' + confirmation_text(flow.payload),
+            reply_markup=confirm_profile_keyboard(),
+        )
+        return
+
+    await message.answer(welcome)
+    await message.answer(flow.current_prompt(), reply_markup=back_keyboard())
+
+
+async def open_session(
+    message: Message,
+    state: FSMContext,
+    raw_state: Optional[str],
+    profiles: Optional[ProfileStore],
+    session_expired: bool,
+) -> Tuple[str, PaymentFlow]:
+    """Спільний початок /start для обох інтерфейсів: вітання і новий потік у потрібному стані FSM.
+
+    Якщо профіль заповнює все, крім поточних показників, потік уже заповнений із нього і чекає
+    підтвердження (``Form.confirming_profile``). Дані FSM записує викликач.
+    """
     user = message.from_user
     name = user.first_name if user and user.first_name else 'шановний користувачу'
+    welcome = WELCOME_MESSAGE.format(name=name)
+    if session_expired:
+        welcome = f'{constants.SESSION_EXPIRED_TEXT}\n\n{welcome}'
 
-    flow = PaymentFlow()
-    await state.clear()
-    await state.set_state(Form.collecting)
-    await state.update_data(payload=flow.payload, step_index=flow.step_index, step=flow.current_step)
+    if raw_state is None:
+        metrics.ACTIVE_SESSIONS.inc()
 
-    await message.answer(WELCOME_MESSAGE.format(name=name))
-    await message.answer(flow.current_prompt(), reply_markup=back_keyboard())
+    saved = await profiles.get(user.id) if profiles is not None and user else None
+    prefill = prefill_from_profile(saved) if saved else None
+    flow = PaymentFlow()
+    if prefill and is_complete_prefill(prefill):
+        flow.prefill(prefill)
+        await state.set_state(Form.confirming_profile)
+    else:
+        await state.set_state(Form.collecting)
+    return welcome, flow
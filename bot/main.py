@@ -1,13 +1,27 @@
 """Точка входу Telegram-бота на aiogram."""
 from __future__ import annotations
 
+import argparse
 import asyncio
 import logging
+from typing import List, Optional
 
 from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
 
-from bot.config import get_settings
+from bot.config import SQLITE_STORAGE, WEBHOOK_MODE, Settings, get_settings
+from bot.dedup import DeduplicationMiddleware, RecentKeys, Watermarks
 from bot.handlers import router
+from bot.metrics.middleware import RequestMetricsMiddleware
+from bot.receipts import ReceiptRenderer
+from bot.reminders import ReminderCalendar, ReminderScheduler
+from bot.sending import SendScheduler
+from bot.storage import build_history_store, build_profile_store, build_reminder_store, build_storage
+from bot.storage.lifecycle import SessionExpiryMiddleware, SessionLifecycle
+from bot.tariffs import TariffRegistry
+from bot.throttling import SlidingWindowCounter, ThrottlingMiddleware
+from bot.tracing import Tracer, TracingMiddleware, TracingRequestMiddleware
+from bot.ui.panel import PanelEditor
 
 logging.basicConfig(
     format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
@@ -15,21 +29,147 @@ logging.basicConfig(
 )
 
 
-def _build_bot(settings) -> Bot:
-    return Bot(token=settings.bot_token, parse_mode=settings.parse_mode)
+def build_bot(settings: Settings) -> Bot:
+    bot = Bot(token=settings.bot_token, parse_mode=settings.parse_mode)
+    if settings.trace_sample_rate:
+        # Найзовнішня: span виклику включає і очікування в черзі планувальника.
+        bot.session.middleware(TracingRequestMiddleware())
+    # Планувальник зовнішній, тож метрики Bot API міряють сам запит, без очікування в черзі.
+    bot.session.middleware(SendScheduler(
+        global_rate=settings.send_global_rate,
+        global_burst=settings.send_global_rate,
+        chat_rate=settings.send_chat_rate,
+        chat_burst=settings.send_chat_burst,
+    ))
+    bot.session.middleware(RequestMetricsMiddleware())
+    return bot
 
 
-async def main() -> None:
-    settings = get_settings()
-    bot = _build_bot(settings)
-    dp = Dispatcher()
+def _window_counter(limit: int, window: float) -> Optional[SlidingWindowCounter]:
+    return SlidingWindowCounter(limit, window) if limit else None
+
+
+def _watermarks(settings: Settings, storage: BaseStorage) -> Optional[Watermarks]:
+    """Позначки оброблених оновлень потрібні, лише коли сесії переживають перезапуск."""
+    if settings.fsm_storage != SQLITE_STORAGE:
+        return None
+    return Watermarks(storage.storage if isinstance(storage, SessionLifecycle) else storage)
+
+
+def _reminder_scheduler(settings: Settings) -> Optional[ReminderScheduler]:
+    if not settings.remind_rate:
+        return None
+    calendar = ReminderCalendar(settings.remind_utc_offset, settings.remind_window_start, settings.remind_window_end)
+    return ReminderScheduler(
+        build_reminder_store(settings), calendar, rate=settings.remind_rate, batch_size=settings.remind_batch,
+    )
+
+
+def build_dispatcher(settings: Settings) -> Dispatcher:
+    profiles = build_profile_store(settings)
+    tariffs = TariffRegistry(settings.tariffs_path, reload_interval=settings.tariffs_reload_interval)
+    history = build_history_store(settings)
+    receipts = ReceiptRenderer(
+        workers=settings.receipt_workers,
+        queue_limit=settings.receipt_queue_limit,
+        font_path=settings.receipt_font_path,
+    )
+    panel_editor = PanelEditor(delay=settings.panel_edit_delay)
+    reminders = _reminder_scheduler(settings)
+    storage = build_storage(settings)
+    dp = Dispatcher(
+        storage=storage,
+        profiles=profiles,
+        tariffs=tariffs,
+        history=history,
+        receipts=receipts,
+        inline_cache_time=settings.inline_cache_time,
+        dialogue_ui=settings.dialogue_ui,
+        panel_editor=panel_editor,
+        reminders=reminders,
+    )
+    if settings.trace_sample_rate:
+        tracer = Tracer(settings.trace_path, settings.trace_sample_rate, flush_interval=settings.trace_flush_interval)
+        dp.update.outer_middleware(TracingMiddleware(tracer))
+        dp.startup.register(tracer.start)
+        dp.shutdown.register(tracer.close)
+    if settings.dedup_ttl:
+        # Після FSMContextMiddleware, яка лише читає стан: дублікат відкидається до будь-яких змін.
+        dp.update.outer_middleware(DeduplicationMiddleware(
+            update_ids=RecentKeys(settings.dedup_capacity, settings.dedup_ttl),
+            messages=RecentKeys(settings.dedup_capacity, settings.dedup_ttl),
+            watermarks=_watermarks(settings, storage),
+        ))
+    if settings.throttle_user_limit or settings.throttle_chat_limit:
+        # Перед іншими middleware повідомлень: відкинуте оновлення не доходить до обробників.
+        dp.message.outer_middleware(ThrottlingMiddleware(
+            per_user=_window_counter(settings.throttle_user_limit, settings.throttle_window),
+            per_chat=_window_counter(settings.throttle_chat_limit, settings.throttle_window),
+        ))
+    if isinstance(storage, SessionLifecycle) and storage.notify_expired:
+        dp.message.outer_middleware(SessionExpiryMiddleware(storage))
+    dp.startup.register(tariffs.start)
+    dp.shutdown.register(tariffs.close)
+    dp.shutdown.register(profiles.close)
+    dp.shutdown.register(history.close)
+    dp.shutdown.register(receipts.close)
+    dp.shutdown.register(panel_editor.close)
+    if reminders is not None:
+        # Кожен воркер розсилає частину підписників зі своєю часткою REMIND_RATE; спільну SQLite-базу
+        # захищає оренда пачок.
+        dp.startup.register(reminders.start)
+        dp.shutdown.register(reminders.close)
     dp.include_router(router)
+    return dp
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Telegram-бот для розрахунку комунальних платежів')
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Залогувати час до готовності й до першого оновлення, а потім вартість імпортів за модулями',
+    )
+    return parser.parse_args(argv)
+
+
+async def main(profile_startup: bool = False) -> None:
+    settings = get_settings()
+    bot = build_bot(settings)
+    if settings.workers > 1:
+        from bot.sharding import run_supervisor
+
+        # Супервізор лише приймає оновлення, диспетчер тут потрібен тільки для списку типів оновлень.
+        logging.info('Бот запущений у режимі супервізора з %s воркерами', settings.workers)
+        dp = Dispatcher()
+        dp.include_router(router)
+        await run_supervisor(bot, dp, settings)
+        return
+    dp = build_dispatcher(settings)
+    if profile_startup:
+        from bot.startup import FirstUpdateProbe, process_uptime
+
+        dp.update.outer_middleware(FirstUpdateProbe())
+        dp.startup.register(lambda: logging.info('Бот готовий через %.3f с після запуску процесу', process_uptime()))
+    if settings.metrics_port and not settings.metrics_on_webhook_server:
+        from bot.metrics.server import start_metrics_server
+
+        metrics_runner = await start_metrics_server(settings.metrics_host, settings.metrics_port, settings.metrics_path)
+        dp.shutdown.register(metrics_runner.cleanup)
+    if settings.mode == WEBHOOK_MODE:
+        from bot.webhook import run_webhook
+
+        logging.info('Бот запущений у режимі webhook')
+        await run_webhook(dp, bot, settings)
+        return
+
     logging.info('Бот запущений та очікує повідомлення')
+    await bot.delete_webhook(drop_pending_updates=False)
     await dp.start_polling(bot)
 
 
 if __name__ == '__main__':
     try:
-        asyncio.run(main())
+        asyncio.run(main(profile_startup=parse_args().profile_startup))
     except (KeyboardInterrupt, SystemExit):
         logging.info('Бот зупинено')
@@ -0,0 +1,89 @@
+"""Метрики бота у форматі Prometheus."""
+from __future__ import annotations
+
+from bot.metrics.registry import Counter, Gauge, Histogram, MetricsRegistry
+
+
+REGISTRY = MetricsRegistry()
+
+HANDLER_LATENCY = REGISTRY.histogram(
+    'bot_handler_latency_seconds', 'Час обробки повідомлення за обробником і кроком діалогу', ('handler', 'step'),
+)
+HANDLER_ERRORS = REGISTRY.counter('bot_handler_errors_total', 'Винятки в обробниках', ('handler',))
+VALIDATION_FAILURES = REGISTRY.counter(
+    'bot_validation_failures_total', 'Відхилені значення (FlowResult.error) за кроком', ('step',),
+)
+CALCULATIONS = REGISTRY.counter('bot_calculations_total', 'Завершені розрахунки')
+TARIFF_PRESETS = REGISTRY.counter(
+    'bot_tariff_presets_total', 'Тарифи, заповнені набором із довідника', ('provider',),
+)
+BACK_STEPS = REGISTRY.counter('bot_back_steps_total', 'Повернення на попередній крок')
+ACTIVE_SESSIONS = REGISTRY.gauge('bot_active_sessions', 'Розпочаті й ще не завершені діалоги цього процесу')
+LIVE_SESSIONS = REGISTRY.gauge('bot_fsm_live_sessions', 'FSM-сесії на обліку менеджера життєвого циклу')
+SESSION_EVICTIONS = REGISTRY.counter(
+    'bot_fsm_session_evictions_total', 'Прибрані FSM-сесії: idle — за неактивністю, capacity — за лімітом', ('reason',),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'bot_cache_requests_total', 'Звернення до кешів: hit, miss або joined (чекали на обчислення в польоті)',
+    ('cache', 'outcome'),
+)
+RECEIPT_RENDER_SECONDS = REGISTRY.histogram(
+    'bot_receipt_render_seconds', 'Час від постановки квитанції в чергу пулу до готового файлу', ('format',),
+)
+RECEIPTS_IN_FLIGHT = REGISTRY.gauge('bot_receipts_in_flight', 'Квитанції, що малюються або чекають вільного процесу')
+RECEIPTS_REJECTED = REGISTRY.counter('bot_receipts_rejected_total', 'Квитанції, відхилені через заповнену чергу')
+THROTTLED_UPDATES = REGISTRY.counter(
+    'bot_throttled_updates_total', 'Повідомлення, відкинуті захистом від флуду, за лімітом (user або chat)', ('scope',),
+)
+DUPLICATE_UPDATES = REGISTRY.counter(
+    'bot_duplicate_updates_total', 'Повторно доставлені оновлення, відкинуті до обробки, за ключем (update або message)', ('key',),
+)
+TRACE_SPANS_EXPORTED = REGISTRY.counter('bot_trace_spans_exported_total', 'Span, записані у файл трасувань')
+TRACES_DROPPED = REGISTRY.counter('bot_traces_dropped_total', 'Трасування, витіснені з переповненого буфера до запису')
+PANEL_EDITS = REGISTRY.counter(
+    'bot_panel_edits_total', 'Правки панелі діалогу: edited, coalesced, unchanged або resent', ('outcome',),
+)
+REMINDERS = REGISTRY.counter(
+    'bot_reminders_total', 'Щомісячні нагадування: sent, failed (буде повтор) або blocked (бота заблоковано)', ('outcome',),
+)
+API_LATENCY = REGISTRY.histogram('bot_api_request_seconds', 'Тривалість викликів Bot API', ('method',))
+API_ERRORS = REGISTRY.counter('bot_api_errors_total', 'Невдалі виклики Bot API', ('method',))
+SEND_QUEUE_DEPTH = REGISTRY.gauge('bot_send_queue_depth', 'Вихідні повідомлення, що чекають на відправку')
+SEND_WAIT = REGISTRY.histogram(
+    'bot_send_wait_seconds', 'Час очікування повідомлення у черзі планувальника',
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+SEND_RETRY_AFTER = REGISTRY.counter('bot_send_retry_after_total', 'Відповіді TelegramRetryAfter')
+
+
+__all__ = [
+    'REGISTRY',
+    'HANDLER_LATENCY',
+    'HANDLER_ERRORS',
+    'VALIDATION_FAILURES',
+    'CALCULATIONS',
+    'TARIFF_PRESETS',
+    'BACK_STEPS',
+    'ACTIVE_SESSIONS',
+    'LIVE_SESSIONS',
+    'SESSION_EVICTIONS',
+    'CACHE_REQUESTS',
+    'RECEIPT_RENDER_SECONDS',
+    'RECEIPTS_IN_FLIGHT',
+    'RECEIPTS_REJECTED',
+    'THROTTLED_UPDATES',
+    'DUPLICATE_UPDATES',
+    'TRACE_SPANS_EXPORTED',
+    'TRACES_DROPPED',
+    'PANEL_EDITS',
+    'REMINDERS',
+    'API_LATENCY',
+    'API_ERRORS',
+    'SEND_QUEUE_DEPTH',
+    'SEND_WAIT',
+    'SEND_RETRY_AFTER',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'MetricsRegistry',
+]
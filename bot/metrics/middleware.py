@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+from bot import metrics
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+UNHANDLED = 'unhandled'
+
+
+class UpdateProbe:
+    """Мітки поточного оновлення: обробник заповнює ``HandlerLabelMiddleware``, крок — сам обробник."""
+
+    __slots__ = ('handler', 'step')
+
+    def __init__(self) -> None:
+        self.handler = UNHANDLED
+        self.step = ''
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """Зовнішня middleware: міряє повний час обробки і кладе ``metrics_probe`` у дані обробника."""
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: Dict[str, Any]) -> Any:
+        probe = UpdateProbe()
+        data['metrics_probe'] = probe
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            metrics.HANDLER_ERRORS.inc(probe.handler)
+            raise
+        finally:
+            metrics.HANDLER_LATENCY.observe(time.perf_counter() - started, probe.handler, probe.step)
+
+
+class HandlerLabelMiddleware(BaseMiddleware):
+    """Внутрішня middleware: викликається вже після вибору обробника і записує його ім'я у probe."""
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: Dict[str, Any]) -> Any:
+        probe: Optional[UpdateProbe] = data.get('metrics_probe')
+        if probe is not None:
+            probe.handler = data['handler'].callback.__name__
+        return await handler(event, data)
+
+
+class RequestMetricsMiddleware(BaseRequestMiddleware):
+    """Міряє тривалість кожного вихідного виклику Bot API за назвою методу."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: 'Bot',
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception:
+            metrics.API_ERRORS.inc(name)
+            raise
+        finally:
+            metrics.API_LATENCY.observe(time.perf_counter() - started, name)
+
+
+__all__ = ['UpdateProbe', 'MetricsMiddleware', 'HandlerLabelMiddleware', 'RequestMetricsMiddleware']
@@ -0,0 +1,39 @@
+"""HTTP-ендпоінт ``/metrics`` для збирача Prometheus."""
+from __future__ import annotations
+
+import logging
+
+from aiohttp import web
+
+from bot.metrics import REGISTRY
+from bot.metrics.registry import MetricsRegistry
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics_handler(registry: MetricsRegistry = REGISTRY):
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(body=registry.render().encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
+
+    return handle
+
+
+def add_metrics_route(app: web.Application, path: str = '/metrics', registry: MetricsRegistry = REGISTRY) -> None:
+    app.router.add_get(path, metrics_handler(registry))
+
+
+async def start_metrics_server(host: str, port: int, path: str = '/metrics') -> web.AppRunner:
+    """Запускає окремий aiohttp-сервер з метриками; зупиняється через ``runner.cleanup()``."""
+    app = web.Application()
+    add_metrics_route(app, path)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+    logger.info('Метрики доступні на %s:%s%s', host, port, path)
+    return runner
+
+
+__all__ = ['add_metrics_route', 'metrics_handler', 'start_metrics_server']
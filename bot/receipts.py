@@ -0,0 +1,296 @@
+"""Квитанції для друку (PDF або PNG) з уже порахованих секцій і підсумку.
+
+Малювання займає процесор на десятки мілісекунд, тому виконується в окремих процесах
+(``ProcessPoolExecutor``), а не в циклі подій aiogram. Черга обмежена: якщо пул зайнятий і
+в черзі вже ``queue_limit`` квитанцій, нова відхиляється з ``RendererBusy``. Готові файли
+кешуються за хешем вмісту квитанції, тож той самий рахунок не малюється двічі. Якщо процес пулу впав
+(нестача пам'яті, збій ініціалізатора), пул більше не приймає задач: він замінюється новим, а квитанція
+малюється ще раз. Шрифт перевіряється один раз при створенні ``ReceiptRenderer``; без нього квитанції
+відхиляються з ``ReceiptUnavailable``, не запускаючи пул.
+
+Pillow і ``multiprocessing`` імпортуються лише при першій квитанції, а не на старті бота; процесам пулу
+потрібен лише цей модуль, без aiogram.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import time
+from concurrent.futures import BrokenExecutor, Executor
+from dataclasses import astuple, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from bot import metrics
+from bot.cache import SingleFlightCache
+
+if TYPE_CHECKING:
+    from PIL.ImageFont import FreeTypeFont
+
+    from bot.dialogue.calculator import PaymentCalculator
+
+
+logger = logging.getLogger(__name__)
+
+PDF_FORMAT = 'pdf'
+PNG_FORMAT = 'png'
+RECEIPT_FORMATS = (PDF_FORMAT, PNG_FORMAT)
+
+DEFAULT_FONT_PATH = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+RECEIPT_CACHE_SIZE = 128
+
+# A4 при 150 dpi.
+_PAGE_SIZE = (1240, 1754)
+_DPI = 150
+_MARGIN = 90
+_TEXT_SIZE = 28
+_TITLE_SIZE = 44
+
+
+class RendererBusy(RuntimeError):
+    """Пул зайнятий, а черга квитанцій заповнена."""
+
+
+class ReceiptUnavailable(RuntimeError):
+    """Квитанції не можна намалювати: немає файлу шрифту."""
+
+
+@dataclass(frozen=True)
+class ReceiptData:
+    """Усе, що потрапляє на квитанцію, уже у вигляді тексту: об'єкт дешево передається в інший процес."""
+
+    title: str
+    full_name: str
+    address: str
+    readings_caption: str
+    # (лічильник, попередні, поточні, розхід)
+    readings: Tuple[Tuple[str, str, str, str], ...]
+    # (послуга, кількість, тариф, сума)
+    services: Tuple[Tuple[str, str, str, str], ...]
+    total: str
+    purpose: str
+
+    def digest(self, fmt: str) -> str:
+        """Адреса вмісту: однакові квитанції в тому самому форматі мають однаковий хеш."""
+        digest = hashlib.sha256(fmt.encode())
+        digest.update(repr(astuple(self)).encode('utf-8'))
+        return digest.hexdigest()
+
+
+def build_receipt(payload: Dict[str, Any], calculator: PaymentCalculator) -> ReceiptData:
+    # Каталог потрібен лише тут, у процесі бота: процесам пулу діалог не потрібен.
+    from bot.dialogue.constants import CATALOG as catalog
+
+    fmt = calculator.formatter
+    month_name, _, year = fmt.month_name(payload['period'])
+    prev_date, current_date = fmt.period_dates(payload['period'])
+    unit = catalog.readings_unit
+    caption = f'Показники лічильників, {unit}' if unit else 'Показники лічильників'
+    sections = calculator.sections(payload)
+    return ReceiptData(
+        title=f'Квитанція за {month_name} {year} р.',
+        full_name=payload['full_name'],
+        address=payload['address'],
+        readings_caption=f'{caption} ({prev_date} — {current_date})',
+        # Якщо одиниці лічильників різні, кожна стоїть біля свого розходу.
+        readings=(((catalog.readings_column, 'Попередні', 'Поточні', 'Розхід'),) + tuple(
+            (
+                meter.title,
+                fmt.decimal_for_summary(payload[meter.prev.key]),
+                fmt.decimal_for_summary(payload[meter.curr.key]),
+                fmt.quantity(payload[meter.curr.key] - payload[meter.prev.key]) + ('' if unit else f' {meter.unit}'),
+            )
+            for meter in catalog.reading_meters
+        )),
+        services=(('Послуга', 'Кількість', 'Тариф', 'Сума, грн'),) + tuple(
+            (section.label, section.quantity_display, section.tariff_display, section.amount_display)
+            for section in sections
+        ),
+        total=f'Всього до оплати: {fmt.money(sum(section.amount for section in sections))} грн',
+        purpose=calculator.summary(payload),
+    )
+
+
+@lru_cache(maxsize=16)
+def _font(path: str, size: int) -> FreeTypeFont:
+    from PIL import ImageFont
+
+    return ImageFont.truetype(path, size)
+
+
+def _bold_path(path: str) -> str:
+    bold = Path(path).with_name(Path(path).stem + '-Bold' + Path(path).suffix)
+    return str(bold) if bold.exists() else path
+
+
+def _wrap(draw: Any, text: str, font: FreeTypeFont, width: int) -> List[str]:
+    lines: List[str] = []
+    current = ''
+    for word in text.split():
+        candidate = f'{current} {word}' if current else word
+        if current and draw.textlength(candidate, font=font) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+def render_receipt(data: ReceiptData, fmt: str, font_path: str = DEFAULT_FONT_PATH) -> bytes:
+    """Малює квитанцію і повертає вміст файлу. Виконується в процесі пулу."""
+    from PIL import Image, ImageDraw
+
+    if fmt not in RECEIPT_FORMATS:
+        raise ValueError(f'Невідомий формат квитанції: {fmt!r}')
+    text_font = _font(font_path, _TEXT_SIZE)
+    bold_font = _font(_bold_path(font_path), _TEXT_SIZE)
+    title_font = _font(_bold_path(font_path), _TITLE_SIZE)
+    image = Image.new('RGB', _PAGE_SIZE, 'white')
+    draw = ImageDraw.Draw(image)
+    width = _PAGE_SIZE[0] - 2 * _MARGIN
+    line_height = int(_TEXT_SIZE * 1.5)
+    y = _MARGIN
+
+    draw.text((_MARGIN, y), data.title, font=title_font, fill='black')
+    y += int(_TITLE_SIZE * 1.8)
+    for label, value in (('Платник', data.full_name), ('Адреса', data.address)):
+        for line in _wrap(draw, f'{label}: {value}', text_font, width):
+            draw.text((_MARGIN, y), line, font=text_font, fill='black')
+            y += line_height
+    y += line_height
+    draw.text((_MARGIN, y), data.readings_caption, font=text_font, fill='black')
+    y += line_height
+
+    # Перша колонка — назва, решта вирівнюються праворуч у своїх межах.
+    columns = (_MARGIN + int(width * 0.62), _MARGIN + int(width * 0.76), _MARGIN + width)
+    for table in (data.readings, data.services):
+        for row_index, row in enumerate(table):
+            font = bold_font if row_index == 0 else text_font
+            draw.text((_MARGIN, y), row[0], font=font, fill='black')
+            for right, cell in zip(columns, row[1:]):
+                draw.text((right - draw.textlength(cell, font=font), y), cell, font=font, fill='black')
+            y += line_height
+            if row_index == 0:
+                draw.line((_MARGIN, y - 6, _MARGIN + width, y - 6), fill='black', width=2)
+        y += line_height
+
+    draw.text((_MARGIN, y), data.total, font=title_font, fill='black')
+    y += int(_TITLE_SIZE * 1.8)
+    draw.text((_MARGIN, y), 'Призначення платежу:', font=bold_font, fill='black')
+    y += line_height
+    for line in _wrap(draw, data.purpose, text_font, width):
+        draw.text((_MARGIN, y), line, font=text_font, fill='black')
+        y += line_height
+
+    output = io.BytesIO()
+    if fmt == PDF_FORMAT:
+        image.save(output, format='PDF', resolution=_DPI)
+    else:
+        image.save(output, format='PNG')
+    return output.getvalue()
+
+
+def _warm_up(font_path: str) -> None:
+    """Ініціалізатор процесу пулу: Pillow і шрифти завантажуються до першої квитанції."""
+    _font(font_path, _TEXT_SIZE)
+    _font(_bold_path(font_path), _TEXT_SIZE)
+    _font(_bold_path(font_path), _TITLE_SIZE)
+
+
+class ReceiptRenderer:
+    """Малює квитанції в пулі з ``workers`` процесів; у черзі понад зайняті процеси — до ``queue_limit``."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_limit: int = 8,
+        font_path: str = DEFAULT_FONT_PATH,
+        cache_size: int = RECEIPT_CACHE_SIZE,
+    ) -> None:
+        if workers < 1 or queue_limit < 0:
+            raise ValueError('Потрібен хоча б один процес, а черга не може бути від’ємною')
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.font_path = font_path
+        # Без шрифту ініціалізатор пулу падав би на кожній квитанції, ламаючи пул.
+        self.font_available = Path(font_path).is_file()
+        if not self.font_available:
+            logger.warning('Шрифт квитанцій %s не знайдено, /receipt вимкнено', font_path)
+        self._cache: SingleFlightCache[str, bytes] = SingleFlightCache('receipts', cache_size)
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Квитанції, що малюються або чекають вільного процесу."""
+        return self._in_flight
+
+    async def render(self, data: ReceiptData, fmt: str) -> bytes:
+        return await self._cache.get(data.digest(fmt), lambda: self._submit(data, fmt))
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def _submit(self, data: ReceiptData, fmt: str) -> bytes:
+        if not self.font_available:
+            raise ReceiptUnavailable(f'Шрифт квитанцій {self.font_path} не знайдено')
+        if self._in_flight >= self.workers + self.queue_limit:
+            metrics.RECEIPTS_REJECTED.inc()
+            raise RendererBusy('Черга квитанцій заповнена')
+        self._in_flight += 1
+        metrics.RECEIPTS_IN_FLIGHT.set(self._in_flight)
+        started = time.perf_counter()
+        try:
+            content = await self._render_in_pool(data, fmt)
+        finally:
+            self._in_flight -= 1
+            metrics.RECEIPTS_IN_FLIGHT.set(self._in_flight)
+        metrics.RECEIPT_RENDER_SECONDS.observe(time.perf_counter() - started, fmt)
+        return content
+
+    async def _render_in_pool(self, data: ReceiptData, fmt: str) -> bytes:
+        executor = self._pool()
+        try:
+            return await asyncio.wrap_future(executor.submit(render_receipt, data, fmt, self.font_path))
+        except BrokenExecutor:
+            logger.warning('Процес пулу квитанцій завершився аварійно, пул створюється заново')
+            self._discard(executor)
+        return await asyncio.wrap_future(self._pool().submit(render_receipt, data, fmt, self.font_path))
+
+    def _discard(self, executor: Executor) -> None:
+        """Прибирає зламаний пул; якщо інша квитанція вже замінила його, новий не чіпає."""
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn, а не fork: дочірній процес не успадковує цикл подій і потоки бота.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_warm_up,
+                initargs=(self.font_path,),
+            )
+        return self._executor
+
+
+__all__ = [
+    'RECEIPT_FORMATS',
+    'ReceiptData',
+    'ReceiptRenderer',
+    'ReceiptUnavailable',
+    'RendererBusy',
+    'build_receipt',
+    'render_receipt',
+]
@@ -0,0 +1,185 @@
+"""Щомісячні нагадування передати показники лічильників.
+
+Один ``ReminderScheduler`` на процес замість задачі зі сном на кожного підписника: він спить до
+найближчого нагадування з індексу сховища (але не довше за ``poll_interval``), забирає пачку тих, чий
+час настав, і розсилає їх не швидше за ``rate`` повідомлень на секунду, лишаючи решту загального
+ліміту відправки відповідям у діалогах. Нагадування користувача приходить у вибраний ним день
+місяця, а час доби для кожного свій — стабільний зсув від хешу user id у межах денного вікна
+``ReminderCalendar``, тож навіть якщо всі підписалися на одне число, розсилка розтягується на день.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError
+
+from bot import metrics
+from bot.dialogue.constants import MONTH_NAMES
+from bot.storage.reminders import Reminder, ReminderStore
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+logger = logging.getLogger(__name__)
+
+MIN_REMINDER_DAY = 1
+# Лише дні, що є в кожному місяці.
+MAX_REMINDER_DAY = 28
+
+REMINDER_TEXT = (
+    '🔔 Час передати показники лічильників за {month}. Натисніть /start, щоб розрахувати платіж.\n'
+    'Вимкнути нагадування: /remind off'
+)
+
+# Оренда пачки у сховищі: після неї нагадування з пачки, що не встигла розійтися, видаються знову.
+CLAIM_LEASE = 600.0
+RETRY_DELAY = 900.0
+
+
+class ReminderCalendar:
+    """Час нагадування: день місяця плюс зсув користувача у вікні ``[window_start, window_end)`` годин."""
+
+    def __init__(self, utc_offset: float = 2.0, window_start: int = 10, window_end: int = 20) -> None:
+        if not 0 <= window_start < window_end <= 24:
+            raise ValueError('Вікно нагадувань має лежати в межах доби')
+        self.tz = timezone(timedelta(hours=utc_offset))
+        self.window_start = window_start * 3600
+        self.window = (window_end - window_start) * 3600
+
+    def offset(self, user_id: int) -> int:
+        """Секунди від початку вікна; мультиплікативний хеш рівномірно розкидає і сусідні id."""
+        return (user_id * 2654435761 % 2 ** 32) * self.window >> 32
+
+    def slot(self, user_id: int, day: int, year: int, month: int) -> float:
+        midnight = datetime(year, month, day, tzinfo=self.tz).timestamp()
+        return midnight + self.window_start + self.offset(user_id)
+
+    def next_due(self, user_id: int, day: int, after: float) -> float:
+        """Перший час нагадування строго після ``after``."""
+        local = datetime.fromtimestamp(after, self.tz)
+        due = self.slot(user_id, day, local.year, local.month)
+        if due <= after:
+            year, month = divmod(local.year * 12 + local.month, 12)
+            due = self.slot(user_id, day, year, month + 1)
+        return due
+
+    def local(self, timestamp: float) -> datetime:
+        return datetime.fromtimestamp(timestamp, self.tz)
+
+
+class ReminderScheduler:
+    """Підписки на нагадування і фонова розсилка тих, чий час настав."""
+
+    def __init__(
+        self,
+        store: ReminderStore,
+        calendar: ReminderCalendar,
+        rate: float = 5.0,
+        batch_size: int = 100,
+        poll_interval: float = 60.0,
+        lease: float = CLAIM_LEASE,
+        retry_delay: float = RETRY_DELAY,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if rate <= 0 or batch_size < 1:
+            raise ValueError('Швидкість розсилки і розмір пачки мають бути додатними')
+        self.store = store
+        self.calendar = calendar
+        self.rate = rate
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self._wake = asyncio.Event()
+        self._next_send = 0.0
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def subscribe(self, user_id: int, chat_id: int, day: int) -> float:
+        if not MIN_REMINDER_DAY <= day <= MAX_REMINDER_DAY:
+            raise ValueError(f'День нагадування має бути від {MIN_REMINDER_DAY} до {MAX_REMINDER_DAY}')
+        due_at = self.calendar.next_due(user_id, day, self.clock())
+        await self.store.subscribe(user_id, chat_id, day, due_at)
+        # Нова підписка може бути раніше за ту, до якої спить цикл.
+        self._wake.set()
+        return due_at
+
+    async def unsubscribe(self, user_id: int) -> bool:
+        return await self.store.unsubscribe(user_id)
+
+    async def get(self, user_id: int) -> Optional[Reminder]:
+        return await self.store.get(user_id)
+
+    async def start(self, bot: Bot) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever(bot))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.store.close()
+
+    async def run_due(self, bot: Bot) -> int:
+        """Розсилає одну пачку нагадувань, чий час настав; повертає її розмір."""
+        batch = await self.store.claim(self.clock(), self.batch_size, self.lease)
+        if not batch:
+            return 0
+        loop = asyncio.get_running_loop()
+        tasks: List[asyncio.Task[None]] = []
+        for reminder in batch:
+            # Темп тримається і між пачками: наступна не починається з пачки відправок підряд.
+            delay = self._next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_send = max(self._next_send, loop.time()) + 1 / self.rate
+            tasks.append(asyncio.create_task(self._deliver(bot, reminder)))
+        await asyncio.gather(*tasks)
+        return len(batch)
+
+    async def _deliver(self, bot: Bot, reminder: Reminder) -> None:
+        month = MONTH_NAMES.get(self.calendar.local(reminder.due_at).month, '')
+        try:
+            await bot.send_message(reminder.chat_id, REMINDER_TEXT.format(month=month))
+        except TelegramForbiddenError:
+            # Користувач заблокував бота: далі надсилати нікуди.
+            await self.store.unsubscribe(reminder.user_id)
+            metrics.REMINDERS.inc('blocked')
+            return
+        except TelegramAPIError as exc:
+            logger.warning('Нагадування для %s не надіслано (%s), повтор через %.0f с', reminder.user_id, exc, self.retry_delay)
+            await self.store.reschedule(reminder, self.clock() + self.retry_delay)
+            metrics.REMINDERS.inc('failed')
+            return
+        # Від пізнішого з двох моментів: нагадування, пропущене на кілька місяців, приходить один раз.
+        after = max(reminder.due_at, self.clock())
+        await self.store.reschedule(reminder, self.calendar.next_due(reminder.user_id, reminder.day, after))
+        metrics.REMINDERS.inc('sent')
+
+    async def _run_forever(self, bot: Bot) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                if await self.run_due(bot):
+                    continue
+                next_due = await self.store.next_due(self.clock())
+            except Exception:
+                logger.exception('Помилка розсилки нагадувань')
+                next_due = None
+            delay = self.poll_interval if next_due is None else min(max(next_due - self.clock(), 0.0), self.poll_interval)
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+__all__ = ['MAX_REMINDER_DAY', 'MIN_REMINDER_DAY', 'ReminderCalendar', 'ReminderScheduler']
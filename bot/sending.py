@@ -0,0 +1,182 @@
+"""Планувальник вихідних повідомлень з урахуванням лімітів Telegram.
+
+Підключається як middleware сесії бота, тож через нього проходять усі ``message.answer`` та інші
+виклики з ``chat_id``. Кожен чат має власну чергу (порядок повідомлень зберігається) і свій
+token bucket; поверх них діє спільний глобальний bucket. Коли Telegram відповідає
+``TelegramRetryAfter``, чат чекає ``retry_after`` і повторює запит. Відповідь не каже, який ліміт
+спрацював; ліміт чату планувальник і так дотримує, тож найімовірніше це загальний flood limit бота —
+на той самий час зупиняється й глобальний bucket, щоб інші чати не слали в нього далі.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Union
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from bot import metrics
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+logger = logging.getLogger(__name__)
+
+ChatId = Union[int, str]
+
+# Смуги чатів, які ще відновлюють токени, чистяться, коли їх кількість подвоюється від цього порогу.
+PRUNE_THRESHOLD = 1024
+
+
+class TokenBucket:
+    """Token bucket з резервуванням: ``reserve`` одразу списує токен і повертає, скільки чекати.
+
+    Очікувачі обслуговуються в порядку резервування, а самі чекання — звичайні ``asyncio.sleep``.
+    """
+
+    __slots__ = ('rate', 'burst', '_tokens', '_updated')
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        # Момент, до якого враховано поповнення; після ``block`` він лежить у майбутньому.
+        self._updated = time.monotonic()
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self._tokens -= 1
+        delay = max(0.0, self._updated - now)
+        if self._tokens < 0:
+            delay += -self._tokens / self.rate
+        return delay
+
+    def block(self, seconds: float, now: Optional[float] = None) -> None:
+        """Забороняє видачу токенів на ``seconds`` (після flood control від Telegram).
+
+        Після паузи bucket починає з одного токена, а не з повного запасу, щоб не отримати нову відмову.
+        """
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self._updated = max(self._updated, now + seconds)
+        self._tokens = 1.0
+
+    def idle(self, now: Optional[float] = None) -> bool:
+        """Bucket повний і не заблокований — його можна видалити без втрати обмеження."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        return self._tokens >= self.burst and now >= self._updated
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+
+class _ChatLane:
+    __slots__ = ('lock', 'bucket', 'pending')
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.lock = asyncio.Lock()
+        self.bucket = TokenBucket(rate, burst)
+        self.pending = 0
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """Пропускає запити з ``chat_id`` через ліміт чату та глобальний ліміт, решту — без змін."""
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        global_burst: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_retries: int = 5,
+    ) -> None:
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._lanes: Dict[ChatId, _ChatLane] = {}
+        self._prune_at = PRUNE_THRESHOLD
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(lane.pending for lane in self._lanes.values())
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: 'Bot',
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, 'chat_id', None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            if len(self._lanes) >= self._prune_at:
+                self.prune()
+                self._prune_at = max(PRUNE_THRESHOLD, 2 * len(self._lanes))
+            lane = self._lanes[chat_id] = _ChatLane(self.chat_rate, self.chat_burst)
+        lane.pending += 1
+        metrics.SEND_QUEUE_DEPTH.inc()
+        queued = time.monotonic()
+        try:
+            # Lock у asyncio будить очікувачів у порядку надходження, тож черга чату лишається FIFO.
+            async with lane.lock:
+                return await self._send(make_request, bot, method, lane, queued)
+        finally:
+            lane.pending -= 1
+            metrics.SEND_QUEUE_DEPTH.dec()
+            if not lane.pending and lane.bucket.idle():
+                self._lanes.pop(chat_id, None)
+
+    async def _send(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: 'Bot',
+        method: TelegramMethod[TelegramType],
+        lane: _ChatLane,
+        queued: float,
+    ) -> Response[TelegramType]:
+        attempt = 0
+        while True:
+            # Спершу ліміт чату, потім глобальний: інакше чат, що чекає на свій токен, марно займав би глобальний.
+            delay = lane.bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            delay = self.global_bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if attempt == 0:
+                metrics.SEND_WAIT.observe(time.monotonic() - queued)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                metrics.SEND_RETRY_AFTER.inc()
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.warning('Flood control у чаті %s, повтор через %s с', method.chat_id, exc.retry_after)
+                # Після паузи обидва bucket починають з одного токена й розганяються до звичайної швидкості.
+                lane.bucket.block(exc.retry_after)
+                self.global_bucket.block(exc.retry_after)
+
+    def prune(self) -> int:
+        """Видаляє смуги чатів без черги з повністю відновленими bucket; повертає їх кількість."""
+        now = time.monotonic()
+        stale = [chat_id for chat_id, lane in self._lanes.items() if not lane.pending and lane.bucket.idle(now)]
+        for chat_id in stale:
+            del self._lanes[chat_id]
+        return len(stale)
+
+
+__all__ = ['SendScheduler', 'TokenBucket']
@@ -0,0 +1,344 @@
+"""Режим супервізора: оновлення розподіляються між кількома процесами-воркерами за ``chat_id``.
+
+Супервізор отримує оновлення (polling або webhook) і кладе їх у чергу воркера, обраного консистентним
+хешем ``chat_id``, тож кожен діалог завжди обробляє один процес. Усередині воркера оновлення одного чату
+виконуються строго по черзі, різні чати — паралельно. Воркер, що впав, перезапускається з тією самою
+чергою; під час зупинки воркери дообробляють уже отримані оновлення. Усі воркери надсилають від
+імені одного токена, тож загальні ліміти відправки (``SEND_GLOBAL_RATE``, ``REMIND_RATE``) діляться
+між ними порівну.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib
+import logging
+import multiprocessing
+import queue
+import threading
+from bisect import bisect
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+
+from bot.config import WEBHOOK_MODE, Settings
+
+
+logger = logging.getLogger(__name__)
+
+STOP = None
+RESTART_DELAY = 1.0
+READ_BATCH = 256
+
+BotFactory = Callable[[Settings], Bot]
+
+# Ключі оновлень, у яких чат лежить у ``message.chat``, та ключі, де є лише відправник.
+_MESSAGE_KEYS = ('message', 'edited_message', 'channel_post', 'edited_channel_post')
+_USER_KEYS = ('callback_query', 'inline_query', 'chosen_inline_result', 'shipping_query', 'pre_checkout_query',
+              'my_chat_member', 'chat_member', 'chat_join_request', 'poll_answer')
+
+
+def update_chat_id(update: Dict[str, Any]) -> int:
+    """Повертає ``chat_id`` оновлення (або id користувача, якщо чату немає); 0 — якщо не знайдено."""
+    for key in _MESSAGE_KEYS:
+        event = update.get(key)
+        if event:
+            return int(event['chat']['id'])
+    for key in _USER_KEYS:
+        event = update.get(key)
+        if not event:
+            continue
+        chat = event.get('chat') or (event.get('message') or {}).get('chat')
+        if chat:
+            return int(chat['id'])
+        user = event.get('from') or event.get('user')
+        if user:
+            return int(user['id'])
+    return 0
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Консистентне хешування з віртуальними вузлами: ``node_for`` стабільний між запусками."""
+
+    def __init__(self, nodes: int, replicas: int = 64) -> None:
+        if nodes < 1:
+            raise ValueError('Потрібен хоча б один вузол')
+        points = sorted((_hash(f'{node}:{replica}'), node) for node in range(nodes) for replica in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: int) -> int:
+        index = bisect(self._hashes, _hash(str(key)))
+        return self._nodes[index % len(self._nodes)]
+
+
+def load_bot_factory(path: Optional[str]) -> BotFactory:
+    """Імпортує фабрику бота за рядком ``module:function``; типово — ``bot.main.build_bot``."""
+    if not path:
+        from bot.main import build_bot
+
+        return build_bot
+    module_name, _, attribute = path.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class _ChatLane:
+    __slots__ = ('lock', 'pending')
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.pending = 0
+
+
+class _ChatSerializer:
+    """Виконує оновлення одного чату по черзі, а різних чатів — паралельно (до ``limit`` одночасно)."""
+
+    def __init__(self, dp: Dispatcher, bot: Bot, limit: int) -> None:
+        self.dp = dp
+        self.bot = bot
+        self._limit = asyncio.Semaphore(limit)
+        self._lanes: Dict[int, _ChatLane] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def submit(self, update: Dict[str, Any]) -> None:
+        chat_id = update_chat_id(update)
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            lane = self._lanes[chat_id] = _ChatLane()
+        lane.pending += 1
+        task = asyncio.create_task(self._process(chat_id, lane, update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, chat_id: int, lane: _ChatLane, update: Dict[str, Any]) -> None:
+        try:
+            # Завдання стартують у порядку ``submit``, а Lock будить очікувачів FIFO — порядок чату зберігається.
+            async with lane.lock:
+                async with self._limit:
+                    await self.dp.feed_raw_update(self.bot, update)
+        except Exception:
+            logger.exception('Помилка обробки оновлення %s', update.get('update_id'))
+        finally:
+            lane.pending -= 1
+            if not lane.pending:
+                del self._lanes[chat_id]
+
+    async def drain(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+def _read_queue(source: Any, loop: asyncio.AbstractEventLoop, sink: Callable[[List[Any]], None]) -> None:
+    """Потік читання черги: забирає оновлення пачками, щоб не будити цикл подій на кожне."""
+    while True:
+        batch = [source.get()]
+        while batch[-1] is not STOP and len(batch) < READ_BATCH:
+            try:
+                batch.append(source.get_nowait())
+            except queue.Empty:
+                break
+        loop.call_soon_threadsafe(sink, batch)
+        if batch[-1] is STOP:
+            return
+
+
+async def _worker(index: int, settings: Settings, source: Any, ready: Any, bot_factory: Optional[str]) -> None:
+    from bot.main import build_dispatcher
+
+    bot = load_bot_factory(bot_factory)(settings)
+    dp = build_dispatcher(settings)
+    metrics_runner = None
+    if settings.metrics_port:
+        from bot.metrics.server import start_metrics_server
+
+        metrics_runner = await start_metrics_server(
+            settings.metrics_host, settings.metrics_port + index, settings.metrics_path,
+        )
+    serializer = _ChatSerializer(dp, bot, settings.webhook_max_workers)
+    stopped = asyncio.Event()
+
+    def sink(batch: List[Any]) -> None:
+        for update in batch:
+            if update is STOP:
+                stopped.set()
+            else:
+                serializer.submit(update)
+
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+    reader = threading.Thread(
+        target=_read_queue, args=(source, asyncio.get_running_loop(), sink), name=f'shard-{index}-reader', daemon=True,
+    )
+    reader.start()
+    ready.put(index)
+    try:
+        await stopped.wait()
+        await serializer.drain()
+    finally:
+        await dp.emit_shutdown(bot=bot, dispatcher=dp)
+        await bot.session.close()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+
+
+def worker_settings(settings: Settings, workers: int) -> Settings:
+    """Налаштування одного з ``workers`` воркерів: частка загального ліміту відправки й розсилки нагадувань."""
+    if workers <= 1:
+        return settings
+    return replace(
+        settings,
+        send_global_rate=settings.send_global_rate / workers,
+        remind_rate=settings.remind_rate / workers,
+    )
+
+
+def worker_main(index: int, settings: Settings, source: Any, ready: Any, bot_factory: Optional[str] = None) -> None:
+    """Точка входу процесу-воркера."""
+    logging.basicConfig(
+        format=f'%(asctime)s | %(levelname)s | shard-{index} | %(name)s | %(message)s',
+        level=logging.INFO,
+    )
+    try:
+        asyncio.run(_worker(index, settings, source, ready, bot_factory))
+    except KeyboardInterrupt:
+        pass
+
+
+class Supervisor:
+    """Запускає ``workers`` процесів, маршрутизує оновлення і перезапускає воркери, що впали."""
+
+    def __init__(self, settings: Settings, workers: int, bot_factory: Optional[str] = None) -> None:
+        self.settings = worker_settings(settings, workers)
+        self.workers = workers
+        self.bot_factory = bot_factory
+        self.ring = HashRing(workers)
+        self._context = multiprocessing.get_context('spawn')
+        self._queues = [self._context.Queue() for _ in range(workers)]
+        self._ready = self._context.Queue()
+        self._processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * workers
+        self._monitor: Optional[asyncio.Task[None]] = None
+        self._stopping = False
+        self.restarts = 0
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            self._spawn(index)
+        self._monitor = asyncio.create_task(self._watch())
+
+    async def wait_ready(self, timeout: float = 60.0) -> None:
+        """Чекає, доки кожен воркер підготує диспетчер і почне читати свою чергу."""
+        loop = asyncio.get_running_loop()
+        for _ in range(self.workers):
+            await loop.run_in_executor(None, self._ready.get, True, timeout)
+
+    def route(self, update: Dict[str, Any]) -> int:
+        index = self.ring.node_for(update_chat_id(update))
+        self._queues[index].put(update)
+        return index
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Просить воркери дообробити отримане й завершитися; тих, хто не встиг, зупиняє примусово."""
+        self._stopping = True
+        if self._monitor is not None:
+            self._monitor.cancel()
+        for source in self._queues:
+            source.put(STOP)
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning('Воркер %s не завершився за %s с, зупиняємо примусово', process.name, timeout)
+                process.terminate()
+                await loop.run_in_executor(None, process.join)
+        for source in self._queues:
+            source.close()
+        self._ready.close()
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=worker_main,
+            args=(index, self.settings, self._queues[index], self._ready, self.bot_factory),
+            name=f'shard-{index}',
+            daemon=False,
+        )
+        process.start()
+        self._processes[index] = process
+
+    async def _watch(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(RESTART_DELAY)
+            for index, process in enumerate(self._processes):
+                if self._stopping or process is None or process.is_alive():
+                    continue
+                logger.error('Воркер %s завершився з кодом %s, перезапускаємо', process.name, process.exitcode)
+                self.restarts += 1
+                self._spawn(index)
+
+
+async def _poll(bot: Bot, supervisor: Supervisor, allowed_updates: List[str]) -> None:
+    offset: Optional[int] = None
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=allowed_updates)
+        except Exception as exc:
+            logger.error('Не вдалося отримати оновлення - %s: %s', type(exc).__name__, exc)
+            await asyncio.sleep(RESTART_DELAY)
+            continue
+        for update in updates:
+            supervisor.route(update.model_dump(mode='json', by_alias=True, exclude_none=True))
+            offset = update.update_id + 1
+
+
+async def _serve_webhook(bot: Bot, supervisor: Supervisor, settings: Settings, allowed_updates: List[str]) -> None:
+    from aiohttp import web
+
+    async def handle(request: web.Request) -> web.Response:
+        if settings.webhook_secret and request.headers.get('X-Telegram-Bot-Api-Secret-Token') != settings.webhook_secret:
+            return web.Response(status=401, text='Unauthorized')
+        supervisor.route(await request.json())
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(settings.webhook_path, handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=settings.webhook_host, port=settings.webhook_port).start()
+    if settings.webhook_url:
+        await bot.set_webhook(
+            settings.webhook_url.rstrip('/') + settings.webhook_path,
+            secret_token=settings.webhook_secret,
+            allowed_updates=allowed_updates,
+            drop_pending_updates=False,
+        )
+    logger.info('Супервізор приймає webhook на %s:%s%s', settings.webhook_host, settings.webhook_port, settings.webhook_path)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def run_supervisor(bot: Bot, dp: Dispatcher, settings: Settings) -> None:
+    """Приймає оновлення в поточному процесі та розподіляє їх між ``settings.workers`` воркерами."""
+    supervisor = Supervisor(settings, settings.workers)
+    supervisor.start()
+    await supervisor.wait_ready()
+    allowed_updates = dp.resolve_used_update_types()
+    logger.info('Запущено %s воркерів', settings.workers)
+    try:
+        if settings.mode == WEBHOOK_MODE:
+            await _serve_webhook(bot, supervisor, settings, allowed_updates)
+        else:
+            await bot.delete_webhook(drop_pending_updates=False)
+            await _poll(bot, supervisor, allowed_updates)
+    finally:
+        await supervisor.stop()
+        await bot.session.close()
+
+
+__all__ = ['HashRing', 'Supervisor', 'run_supervisor', 'update_chat_id', 'worker_main']
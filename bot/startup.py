@@ -0,0 +1,134 @@
+"""Профілювання холодного старту: вартість імпортів і час до першого оновлення.
+
+Вартість імпортів міряється в окремому інтерпретаторі з ``-X importtime`` — так враховується все,
+що підтягує ``import bot.main``, включно з aiogram. Час до першого оновлення рахується від запуску
+процесу (на Linux — за ``/proc``), тож у нього входить і старт самого інтерпретатора.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+STARTUP_STATEMENT = 'import bot.main'
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+_MODULE_STARTED = time.monotonic()
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split('.', 1)[0]
+
+
+def measure_imports(statement: str = STARTUP_STATEMENT, env: Optional[Dict[str, str]] = None) -> List[ImportRecord]:
+    """Виконує ``statement`` у новому інтерпретаторі з ``-X importtime`` і повертає записи по модулях."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, env=env, check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(f'Не вдалося виконати {statement!r}: {result.stderr.strip().splitlines()[-1:]}')
+    records = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def total_us(records: List[ImportRecord]) -> int:
+    return sum(record.self_us for record in records)
+
+
+def by_package(records: List[ImportRecord]) -> Dict[str, int]:
+    """Власний час імпорту, підсумований за пакетами верхнього рівня, від найдорожчого."""
+    totals: Dict[str, int] = {}
+    for record in records:
+        totals[record.package] = totals.get(record.package, 0) + record.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def format_report(records: List[ImportRecord], top: int = 15) -> str:
+    lines = [f'Імпорт {STARTUP_STATEMENT!r}: {total_us(records) / 1000:.1f} мс, модулів: {len(records)}']
+    lines.append('За пакетами (власний час):')
+    for package, spent in list(by_package(records).items())[:top]:
+        lines.append(f'  {spent / 1000:9.1f} мс  {package}')
+    lines.append('Найдорожчі модулі бота (власний час):')
+    own = sorted((record for record in records if record.package == 'bot'), key=lambda record: -record.self_us)
+    for record in own[:top]:
+        lines.append(f'  {record.self_us / 1000:9.1f} мс  {record.module}')
+    return '\n'.join(lines)
+
+
+def process_uptime() -> float:
+    """Секунди від запуску процесу; без ``/proc`` — від імпорту цього модуля."""
+    try:
+        with open(f'/proc/{os.getpid()}/stat', encoding='ascii') as stat, open('/proc/uptime', encoding='ascii') as uptime:
+            # Поле starttime (22-ге) рахується в тіках від завантаження системи; ім'я процесу може містити пробіли.
+            started_ticks = int(stat.read().rsplit(')', 1)[1].split()[19])
+            system_uptime = float(uptime.read().split()[0])
+        return system_uptime - started_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _MODULE_STARTED
+
+
+class FirstUpdateProbe:
+    """Outer middleware оновлень: один раз логує час від старту процесу до першого оновлення.
+
+    Після цього у фоні міряє вартість імпортів в окремому інтерпретаторі й логує звіт — так профілювання
+    не спотворює сам час до першого оновлення.
+    """
+
+    def __init__(self, report_imports: bool = True) -> None:
+        self.reported: Optional[float] = None
+        self.report_imports = report_imports
+        self._report_task: Optional[asyncio.Task[None]] = None
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any],
+    ) -> Any:
+        if self.reported is None:
+            self.reported = process_uptime()
+            logger.info('Перше оновлення отримано через %.3f с після запуску процесу', self.reported)
+            if self.report_imports:
+                self._report_task = asyncio.create_task(self._report())
+        return await handler(event, data)
+
+    async def _report(self) -> None:
+        try:
+            records = await asyncio.to_thread(measure_imports)
+        except Exception:
+            logger.exception('Не вдалося виміряти імпорти')
+            return
+        logger.info('%s', format_report(records))
+
+
+__all__ = [
+    'FirstUpdateProbe',
+    'ImportRecord',
+    'by_package',
+    'format_report',
+    'measure_imports',
+    'process_uptime',
+    'total_us',
+]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot.config import SQLITE_STORAGE, Settings
+from bot.storage.history import HistoryStore, MemoryHistoryStore, SqliteHistoryStore
+from bot.storage.lifecycle import SessionLifecycle
+from bot.storage.profiles import MemoryProfileStore, ProfileStore, SqliteProfileStore
+from bot.storage.reminders import MemoryReminderStore, ReminderStore, SqliteReminderStore
+
+
+def build_storage(settings: Settings) -> BaseStorage:
+    """Створює FSM-сховище відповідно до налаштувань; покинуті сесії прибирає ``SessionLifecycle``."""
+    storage: BaseStorage
+    if settings.fsm_storage == SQLITE_STORAGE:
+        from bot.storage.sqlite import SqliteStorage
+
+        storage = SqliteStorage(settings.fsm_db_path, flush_interval=settings.fsm_flush_interval)
+    else:
+        storage = MemoryStorage()
+    if not settings.session_idle_ttl and not settings.session_max:
+        return storage
+    return SessionLifecycle(
+        storage,
+        idle_ttl=settings.session_idle_ttl,
+        max_sessions=settings.session_max,
+        notify_expired=settings.session_expired_notice,
+    )
+
+
+def build_profile_store(settings: Settings) -> ProfileStore:
+    """Профілі користувачів живуть у тому самому сховищі, що й FSM-сесії."""
+    if settings.fsm_storage == SQLITE_STORAGE:
+        return SqliteProfileStore(settings.fsm_db_path)
+    return MemoryProfileStore()
+
+
+def build_history_store(settings: Settings) -> HistoryStore:
+    if settings.fsm_storage == SQLITE_STORAGE:
+        return SqliteHistoryStore(settings.fsm_db_path)
+    return MemoryHistoryStore()
+
+
+def build_reminder_store(settings: Settings) -> ReminderStore:
+    if settings.fsm_storage == SQLITE_STORAGE:
+        return SqliteReminderStore(settings.fsm_db_path)
+    return MemoryReminderStore()
+
+
+__all__ = ['build_storage', 'build_profile_store', 'build_history_store', 'build_reminder_store']
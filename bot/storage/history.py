@@ -0,0 +1,299 @@
+"""Історія завершених розрахунків: журнал лише з дописуванням і часові ряди споживання.
+
+Кожен розрахунок записується окремим рядком (payload разом із сумами). Для запитів /history і
+/trend у кожного користувача є ``UsageSeries`` — ряд у масивах ``array('q')`` з цілими значеннями
+(тисячні м³ і копійки), відсортований за періодом. Суми по ряду оновлюються при кожному
+дописуванні, тож відповідь не потребує повторного проходу по всій історії.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+
+from bot.dialogue.constants import THREE_DECIMALS, TWO_DECIMALS
+from bot.dialogue.fixed import KOPECKS, MILLI, Fixed, Number
+from bot.storage import serialization
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from bot.dialogue.calculator import BillAmounts
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS billing_history ('
+    ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+    ' user_id INTEGER NOT NULL,'
+    ' year INTEGER NOT NULL,'
+    ' month INTEGER NOT NULL,'
+    ' cold_usage INTEGER NOT NULL,'
+    ' hot_usage INTEGER NOT NULL,'
+    ' total INTEGER NOT NULL,'
+    ' data TEXT NOT NULL,'
+    ' created_at REAL NOT NULL'
+    ')',
+    'CREATE INDEX IF NOT EXISTS billing_history_user_period ON billing_history (user_id, year, month)',
+    'CREATE INDEX IF NOT EXISTS billing_history_period ON billing_history (year, month)',
+)
+
+# Скільки рядів користувачів SQLite-сховище тримає в пам'яті.
+SERIES_CACHE_SIZE = 4096
+# Межі ``array('q')`` і INTEGER у SQLite.
+_SERIES_MIN = -(2 ** 63)
+_SERIES_MAX = 2 ** 63 - 1
+
+
+def _milli(value: Number) -> int:
+    if type(value) is Fixed:
+        return value.rounded(MILLI, ROUND_HALF_UP)
+    return int((value / THREE_DECIMALS).to_integral_value(ROUND_HALF_UP))
+
+
+def _cents(value: Number) -> int:
+    if type(value) is Fixed:
+        return value.rounded(KOPECKS, ROUND_HALF_UP)
+    return int((value / TWO_DECIMALS).to_integral_value(ROUND_HALF_UP))
+
+
+class HistoryPoint(NamedTuple):
+    month: int
+    year: int
+    cold_usage: Decimal
+    hot_usage: Decimal
+    total: Decimal
+
+    @property
+    def period(self) -> Dict[str, int]:
+        return {'month': self.month, 'year': self.year}
+
+
+class UsageSeries:
+    """Ряд одного користувача: один запис на період, останній розрахунок місяця заміщує попередні."""
+
+    __slots__ = ('periods', 'cold', 'hot', 'total', '_positions', 'sum_cold', 'sum_hot', 'sum_total')
+
+    def __init__(self) -> None:
+        # Період зберігається як ``рік * 12 + місяць - 1``, щоб сусідні місяці йшли підряд.
+        self.periods = array('q')
+        self.cold = array('q')
+        self.hot = array('q')
+        self.total = array('q')
+        self._positions: Dict[int, int] = {}
+        self.sum_cold = 0
+        self.sum_hot = 0
+        self.sum_total = 0
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def put(self, month: int, year: int, cold_milli: int, hot_milli: int, total_cents: int) -> None:
+        key = year * 12 + month - 1
+        position = self._positions.get(key)
+        if position is not None:
+            self.sum_cold -= self.cold[position]
+            self.sum_hot -= self.hot[position]
+            self.sum_total -= self.total[position]
+            self.cold[position] = cold_milli
+            self.hot[position] = hot_milli
+            self.total[position] = total_cents
+        elif not self.periods or key > self.periods[-1]:
+            self._positions[key] = len(self.periods)
+            self.periods.append(key)
+            self.cold.append(cold_milli)
+            self.hot.append(hot_milli)
+            self.total.append(total_cents)
+        else:
+            # Розрахунок за минулий місяць — рідкість, тож зсув хвоста тут допустимий.
+            position = bisect(self.periods, key)
+            for column, value in ((self.periods, key), (self.cold, cold_milli), (self.hot, hot_milli),
+                                  (self.total, total_cents)):
+                column.insert(position, value)
+            for index in range(position, len(self.periods)):
+                self._positions[self.periods[index]] = index
+        self.sum_cold += cold_milli
+        self.sum_hot += hot_milli
+        self.sum_total += total_cents
+
+    def point(self, position: int) -> HistoryPoint:
+        year, month = divmod(self.periods[position], 12)
+        return HistoryPoint(
+            month + 1,
+            year,
+            Decimal(self.cold[position]) * THREE_DECIMALS,
+            Decimal(self.hot[position]) * THREE_DECIMALS,
+            Decimal(self.total[position]) * TWO_DECIMALS,
+        )
+
+    def last(self, count: int) -> List[HistoryPoint]:
+        return [self.point(position) for position in range(max(0, len(self) - count), len(self))]
+
+    def average(self) -> Optional[HistoryPoint]:
+        """Середні витрати й сума по всіх періодах (місяць і рік — останнього періоду)."""
+        if not self.periods:
+            return None
+        count = len(self.periods)
+        last = self.point(count - 1)
+        return HistoryPoint(
+            last.month,
+            last.year,
+            (Decimal(self.sum_cold) * THREE_DECIMALS / count).quantize(THREE_DECIMALS),
+            (Decimal(self.sum_hot) * THREE_DECIMALS / count).quantize(THREE_DECIMALS),
+            (Decimal(self.sum_total) * TWO_DECIMALS / count).quantize(TWO_DECIMALS),
+        )
+
+
+def _series_row(payload: Dict[str, Any], amounts: BillAmounts) -> Optional[Tuple[int, int, int, int, int]]:
+    """Рядок ряду; ``None``, якщо витрати чи сума нескінченні, ``NaN`` або не вміщуються в ``array('q')``."""
+    try:
+        values = (_milli(amounts.cold_usage), _milli(amounts.hot_usage), _cents(amounts.total))
+    except (ArithmeticError, ValueError):
+        return None
+    if not all(_SERIES_MIN <= value <= _SERIES_MAX for value in values):
+        return None
+    period = payload['period']
+    return (period['month'], period['year'], *values)
+
+
+def _record(payload: Dict[str, Any], amounts: BillAmounts) -> Dict[str, Any]:
+    return {
+        'payload': payload,
+        'amounts': {
+            'cold_usage': amounts.cold_usage,
+            'hot_usage': amounts.hot_usage,
+            'cold': amounts.cold,
+            'hot': amounts.hot,
+            'rent': amounts.rent,
+            'heat': amounts.heat,
+            'total': amounts.total,
+        },
+    }
+
+
+class HistoryStore(ABC):
+    """Журнал завершених розрахунків за Telegram user id.
+
+    Розрахунок, який не можна покласти в ряд (``_series_row`` повертає ``None``), не записується зовсім:
+    журнал і ряд мають збігатися, бо SQLite-сховище будує ряд із журналу.
+    """
+
+    @abstractmethod
+    async def append(self, user_id: int, payload: Dict[str, Any], amounts: BillAmounts) -> None:
+        ...
+
+    @abstractmethod
+    async def series(self, user_id: int) -> UsageSeries:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryHistoryStore(HistoryStore):
+    def __init__(self) -> None:
+        self._records: Dict[int, List[Dict[str, Any]]] = {}
+        self._series: Dict[int, UsageSeries] = {}
+
+    async def append(self, user_id: int, payload: Dict[str, Any], amounts: BillAmounts) -> None:
+        row = _series_row(payload, amounts)
+        if row is None:
+            return
+        self._records.setdefault(user_id, []).append(_record(dict(payload), amounts))
+        series = self._series.get(user_id)
+        if series is None:
+            series = self._series[user_id] = UsageSeries()
+        series.put(*row)
+
+    async def series(self, user_id: int) -> UsageSeries:
+        series = self._series.get(user_id)
+        return series if series is not None else UsageSeries()
+
+
+class SqliteHistoryStore(HistoryStore):
+    """Історія в SQLite; ряди користувачів будуються з індексу ``(user_id, year, month)`` і кешуються."""
+
+    def __init__(self, path: str | Path, cache_size: int = SERIES_CACHE_SIZE) -> None:
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history-sqlite')
+        self._connection: Optional[sqlite3.Connection] = None
+        self._cache: OrderedDict[int, UsageSeries] = OrderedDict()
+
+    async def append(self, user_id: int, payload: Dict[str, Any], amounts: BillAmounts) -> None:
+        row = _series_row(payload, amounts)
+        if row is None:
+            return
+        await self._run(self._insert, user_id, row, serialization.dumps(_record(payload, amounts)))
+        # Ряд, завантажений до вставки, доповнюється тут; якщо його ще немає, він прочитає новий рядок сам.
+        series = self._cache.get(user_id)
+        if series is not None:
+            series.put(*row)
+
+    async def series(self, user_id: int) -> UsageSeries:
+        series = self._cache.get(user_id)
+        if series is not None:
+            self._cache.move_to_end(user_id)
+            return series
+        rows = await self._run(self._load, user_id)
+        series = self._cache.get(user_id)
+        if series is None:
+            series = UsageSeries()
+            for row in rows:
+                series.put(*row)
+            self._cache[user_id] = series
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return series
+
+    async def close(self) -> None:
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _insert(self, user_id: int, row: Tuple[int, int, int, int, int], data: str) -> None:
+        month, year, cold_usage, hot_usage, total = row
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                'INSERT INTO billing_history (user_id, year, month, cold_usage, hot_usage, total, data, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (user_id, year, month, cold_usage, hot_usage, total, data, time.time()),
+            )
+
+    def _load(self, user_id: int) -> List[Tuple[int, int, int, int, int]]:
+        return self._connect().execute(
+            'SELECT month, year, cold_usage, hot_usage, total FROM billing_history WHERE user_id = ? ORDER BY id',
+            (user_id,),
+        ).fetchall()
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+__all__ = ['HistoryPoint', 'HistoryStore', 'MemoryHistoryStore', 'SqliteHistoryStore', 'UsageSeries']
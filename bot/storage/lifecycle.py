@@ -0,0 +1,256 @@
+"""Життєвий цикл FSM-сесій: тайм-аут неактивності, загальний ліміт і фонове прибирання.
+
+``SessionLifecycle`` обгортає будь-яке FSM-сховище. Сесія, до якої не зверталися ``idle_ttl`` секунд,
+очищається; якщо живих сесій більше за ``max_sessions``, витісняється та, що найдовше без звернень.
+Прибирання йде по колесу таймерів: за тік перевіряється лише кошик цього тіку, а не всі сесії.
+Звернення до сесії лише оновлює час активності — якщо на момент спрацювання сесія ще жива,
+її переставляють у кошик нового дедлайну.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.types import TelegramObject
+
+from bot import metrics
+
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar('K', bound=Hashable)
+
+WHEEL_SLOTS = 64
+# Скільки прибраних сесій пам'ятати заради повідомлення «сесія скасована»; далі забуваються найстаріші.
+EXPIRED_NOTICE_LIMIT = 50_000
+
+EVICTED_IDLE = 'idle'
+EVICTED_CAPACITY = 'capacity'
+
+
+class TimerWheel(Generic[K]):
+    """Однорівневе хешоване колесо таймерів: ``slots`` кошиків по ``tick`` секунд.
+
+    Дедлайн, далі ніж за оберт колеса, потрапляє в найдальший кошик — власник при спрацюванні
+    перевіряє справжній дедлайн і планує ключ знову.
+    """
+
+    def __init__(self, tick: float, slots: int, now: float) -> None:
+        if tick <= 0 or slots < 1:
+            raise ValueError('Тік колеса має бути додатним, а кошиків — хоча б один')
+        self.tick = tick
+        self._buckets: List[Set[K]] = [set() for _ in range(slots)]
+        self._slot_of: Dict[K, int] = {}
+        # Номер останнього обробленого тіку.
+        self._current = int(now / tick)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def schedule(self, key: K, deadline: float) -> None:
+        self.cancel(key)
+        slots = len(self._buckets)
+        # Кошик поточного тіку вже оброблено, тож найближчий можливий — наступний.
+        target = min(max(math.ceil(deadline / self.tick), self._current + 1), self._current + slots)
+        slot = target % slots
+        self._buckets[slot].add(key)
+        self._slot_of[key] = slot
+
+    def cancel(self, key: K) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            self._buckets[slot].discard(key)
+
+    def advance(self, now: float) -> List[K]:
+        """Прокручує колесо до ``now`` і повертає ключі з пройдених кошиків."""
+        target = int(now / self.tick)
+        slots = len(self._buckets)
+        fired: List[K] = []
+        for tick in range(self._current + 1, self._current + 1 + min(target - self._current, slots)):
+            bucket = self._buckets[tick % slots]
+            if bucket:
+                fired.extend(bucket)
+                for key in bucket:
+                    del self._slot_of[key]
+                bucket.clear()
+        self._current = max(self._current, target)
+        return fired
+
+
+class SessionLifecycle(BaseStorage):
+    """FSM-сховище-обгортка, що прибирає покинуті сесії.
+
+    Живими вважаються сесії зі станом (або з непорожніми даними); ``state.clear()`` знімає сесію з обліку.
+    ``idle_ttl=0`` вимикає тайм-аут, ``max_sessions=0`` — ліміт.
+    """
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        idle_ttl: float = 0.0,
+        max_sessions: int = 0,
+        notify_expired: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.storage = storage
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.notify_expired = notify_expired
+        self._clock = clock
+        # Від найдавнішого звернення до найсвіжішого: перший елемент — кандидат на витіснення.
+        self._last_seen: OrderedDict[StorageKey, float] = OrderedDict()
+        self._wheel: Optional[TimerWheel[StorageKey]] = (
+            TimerWheel(idle_ttl / WHEEL_SLOTS, WHEEL_SLOTS, clock()) if idle_ttl > 0 else None
+        )
+        self._expired: OrderedDict[StorageKey, None] = OrderedDict()
+        # Сесії, підняті зі сховища після перезапуску: ``bot_active_sessions`` їх не рахував.
+        self._restored: Set[StorageKey] = set()
+        self._sweeper: Optional[asyncio.Task[None]] = None
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self.storage.set_state(key, state)
+        if state is None:
+            self._forget(key)
+        else:
+            await self._touch(key)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state = await self.storage.get_state(key)
+        if state is not None:
+            # Сесія могла дістатися з диска після перезапуску — тоді вона стає на облік тут.
+            await self._touch(key, restored=True)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        await self.storage.set_data(key, data)
+        if data:
+            await self._touch(key)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        data = await self.storage.get_data(key)
+        if key in self._last_seen:
+            await self._touch(key)
+        return data
+
+    def consume_expired(self, key: StorageKey) -> bool:
+        """Чи прибрано сесію ``key`` з моменту останнього звернення; відповідає ``True`` лише раз."""
+        if not self._expired:
+            return False
+        return self._expired.pop(key, False) is None
+
+    async def sweep(self) -> int:
+        """Один тік прибирання; повертає кількість прибраних сесій."""
+        if self._wheel is None:
+            return 0
+        now = self._clock()
+        evicted = 0
+        for key in self._wheel.advance(now):
+            last_seen = self._last_seen.get(key)
+            if last_seen is None:
+                continue
+            deadline = last_seen + self.idle_ttl
+            if deadline > now:
+                self._wheel.schedule(key, deadline)
+                continue
+            await self._evict(key, EVICTED_IDLE)
+            evicted += 1
+        return evicted
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        await self.storage.close()
+
+    async def _touch(self, key: StorageKey, restored: bool = False) -> None:
+        now = self._clock()
+        last_seen = self._last_seen
+        if key in last_seen:
+            last_seen[key] = now
+            last_seen.move_to_end(key)
+            return
+        last_seen[key] = now
+        if restored:
+            self._restored.add(key)
+        if self._expired:
+            self._expired.pop(key, None)
+        if self._wheel is not None:
+            self._wheel.schedule(key, now + self.idle_ttl)
+            if self._sweeper is None or self._sweeper.done():
+                self._sweeper = asyncio.create_task(self._sweep_forever())
+        if self.max_sessions and len(last_seen) > self.max_sessions:
+            await self._evict(next(iter(last_seen)), EVICTED_CAPACITY)
+        metrics.LIVE_SESSIONS.set(len(last_seen))
+
+    def _forget(self, key: StorageKey) -> None:
+        if self._last_seen.pop(key, None) is None:
+            return
+        self._restored.discard(key)
+        if self._wheel is not None:
+            self._wheel.cancel(key)
+        metrics.LIVE_SESSIONS.set(len(self._last_seen))
+
+    async def _evict(self, key: StorageKey, reason: str) -> None:
+        counted = key not in self._restored
+        self._forget(key)
+        await self.storage.set_state(key, None)
+        await self.storage.set_data(key, {})
+        metrics.SESSION_EVICTIONS.inc(reason)
+        if counted:
+            metrics.ACTIVE_SESSIONS.dec()
+        if self.notify_expired:
+            self._expired[key] = None
+            if len(self._expired) > EXPIRED_NOTICE_LIMIT:
+                self._expired.popitem(last=False)
+
+    async def _sweep_forever(self) -> None:
+        assert self._wheel is not None
+        while True:
+            await asyncio.sleep(self._wheel.tick)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception('Не вдалося прибрати неактивні FSM-сесії')
+
+
+class SessionExpiryMiddleware(BaseMiddleware):
+    """Зовнішня middleware повідомлень: кладе в дані обробника ``session_expired``.
+
+    ``True`` означає, що незавершений діалог цього чату було прибрано за неактивністю чи лімітом,
+    і користувач повернувся вперше після цього.
+    """
+
+    def __init__(self, lifecycle: SessionLifecycle) -> None:
+        self.lifecycle = lifecycle
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        state = data.get('state')
+        data['session_expired'] = state is not None and self.lifecycle.consume_expired(state.key)
+        return await handler(event, data)
+
+
+__all__ = [
+    'EVICTED_CAPACITY',
+    'EVICTED_IDLE',
+    'SessionExpiryMiddleware',
+    'SessionLifecycle',
+    'TimerWheel',
+]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from bot.storage import serialization
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS user_profiles ('
+    ' user_id INTEGER PRIMARY KEY,'
+    ' data TEXT NOT NULL,'
+    ' updated_at REAL NOT NULL'
+    ')'
+)
+
+
+class ProfileStore(ABC):
+    """Дані останнього завершеного розрахунку користувача, за Telegram user id."""
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def save(self, user_id: int, payload: Dict[str, Any]) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryProfileStore(ProfileStore):
+    def __init__(self) -> None:
+        self._profiles: Dict[int, Dict[str, Any]] = {}
+
+    async def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        profile = self._profiles.get(user_id)
+        return dict(profile) if profile is not None else None
+
+    async def save(self, user_id: int, payload: Dict[str, Any]) -> None:
+        self._profiles[user_id] = dict(payload)
+
+
+class SqliteProfileStore(ProfileStore):
+    """Профілі у SQLite: ``user_id`` — первинний ключ (rowid), тож пошук іде по індексу."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='profiles-sqlite')
+        self._connection: Optional[sqlite3.Connection] = None
+
+    async def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return await self._run(self._load, user_id)
+
+    async def save(self, user_id: int, payload: Dict[str, Any]) -> None:
+        await self._run(self._store, user_id, serialization.dumps(payload))
+
+    async def close(self) -> None:
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            # sqlite3 потрібен лише з FSM_STORAGE=sqlite, тож імпортується при першому з'єднанні.
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(_SCHEMA)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _load(self, user_id: int) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute('SELECT data FROM user_profiles WHERE user_id = ?', (user_id,)).fetchone()
+        return serialization.loads(row[0]) if row else None
+
+    def _store(self, user_id: int, data: str) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                'INSERT INTO user_profiles (user_id, data, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at',
+                (user_id, data, time.time()),
+            )
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+__all__ = ['ProfileStore', 'MemoryProfileStore', 'SqliteProfileStore']
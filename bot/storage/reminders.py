@@ -0,0 +1,253 @@
+"""Підписки на щомісячне нагадування і їхній індекс за часом наступного нагадування.
+
+Сховище знає лише «кому і коли»: час наступного нагадування рахує ``bot.reminders``. ``claim``
+забирає пачку записів, чий час настав, і до ``reschedule`` вони не видаються повторно. Час
+нагадування зсувається вперед лише після відправки, тож нагадування, які не встигли піти до
+зупинки бота, підхоплюються після перезапуску. У SQLite забраний запис отримує оренду
+(``lease_until``): якщо процес упав посеред пачки, після її закінчення запис знову стає доступним,
+а кілька процесів зі спільною базою не розсилають те саме нагадування двічі.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS reminders ('
+    ' user_id INTEGER PRIMARY KEY,'
+    ' chat_id INTEGER NOT NULL,'
+    ' day INTEGER NOT NULL,'
+    ' due_at REAL NOT NULL,'
+    ' lease_until REAL NOT NULL DEFAULT 0'
+    ')',
+    'CREATE INDEX IF NOT EXISTS reminders_due ON reminders (due_at)',
+)
+
+
+class Reminder(NamedTuple):
+    user_id: int
+    chat_id: int
+    day: int
+    due_at: float
+
+
+class ReminderStore(ABC):
+    """Підписки за Telegram user id, упорядковані за часом наступного нагадування."""
+
+    @abstractmethod
+    async def subscribe(self, user_id: int, chat_id: int, day: int, due_at: float) -> None:
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, user_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Optional[Reminder]:
+        ...
+
+    @abstractmethod
+    async def claim(self, now: float, limit: int, lease: float) -> List[Reminder]:
+        """До ``limit`` записів із ``due_at <= now`` у порядку часу; до ``reschedule`` вони не видаються."""
+
+    @abstractmethod
+    async def reschedule(self, reminder: Reminder, due_at: float) -> None:
+        """Новий час для забраного запису; якщо підписку тим часом змінили, нічого не робить."""
+
+    @abstractmethod
+    async def next_due(self, now: float) -> Optional[float]:
+        """Найближчий час нагадування серед незабраних записів."""
+
+    @abstractmethod
+    async def count(self) -> int:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryReminderStore(ReminderStore):
+    """Купа ``(due_at, user_id)`` з лінивим видаленням: застарілі елементи відкидаються при виборці.
+
+    На запис — кортеж у словнику й елемент купи; купа перебудовується, щойно застарілих елементів
+    стає більше, ніж живих, тож пам'ять на запис не росте від зміни підписок.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, Tuple[int, int, float]] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._claimed: Set[int] = set()
+
+    async def subscribe(self, user_id: int, chat_id: int, day: int, due_at: float) -> None:
+        previous = self._entries.get(user_id)
+        self._entries[user_id] = (chat_id, day, due_at)
+        if previous is None or previous[2] != due_at or user_id in self._claimed:
+            self._claimed.discard(user_id)
+            self._push(due_at, user_id)
+
+    async def unsubscribe(self, user_id: int) -> bool:
+        self._claimed.discard(user_id)
+        return self._entries.pop(user_id, None) is not None
+
+    async def get(self, user_id: int) -> Optional[Reminder]:
+        entry = self._entries.get(user_id)
+        return Reminder(user_id, *entry) if entry is not None else None
+
+    async def claim(self, now: float, limit: int, lease: float) -> List[Reminder]:
+        claimed: List[Reminder] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now and len(claimed) < limit:
+            due_at, user_id = heapq.heappop(heap)
+            entry = self._entries.get(user_id)
+            if entry is None or entry[2] != due_at or user_id in self._claimed:
+                continue
+            self._claimed.add(user_id)
+            claimed.append(Reminder(user_id, *entry))
+        return claimed
+
+    async def reschedule(self, reminder: Reminder, due_at: float) -> None:
+        entry = self._entries.get(reminder.user_id)
+        if entry is None or entry[2] != reminder.due_at or reminder.user_id not in self._claimed:
+            return
+        self._claimed.discard(reminder.user_id)
+        self._entries[reminder.user_id] = (entry[0], entry[1], due_at)
+        self._push(due_at, reminder.user_id)
+
+    async def next_due(self, now: float) -> Optional[float]:
+        heap = self._heap
+        while heap:
+            due_at, user_id = heap[0]
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[2] == due_at and user_id not in self._claimed:
+                return due_at
+            heapq.heappop(heap)
+        return None
+
+    async def count(self) -> int:
+        return len(self._entries)
+
+    def _push(self, due_at: float, user_id: int) -> None:
+        heapq.heappush(self._heap, (due_at, user_id))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [
+                (entry[2], key) for key, entry in self._entries.items() if key not in self._claimed
+            ]
+            heapq.heapify(self._heap)
+
+
+class SqliteReminderStore(ReminderStore):
+    """Підписки в SQLite; індекс ``due_at`` відповідає і на «хто наступний», і на вибірку пачки."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reminders-sqlite')
+        self._connection: Optional[sqlite3.Connection] = None
+
+    async def subscribe(self, user_id: int, chat_id: int, day: int, due_at: float) -> None:
+        await self._run(self._upsert, user_id, chat_id, day, due_at)
+
+    async def unsubscribe(self, user_id: int) -> bool:
+        return await self._run(self._delete, user_id)
+
+    async def get(self, user_id: int) -> Optional[Reminder]:
+        row = await self._run(self._select, user_id)
+        return Reminder(*row) if row is not None else None
+
+    async def claim(self, now: float, limit: int, lease: float) -> List[Reminder]:
+        rows = await self._run(self._claim, now, limit, lease)
+        return sorted((Reminder(*row) for row in rows), key=lambda reminder: reminder.due_at)
+
+    async def reschedule(self, reminder: Reminder, due_at: float) -> None:
+        await self._run(self._reschedule, reminder.user_id, reminder.due_at, due_at)
+
+    async def next_due(self, now: float) -> Optional[float]:
+        return await self._run(self._next_due, now)
+
+    async def count(self) -> int:
+        return await self._run(self._count)
+
+    async def close(self) -> None:
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _upsert(self, user_id: int, chat_id: int, day: int, due_at: float) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                'INSERT INTO reminders (user_id, chat_id, day, due_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (user_id) DO UPDATE SET '
+                'chat_id = excluded.chat_id, day = excluded.day, due_at = excluded.due_at, lease_until = 0',
+                (user_id, chat_id, day, due_at),
+            )
+
+    def _delete(self, user_id: int) -> bool:
+        connection = self._connect()
+        with connection:
+            return connection.execute('DELETE FROM reminders WHERE user_id = ?', (user_id,)).rowcount > 0
+
+    def _select(self, user_id: int) -> Optional[Tuple[int, int, int, float]]:
+        return self._connect().execute(
+            'SELECT user_id, chat_id, day, due_at FROM reminders WHERE user_id = ?', (user_id,),
+        ).fetchone()
+
+    def _claim(self, now: float, limit: int, lease: float) -> List[Tuple[int, int, int, float]]:
+        connection = self._connect()
+        # Вибірка й оренда — одним оператором: інший процес із тією самою базою ці рядки вже не забере.
+        with connection:
+            return connection.execute(
+                'UPDATE reminders SET lease_until = ? WHERE user_id IN ('
+                ' SELECT user_id FROM reminders WHERE due_at <= ? AND lease_until <= ? ORDER BY due_at LIMIT ?'
+                ') RETURNING user_id, chat_id, day, due_at',
+                (now + lease, now, now, limit),
+            ).fetchall()
+
+    def _reschedule(self, user_id: int, claimed_due_at: float, due_at: float) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                'UPDATE reminders SET due_at = ?, lease_until = 0 WHERE user_id = ? AND due_at = ?',
+                (due_at, user_id, claimed_due_at),
+            )
+
+    def _next_due(self, now: float) -> Optional[float]:
+        row = self._connect().execute(
+            'SELECT due_at FROM reminders WHERE lease_until <= ? ORDER BY due_at LIMIT 1', (now,),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _count(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM reminders').fetchone()[0]
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+__all__ = ['MemoryReminderStore', 'Reminder', 'ReminderStore', 'SqliteReminderStore']
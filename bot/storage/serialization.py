@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import base64
+import json
+from decimal import Decimal
+from typing import Any, Dict
+
+from bot.dialogue.fixed import Fixed, parse_number
+
+
+_DECIMAL_TAG = '$d'
+_BYTES_TAG = '$b'
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (Decimal, Fixed)):
+        return {_DECIMAL_TAG: str(value)}
+    if isinstance(value, bytes):
+        # Закодовані сесії (``session_codec``) зберігаються як base64-рядок.
+        return {_BYTES_TAG: base64.b64encode(value).decode('ascii')}
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and _DECIMAL_TAG in obj:
+        return parse_number(obj[_DECIMAL_TAG])
+    if len(obj) == 1 and _BYTES_TAG in obj:
+        return base64.b64decode(obj[_BYTES_TAG])
+    return obj
+
+
+def dumps(data: Any) -> str:
+    """Серіалізує дані сесії у JSON: ``Decimal`` і ``Fixed`` — без втрати точності, ``bytes`` — у base64."""
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(raw: str) -> Any:
+    return json.loads(raw, object_hook=_object_hook)
+
+
+__all__ = ['dumps', 'loads']
@@ -0,0 +1,259 @@
+"""Компактний двійковий формат ``DialogueState`` для FSM-сховища.
+
+Формат (усі цілі — беззнакові varint, LEB128):
+
+* версія формату (один байт) і чотирибайтний відбиток кроків каталогу послуг (``ServiceCatalog.fingerprint``);
+* крок діалогу, маска заповнених слотів, маска слотів із профілю, прапорці;
+* значення заповнених слотів у порядку ``STEP_ORDER``:
+  текст — довжина й UTF-8; період — місяць і рік;
+  число — заголовок ``zigzag(експонента) << 2 | знак << 1 | спеціальне`` і ціла мантиса, тобто
+  ``Decimal`` зберігається масштабованим цілим без втрати запису (``8.0`` лишається ``8.0``);
+  ``Fixed`` — той самий заголовок з експонентою ``-3`` і модулем одиниць як мантисою, а прочитане
+  значення, що вміщується в тисячні, знову стає ``Fixed``;
+  ``Infinity``/``NaN`` пишуться текстом;
+* назва набору тарифів, якщо встановлено прапорець.
+
+У FSM-даних сесія лежить під ключем ``SESSION_KEY``; старий формат (словник ``payload``) читається,
+тож незавершені діалоги переживають оновлення. Слоти прив'язані до ``STEP_ORDER``, тож сесію, записану з
+іншим набором послуг, ``load_session`` не читає, а починає діалог заново — так само, як пошкоджену чи
+записану невідомою версією формату. Версія 1 була без відбитка й
+читається, лише якщо кроки збігаються з тодішніми чотирма послугами.
+"""
+from __future__ import annotations
+
+import logging
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal
+from typing import Any, Dict, List, Tuple
+
+from bot.dialogue import constants
+from bot.dialogue.fixed import MILLI, Fixed, Number
+from bot.dialogue.flow import STEP_COUNT, DialogueState
+from bot.dialogue.services import NUMBER, PERIOD, TEXT, step_fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = 'session'
+VERSION = 2
+FINGERPRINT = constants.CATALOG.fingerprint
+_HEADER = bytes((VERSION,)) + FINGERPRINT
+
+# Кроки версії 1: вона писалася лише з чотирма базовими послугами.
+_LEGACY_VERSION = 1
+_LEGACY_FINGERPRINT = step_fingerprint((
+    ('full_name', TEXT), ('period', PERIOD), ('address', TEXT),
+    ('hot_prev', NUMBER), ('hot_curr', NUMBER), ('cold_prev', NUMBER), ('cold_curr', NUMBER),
+    ('cold_tariff', NUMBER), ('hot_tariff', NUMBER), ('rent_tariff', NUMBER), ('heat_tariff', NUMBER),
+    ('apartment_area', NUMBER),
+))
+
+_FLAG_TARIFF_PRESET = 1
+# Контекст без округлення: ``scaleb`` у ньому лише зсуває експоненту, не чіпаючи цифр.
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+# zigzag(-MILLI) << 2: заголовок невід'ємного ``Fixed``.
+_FIXED_HEADER = (2 * MILLI - 1) << 2
+
+_TEXT, _PERIOD, _DECIMAL = 0, 1, 2
+_KINDS: List[int] = []
+for _step in constants.STEP_ORDER:
+    if _step in constants.TEXT_STEPS:
+        _KINDS.append(_TEXT)
+    elif _step == constants.PERIOD_STEP:
+        _KINDS.append(_PERIOD)
+    else:
+        _KINDS.append(_DECIMAL)
+
+
+class CodecError(ValueError):
+    """Дані сесії пошкоджені або записані невідомою версією формату."""
+
+
+class CatalogMismatch(CodecError):
+    """Сесію записано з іншим набором кроків діалогу."""
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(raw: bytes, offset: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        try:
+            byte = raw[offset]
+        except IndexError:
+            raise CodecError('Обірване число у даних сесії') from None
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def _write_text(out: bytearray, value: str) -> None:
+    data = value.encode('utf-8')
+    _write_varint(out, len(data))
+    out += data
+
+
+def _read_text(raw: bytes, offset: int) -> Tuple[str, int]:
+    length, offset = _read_varint(raw, offset)
+    end = offset + length
+    if end > len(raw):
+        raise CodecError('Обірваний текст у даних сесії')
+    return raw[offset:end].decode('utf-8'), end
+
+
+def _write_decimal(out: bytearray, value: Decimal) -> None:
+    sign, digits, exponent = value.as_tuple()
+    if not value.is_finite():
+        _write_varint(out, sign << 1 | 1)
+        _write_text(out, str(value))
+        return
+    zigzag = exponent << 1 if exponent >= 0 else (-exponent << 1) - 1
+    header = zigzag << 2 | sign << 1
+    coefficient = 0
+    for digit in digits:
+        coefficient = coefficient * 10 + digit
+    _write_varint(out, header)
+    _write_varint(out, coefficient)
+
+
+def _write_fixed(out: bytearray, value: Fixed) -> None:
+    if value.places != MILLI:
+        _write_decimal(out, value.to_decimal())
+        return
+    units = value.units
+    _write_varint(out, _FIXED_HEADER | 2 if units < 0 else _FIXED_HEADER)
+    _write_varint(out, -units if units < 0 else units)
+
+
+def _read_decimal(raw: bytes, offset: int) -> Tuple[Number, int]:
+    header, offset = _read_varint(raw, offset)
+    if header & 1:
+        text, offset = _read_text(raw, offset)
+        return Decimal(text), offset
+    coefficient, offset = _read_varint(raw, offset)
+    zigzag = header >> 2
+    exponent = zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+    fixed = Fixed.from_parts(bool(header & 2), coefficient, exponent)
+    if fixed is not None:
+        return fixed, offset
+    value = Decimal(coefficient).scaleb(exponent, _EXACT)
+    return (value.copy_negate() if header & 2 else value), offset
+
+
+def encode(state: DialogueState) -> bytes:
+    out = bytearray(_HEADER)
+    filled = 0
+    for index, value in enumerate(state.values):
+        if value is not None:
+            filled |= 1 << index
+    flags = _FLAG_TARIFF_PRESET if state.tariff_preset is not None else 0
+    _write_varint(out, state.step_index)
+    _write_varint(out, filled)
+    _write_varint(out, state.prefilled_mask)
+    _write_varint(out, flags)
+    for kind, value in zip(_KINDS, state.values):
+        if value is None:
+            continue
+        if kind == _DECIMAL:
+            if type(value) is Fixed:
+                _write_fixed(out, value)
+            else:
+                _write_decimal(out, value if isinstance(value, Decimal) else Decimal(str(value)))
+        elif kind == _TEXT:
+            _write_text(out, str(value))
+        else:
+            _write_varint(out, int(value['month']))
+            _write_varint(out, int(value['year']))
+    if flags & _FLAG_TARIFF_PRESET:
+        _write_text(out, state.tariff_preset)
+    return bytes(out)
+
+
+def decode(raw: bytes) -> DialogueState:
+    """Читає стан; будь-які пошкоджені дані дають ``CodecError``."""
+    try:
+        return _decode(raw)
+    except CodecError:
+        raise
+    except (ArithmeticError, IndexError, TypeError, UnicodeDecodeError, ValueError) as exc:
+        raise CodecError(f'Пошкоджені дані сесії: {exc!r}') from exc
+
+
+def _decode(raw: bytes) -> DialogueState:
+    if raw[:1] == bytes((_LEGACY_VERSION,)):
+        if FINGERPRINT != _LEGACY_FINGERPRINT:
+            raise CatalogMismatch('Сесію версії 1 записано з базовим набором послуг')
+        offset = 1
+    elif raw[:1] == bytes((VERSION,)):
+        if raw[1:len(_HEADER)] != FINGERPRINT:
+            raise CatalogMismatch(f'Сесію записано з іншим набором кроків: {raw[1:len(_HEADER)].hex()}')
+        offset = len(_HEADER)
+    else:
+        raise CodecError(f'Невідома версія формату сесії: {raw[:1]!r}')
+    step_index, offset = _read_varint(raw, offset)
+    filled, offset = _read_varint(raw, offset)
+    prefilled, offset = _read_varint(raw, offset)
+    flags, offset = _read_varint(raw, offset)
+    if step_index >= STEP_COUNT or filled >> STEP_COUNT:
+        raise CodecError('Крок або маска слотів поза межами діалогу')
+    state = DialogueState(step_index)
+    state.prefilled_mask = prefilled
+    values = state.values
+    for index, kind in enumerate(_KINDS):
+        if not filled >> index & 1:
+            continue
+        if kind == _DECIMAL:
+            values[index], offset = _read_decimal(raw, offset)
+        elif kind == _TEXT:
+            values[index], offset = _read_text(raw, offset)
+        else:
+            month, offset = _read_varint(raw, offset)
+            year, offset = _read_varint(raw, offset)
+            values[index] = {'month': month, 'year': year}
+    if flags & _FLAG_TARIFF_PRESET:
+        state.tariff_preset, offset = _read_text(raw, offset)
+    if offset != len(raw):
+        raise CodecError('Зайві байти в кінці даних сесії')
+    return state
+
+
+def dump_session(state: DialogueState) -> Dict[str, Any]:
+    """FSM-дані для збереження: лише закодований стан."""
+    return {SESSION_KEY: encode(state)}
+
+
+def load_session(data: Dict[str, Any]) -> DialogueState:
+    """Відновлює стан із FSM-даних; розуміє і старий формат зі словником ``payload``."""
+    raw = data.get(SESSION_KEY)
+    if raw is not None:
+        try:
+            return decode(raw)
+        except CodecError as exc:
+            # Інакше кожне оновлення чату падало б на тій самій сесії, доки її не приберуть за неактивністю.
+            logger.warning('Незавершену сесію не прочитано (%s), діалог починається заново', exc)
+            return DialogueState()
+    return DialogueState(
+        step_index=int(data.get('step_index', 0)),
+        payload=dict(data.get('payload') or {}),
+        prefilled=list(data.get('prefilled') or ()),
+    )
+
+
+__all__ = [
+    'FINGERPRINT',
+    'SESSION_KEY',
+    'VERSION',
+    'CatalogMismatch',
+    'CodecError',
+    'decode',
+    'dump_session',
+    'encode',
+    'load_session',
+]
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from bot.storage import serialization
+
+
+logger = logging.getLogger(__name__)
+
+# Пауза перед повтором пачки, яку не вдалося записати.
+RETRY_INTERVAL = 1.0
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS fsm_sessions ('
+    ' key TEXT PRIMARY KEY,'
+    ' state TEXT,'
+    ' data TEXT NOT NULL'
+    ')'
+)
+
+
+@dataclass
+class _Record:
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+def _storage_key(key: StorageKey) -> str:
+    thread_id = '' if key.thread_id is None else str(key.thread_id)
+    return f'{key.bot_id}:{key.chat_id}:{key.user_id}:{thread_id}:{key.destiny}'
+
+
+class SqliteStorage(BaseStorage):
+    """FSM-сховище на SQLite (WAL) з кешем у пам'яті та пакетним записом змін.
+
+    Зміни потрапляють у кеш одразу, а на диск записуються раз на ``flush_interval``
+    секунд однією транзакцією; кілька записів одного чату за вікно зливаються в один.
+    Якщо запис не вдався (база зайнята, диск заповнений), пачка повертається до незаписаних
+    і повторюється через ``RETRY_INTERVAL`` секунд; до того її сесії не витісняються з кешу.
+    """
+
+    def __init__(self, path: str | Path, flush_interval: float = 0.05, cache_size: int = 10_000) -> None:
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, _Record] = OrderedDict()
+        self._dirty: Dict[str, _Record] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fsm-sqlite')
+        self._connection: Optional[sqlite3.Connection] = None
+        self._flush_task: Optional[asyncio.Task[None]] = None
+        self._flush_lock = asyncio.Lock()
+        self._closed = False
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._record(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(_storage_key(key), record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = await self._record(key)
+        return record.state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = await self._record(key)
+        record.data = data.copy()
+        self._mark_dirty(_storage_key(key), record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = await self._record(key)
+        return record.data.copy()
+
+    async def flush(self) -> None:
+        """Негайно записує всі накопичені зміни на диск."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            pending, self._dirty = self._dirty, {}
+            upserts: List[Tuple[str, Optional[str], str]] = []
+            deletes: List[Tuple[str]] = []
+            for storage_key, record in pending.items():
+                if record.empty:
+                    deletes.append((storage_key,))
+                else:
+                    upserts.append((storage_key, record.state, serialization.dumps(record.data)))
+            try:
+                await self._run(self._write_batch, upserts, deletes)
+            except BaseException:
+                # Новіші зміни тих самих сесій, внесені під час запису, лишаються поверх пачки.
+                for storage_key, record in pending.items():
+                    self._dirty.setdefault(storage_key, record)
+                raise
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=True)
+
+    async def _record(self, key: StorageKey) -> _Record:
+        storage_key = _storage_key(key)
+        record = self._cache.get(storage_key)
+        if record is not None:
+            self._cache.move_to_end(storage_key)
+            return record
+        loaded = await self._run(self._load, storage_key)
+        record = self._cache.setdefault(storage_key, loaded)
+        self._evict()
+        return record
+
+    def _mark_dirty(self, storage_key: str, record: _Record) -> None:
+        self._dirty[storage_key] = record
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self, delay: Optional[float] = None) -> None:
+        await asyncio.sleep(self.flush_interval if delay is None else delay)
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception('Не вдалося записати FSM-сесії у %s, повтор через %s с', self.path, RETRY_INTERVAL)
+            if not self._closed:
+                self._flush_task = asyncio.create_task(self._flush_later(RETRY_INTERVAL))
+        self._evict()
+
+    def _evict(self) -> None:
+        excess = len(self._cache) - self.cache_size
+        if excess <= 0:
+            return
+        for storage_key in list(self._cache):
+            if excess <= 0:
+                break
+            if storage_key in self._dirty:
+                continue
+            del self._cache[storage_key]
+            excess -= 1
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(_SCHEMA)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _load(self, storage_key: str) -> _Record:
+        row = self._connect().execute(
+            'SELECT state, data FROM fsm_sessions WHERE key = ?', (storage_key,)
+        ).fetchone()
+        if row is None:
+            return _Record()
+        return _Record(state=row[0], data=serialization.loads(row[1]))
+
+    def _write_batch(self, upserts: List[Tuple[str, Optional[str], str]], deletes: List[Tuple[str]]) -> None:
+        connection = self._connect()
+        with connection:
+            if upserts:
+                connection.executemany(
+                    'INSERT INTO fsm_sessions (key, state, data) VALUES (?, ?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET state = excluded.state, data = excluded.data',
+                    upserts,
+                )
+            if deletes:
+                connection.executemany('DELETE FROM fsm_sessions WHERE key = ?', deletes)
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+__all__ = ['SqliteStorage']
@@ -0,0 +1,237 @@
+"""Спільний довідник тарифів: готові набори за постачальником/містом і періодом дії.
+
+Довідник читається з JSON-файлу (приклад — ``tariffs.example.json``). Для кожного постачальника
+записи впорядковуються за датою початку дії; запис діє до початку наступного або до ``to``.
+Під час завантаження будується індекс ``(постачальник, рік, місяць) -> набір``, тож пошук — один
+запит до словника. Файл перечитується у фоновому потоці, коли змінюється його mtime, а нова
+таблиця підміняє стару одним присвоєнням — обробники завжди бачать цілісну версію.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from decimal import InvalidOperation
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.dialogue import constants
+from bot.dialogue.fixed import Number, parse_number
+
+
+logger = logging.getLogger(__name__)
+
+TARIFF_KEYS = tuple(constants.STEP_PAYLOAD_KEYS[step] for step in constants.TARIFF_STEPS)
+
+PeriodKey = Tuple[int, int]
+
+# Скільки періодів запам'ятовує ``presets_for``; період вводить користувач, тож кеш обмежений.
+PERIOD_CACHE_SIZE = 256
+# Найдовша дія запису з кінцем: індекс заповнюється помісячно, тож далекий ``to`` роздув би його.
+MAX_SPAN_MONTHS = 100 * 12
+
+
+@dataclass(frozen=True)
+class TariffPreset:
+    provider: str
+    title: str
+    valid_from: PeriodKey
+    values: Dict[str, Number] = field(hash=False)
+
+    @property
+    def fingerprint(self) -> str:
+        """Короткий відбиток набору: кнопка панелі з ним не застосує інший набір після перечитування довідника."""
+        parts = [self.provider, '%d-%d' % self.valid_from]
+        parts.extend(f'{key}={self.values[key]}' for key in sorted(self.values))
+        return hashlib.blake2b('|'.join(parts).encode(), digest_size=4).hexdigest()
+
+
+def _period_key(raw: str, where: str) -> PeriodKey:
+    match = constants.PERIOD_PATTERN.fullmatch(str(raw).strip())
+    if not match:
+        raise ValueError(f'{where}: період {raw!r} має бути у форматі MM-YYYY')
+    return int(match.group(2)), int(match.group(1))
+
+
+def _months(key: PeriodKey) -> int:
+    return key[0] * 12 + key[1] - 1
+
+
+def _next_month(key: PeriodKey) -> PeriodKey:
+    year, month = key
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _decimal(raw: Any, where: str) -> Number:
+    try:
+        return parse_number(str(raw).strip().replace(',', '.'))
+    except InvalidOperation as exc:
+        raise ValueError(f'{where}: {raw!r} не є числом') from exc
+
+
+class TariffTable:
+    """Незмінна версія довідника з індексом за ``(постачальник, рік, місяць)``."""
+
+    def __init__(self, providers: List[Dict[str, Any]] | None = None) -> None:
+        self._index: Dict[Tuple[str, int, int], TariffPreset] = {}
+        # Останній запис постачальника діє безстроково; такі записи перевіряються окремо.
+        self._open_ended: Dict[str, TariffPreset] = {}
+        self._titles: Dict[str, str] = {}
+        self._by_period: Dict[PeriodKey, List[TariffPreset]] = {}
+        for provider in providers or ():
+            self._add_provider(provider)
+
+    @classmethod
+    def from_json(cls, raw: str) -> 'TariffTable':
+        data = json.loads(raw)
+        providers = data.get('providers') if isinstance(data, dict) else None
+        if not isinstance(providers, list):
+            raise ValueError('У файлі тарифів очікується об\'єкт з ключем "providers" (список)')
+        return cls(providers)
+
+    @property
+    def providers(self) -> Dict[str, str]:
+        return dict(self._titles)
+
+    def lookup(self, provider: str, month: int, year: int) -> Optional[TariffPreset]:
+        preset = self._index.get((provider, year, month))
+        if preset is not None:
+            return preset
+        preset = self._open_ended.get(provider)
+        if preset is not None and (year, month) >= preset.valid_from:
+            return preset
+        return None
+
+    def presets_for(self, month: int, year: int) -> List[TariffPreset]:
+        """Набори, що діють у періоді, — по одному на постачальника, у порядку файлу."""
+        key = (year, month)
+        presets = self._by_period.get(key)
+        if presets is None:
+            presets = [
+                preset for preset in (self.lookup(provider, month, year) for provider in self._titles)
+                if preset is not None
+            ]
+            if len(self._by_period) < PERIOD_CACHE_SIZE:
+                self._by_period[key] = presets
+        return presets
+
+    def find(self, title: str, month: int, year: int) -> Optional[TariffPreset]:
+        for preset in self.presets_for(month, year):
+            if preset.title == title:
+                return preset
+        return None
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def _add_provider(self, provider: Dict[str, Any]) -> None:
+        provider_id = str(provider.get('id') or '').strip()
+        if not provider_id:
+            raise ValueError('У кожного постачальника має бути непорожній "id"')
+        if provider_id in self._titles:
+            raise ValueError(f'Постачальник {provider_id!r} описаний двічі')
+        title = str(provider.get('title') or provider_id).strip()
+        self._titles[provider_id] = title
+
+        entries = []
+        for position, entry in enumerate(provider.get('tariffs') or ()):
+            where = f'{provider_id}[{position}]'
+            valid_from = _period_key(entry.get('from', ''), where)
+            valid_to = _period_key(entry['to'], where) if entry.get('to') else None
+            if valid_to is not None and valid_to < valid_from:
+                raise ValueError(f'{where}: кінець дії {entry["to"]!r} раніше за початок {entry["from"]!r}')
+            missing = [key for key in TARIFF_KEYS if key not in entry]
+            if missing:
+                raise ValueError(f'{where}: бракує тарифів {", ".join(missing)}')
+            values = {key: _decimal(entry[key], f'{where}.{key}') for key in TARIFF_KEYS}
+            entries.append((valid_from, valid_to, where, TariffPreset(provider_id, title, valid_from, values)))
+        entries.sort(key=lambda item: item[0])
+
+        for position, (valid_from, valid_to, where, preset) in enumerate(entries):
+            following = entries[position + 1][0] if position + 1 < len(entries) else None
+            if valid_to is None and following is None:
+                self._open_ended[provider_id] = preset
+                continue
+            end = min(key for key in (valid_to and _next_month(valid_to), following) if key is not None)
+            if _months(end) - _months(valid_from) > MAX_SPAN_MONTHS:
+                raise ValueError(
+                    f'{where}: запис діє довше за {MAX_SPAN_MONTHS // 12} років — перевірте "to" і початок '
+                    'наступного запису; безстроковим буває лише останній запис без "to"',
+                )
+            period = valid_from
+            while period < end:
+                self._index[(provider_id, period[0], period[1])] = preset
+                period = _next_month(period)
+
+
+class TariffRegistry:
+    """Тримає актуальну ``TariffTable`` і перечитує файл, коли змінюється його mtime."""
+
+    def __init__(self, path: str | Path, reload_interval: float = 30.0) -> None:
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self._table = TariffTable()
+        self._mtime: Optional[int] = None
+        # mtime файлу, який не вдалося розібрати: повторно його не читаємо, доки файл не зміниться.
+        self._rejected_mtime: Optional[int] = None
+        self._watcher: Optional[asyncio.Task[None]] = None
+
+    @property
+    def table(self) -> TariffTable:
+        return self._table
+
+    def presets_for(self, period: Dict[str, int]) -> List[TariffPreset]:
+        return self._table.presets_for(period['month'], period['year'])
+
+    def find(self, title: str, period: Dict[str, int]) -> Optional[TariffPreset]:
+        return self._table.find(title, period['month'], period['year'])
+
+    async def reload(self) -> bool:
+        """Перечитує файл у потоці, якщо він змінився; повертає ``True``, коли таблицю замінено."""
+        loaded = await asyncio.to_thread(self._load_if_changed, self._mtime)
+        if loaded is None:
+            return False
+        self._mtime, self._table = loaded
+        logger.info('Довідник тарифів оновлено: %s постачальників', len(self._table))
+        return True
+
+    async def start(self) -> None:
+        await self.reload()
+        if self.reload_interval > 0:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception('Не вдалося перечитати довідник тарифів %s', self.path)
+
+    def _load_if_changed(self, known_mtime: Optional[int]) -> Optional[Tuple[Optional[int], TariffTable]]:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            # Файл прибрали — пресети зникають, ручне введення працює як раніше.
+            return (None, TariffTable()) if known_mtime is not None else None
+        if mtime in (known_mtime, self._rejected_mtime):
+            return None
+        try:
+            table = TariffTable.from_json(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError, TypeError, AttributeError) as exc:
+            # Зіпсований файл не повинен прибрати робочу таблицю: лишаємо попередню версію.
+            logger.error('Довідник тарифів %s не завантажено: %s', self.path, exc)
+            self._rejected_mtime = mtime
+            return None
+        return mtime, table
+
+
+__all__ = ['TARIFF_KEYS', 'TariffPreset', 'TariffRegistry', 'TariffTable']
@@ -0,0 +1,114 @@
+"""Захист від флуду: ліміт повідомлень на користувача й на чат у ковзному вікні.
+
+Ковзне вікно оцінюється за двома фіксованими: ``поточне + попереднє × частка попереднього вікна,
+що ще потрапляє в ковзне``. На ключ зберігається одне ціле в словнику поточного вікна; при зміні вікна
+словники просто зсуваються, тож пам'ять займають лише ключі, активні в останніх двох вікнах, і
+не більше ``max_keys`` на вікно. Перше перевищення у вікні отримує одну відповідь «пригальмуйте»,
+решта відкидається мовчки й до обробників (читання FSM, відповідь) не доходить.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message, TelegramObject
+
+from bot import metrics
+
+
+ALLOW = 0
+WARN = 1
+DROP = 2
+
+USER_SCOPE = 'user'
+CHAT_SCOPE = 'chat'
+
+THROTTLED_TEXT = '🐢 Забагато повідомлень поспіль. Зачекайте, будь ласка, кілька секунд і продовжуйте.'
+
+
+class SlidingWindowCounter:
+    """Лічильник подій на ключ з лімітом ``limit`` за ``window`` секунд."""
+
+    __slots__ = ('limit', 'window', 'max_keys', '_clock', '_index', '_current', '_previous', '_warned')
+
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if limit < 1 or window <= 0:
+            raise ValueError('Ліміт і вікно мають бути додатними')
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._clock = clock
+        self._index = int(clock() / window)
+        self._current: Dict[int, int] = {}
+        self._previous: Dict[int, int] = {}
+        self._warned: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._current) + len(self._previous)
+
+    def hit(self, key: int) -> int:
+        """Рахує подію; повертає ``ALLOW``, ``WARN`` (перша відмова у вікні) або ``DROP``."""
+        position = self._clock() / self.window
+        index = int(position)
+        if index != self._index:
+            self._rotate(index)
+        current = self._current
+        count = current.get(key, 0)
+        previous = self._previous.get(key)
+        estimate = count + previous * (1.0 - (position - index)) if previous else count
+        if estimate >= self.limit:
+            if key in self._warned:
+                return DROP
+            self._warned.add(key)
+            return WARN
+        # Під час потоку нових ключів понад ліміт пам'яті нові ключі не обліковуються, а не витісняють старі.
+        if count or len(current) < self.max_keys:
+            current[key] = count + 1
+        return ALLOW
+
+    def _rotate(self, index: int) -> None:
+        self._previous = self._current if index == self._index + 1 else {}
+        self._current = {}
+        self._warned = set()
+        self._index = index
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Зовнішня middleware повідомлень: ліміти окремо на користувача і на чат; ``None`` вимикає ліміт."""
+
+    def __init__(self, per_user: Optional[SlidingWindowCounter], per_chat: Optional[SlidingWindowCounter]) -> None:
+        self.per_user = per_user
+        self.per_chat = per_chat
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        verdict = ALLOW
+        scope = USER_SCOPE
+        user = getattr(event, 'from_user', None)
+        if self.per_user is not None and user is not None:
+            verdict = self.per_user.hit(user.id)
+        if verdict == ALLOW and self.per_chat is not None:
+            chat = getattr(event, 'chat', None)
+            if chat is not None:
+                scope = CHAT_SCOPE
+                verdict = self.per_chat.hit(chat.id)
+        if verdict == ALLOW:
+            return await handler(event, data)
+        metrics.THROTTLED_UPDATES.inc(scope)
+        if verdict == WARN:
+            await event.answer(THROTTLED_TEXT)
+        return None
+
+
+__all__ = ['SlidingWindowCounter', 'ThrottlingMiddleware', 'THROTTLED_TEXT', 'ALLOW', 'WARN', 'DROP']
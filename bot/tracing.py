@@ -0,0 +1,248 @@
+"""Трасування оновлень: кореневий span на оновлення і вкладені span навколо етапів обробки.
+
+``TracingMiddleware`` відкриває кореневий span для частки оновлень ``sample_rate`` (рішення
+приймається один раз на початку, head sampling). Усередині обробників ``span('назва')`` створює
+дочірній span, а ``TracingRequestMiddleware`` обгортає кожен виклик Bot API. Поточний span живе в
+``ContextVar``, тож батьківство працює і через ``await``. Якщо кореневого span немає (трасування
+вимкнене або оновлення не потрапило у вибірку), ``span`` повертає спільну заглушку: одне читання
+``ContextVar`` і жодних алокацій.
+
+Завершені трасування складаються в буфер, а фонова задача ``Tracer`` раз на ``flush_interval`` дописує
+їх пачкою у JSON Lines-файл (рядок на span) в окремому потоці.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject, Update
+
+from bot import metrics
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+logger = logging.getLogger(__name__)
+
+TRACE_BUFFER_LIMIT = 10_000
+TRACE_BATCH_SIZE = 512
+
+_current: ContextVar[Optional[Span]] = ContextVar('trace_span', default=None)
+
+
+class Span:
+    """Один етап трасування; записи всіх span одного трасування збираються у спільний список."""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'records', 'attributes', 'error', '_wall', '_started', '_token')
+
+    def __init__(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> None:
+        self.name = name
+        self.span_id = random.getrandbits(64)
+        if parent is None:
+            self.trace_id = random.getrandbits(128)
+            self.parent_id: Optional[int] = None
+            self.records: List[Dict[str, Any]] = []
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.records = parent.records
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._token: Optional[Token[Optional[Span]]] = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> Span:
+        self._wall = time.time()
+        self._started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        duration = time.perf_counter() - self._started
+        if self._token is not None:
+            _current.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        # Форматування ідентифікаторів і JSON — уже в потоці експорту.
+        self.records.append({
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self._wall,
+            'duration_ms': duration * 1000,
+            'attributes': self.attributes,
+            'error': self.error,
+        })
+
+
+class _NoopSpan:
+    """Заглушка, коли поточне оновлення не трасується."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes: Any) -> Union[Span, _NoopSpan]:
+    """Дочірній span поточного трасування або заглушка, якщо трасування немає."""
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent, **attributes)
+
+
+def current_span() -> Union[Span, _NoopSpan]:
+    return _current.get() or NOOP_SPAN
+
+
+class Tracer:
+    """Приймає завершені трасування і пачками дописує їх у ``path`` з фонової задачі."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        sample_rate: float,
+        flush_interval: float = 1.0,
+        buffer_limit: int = TRACE_BUFFER_LIMIT,
+        batch_size: int = TRACE_BATCH_SIZE,
+    ) -> None:
+        if not 0 < sample_rate <= 1:
+            raise ValueError('Частка трасувань має бути в межах (0, 1]')
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # Трасування, що не встигли записатися, відкидаються найстаріші, а не накопичуються без меж.
+        self._buffer: Deque[List[Dict[str, Any]]] = deque(maxlen=buffer_limit)
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def submit(self, records: List[Dict[str, Any]]) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            metrics.TRACES_DROPPED.inc()
+        self._buffer.append(records)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._export_forever())
+
+    async def flush(self) -> int:
+        """Записує все з буфера; повертає кількість записаних span."""
+        written = 0
+        while self._buffer:
+            batch: List[Dict[str, Any]] = []
+            while self._buffer and len(batch) < self.batch_size:
+                batch.extend(self._buffer.popleft())
+            await asyncio.to_thread(_append_lines, self.path, batch)
+            metrics.TRACE_SPANS_EXPORTED.inc(amount=len(batch))
+            written += len(batch)
+        return written
+
+    async def close(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    async def _export_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError:
+                logger.exception('Не вдалося записати трасування у %s', self.path)
+
+
+def _append_lines(path: Path, records: List[Dict[str, Any]]) -> None:
+    import json
+
+    lines = []
+    for record in records:
+        record['trace_id'] = f"{record['trace_id']:032x}"
+        record['span_id'] = f"{record['span_id']:016x}"
+        if record['parent_id'] is not None:
+            record['parent_id'] = f"{record['parent_id']:016x}"
+        record['duration_ms'] = round(record['duration_ms'], 3)
+        lines.append(json.dumps(record, ensure_ascii=False, default=str))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('a', encoding='utf-8') as output:
+        output.write('\n'.join(lines) + '\n')
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Зовнішня middleware оновлень: кореневий span для оновлень, що потрапили у вибірку."""
+
+    def __init__(self, tracer: Tracer) -> None:
+        self.tracer = tracer
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not self.tracer.sampled():
+            return await handler(event, data)
+        root = Span('update', update_id=event.update_id, event_type=event.event_type)
+        try:
+            with root:
+                return await handler(event, data)
+        finally:
+            self.tracer.submit(root.records)
+
+
+class TracingRequestMiddleware(BaseRequestMiddleware):
+    """Span навколо кожного виклику Bot API, включно з очікуванням у черзі планувальника."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: 'Bot',
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        parent = _current.get()
+        if parent is None:
+            return await make_request(bot, method)
+        with Span(f'api.{method.__api_method__}', parent):
+            return await make_request(bot, method)
+
+
+__all__ = [
+    'NOOP_SPAN',
+    'Span',
+    'Tracer',
+    'TracingMiddleware',
+    'TracingRequestMiddleware',
+    'current_span',
+    'span',
+]
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
-from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
+from typing import Iterable, Tuple
 
-from bot.dialogue.constants import BACK_BUTTON_TEXT
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
+
+from bot.dialogue.constants import (
+    BACK_BUTTON_TEXT,
+    CONFIRM_PROFILE_TEXT,
+    PANEL_BACK,
+    PANEL_CONFIRM,
+    PANEL_PRESET_PREFIX,
+    PANEL_RESET,
+    RESET_PROFILE_TEXT,
+    TARIFF_PRESET_PREFIX,
+)
 
 
 def back_keyboard() -> ReplyKeyboardMarkup:
@@ -10,4 +21,52 @@ def back_keyboard() -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
 
-__all__ = ['back_keyboard']
+def tariff_keyboard(titles: Iterable[str]) -> ReplyKeyboardMarkup:
+    keyboard = [[KeyboardButton(text=TARIFF_PRESET_PREFIX + title)] for title in titles]
+    keyboard.append([KeyboardButton(text=BACK_BUTTON_TEXT)])
+    return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
+
+
+def confirm_profile_keyboard() -> ReplyKeyboardMarkup:
+    keyboard = [[KeyboardButton(text=CONFIRM_PROFILE_TEXT)], [KeyboardButton(text=RESET_PROFILE_TEXT)]]
+    return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True, one_time_keyboard=True)
+
+
+def panel_back_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text=BACK_BUTTON_TEXT, callback_data=PANEL_BACK)]])
+
+
+def panel_tariff_keyboard(presets: Iterable[Tuple[str, str]]) -> InlineKeyboardMarkup:
+    """Набори тарифів ``(назва, відбиток)`` за номером у списку періоду.
+
+    Назва може не вміститися в 64 байти ``callback_data``, а відбиток не дає старій кнопці застосувати інший
+    набір, якщо список змінився після перечитування довідника.
+    """
+    keyboard = [
+        [
+            InlineKeyboardButton(
+                text=TARIFF_PRESET_PREFIX + title, callback_data=f'{PANEL_PRESET_PREFIX}{index}:{fingerprint}',
+            ),
+        ]
+        for index, (title, fingerprint) in enumerate(presets)
+    ]
+    keyboard.append([InlineKeyboardButton(text=BACK_BUTTON_TEXT, callback_data=PANEL_BACK)])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def panel_confirm_profile_keyboard() -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(text=CONFIRM_PROFILE_TEXT, callback_data=PANEL_CONFIRM)],
+        [InlineKeyboardButton(text=RESET_PROFILE_TEXT, callback_data=PANEL_RESET)],
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+__all__ = [
+    'back_keyboard',
+    'confirm_profile_keyboard',
+    'panel_back_keyboard',
+    'panel_confirm_profile_keyboard',
+    'panel_tariff_keyboard',
+    'tariff_keyboard',
+]
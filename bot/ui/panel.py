@@ -0,0 +1,137 @@
+"""Панель діалогу: одне повідомлення бота на сесію, яке редагується замість нових відповідей.
+
+``PanelEditor`` відкладає правку на ``delay`` секунд. Правки того самого повідомлення, що прийшли за
+цей час, об'єднуються, і ``editMessageText`` надсилається один раз, з останнім текстом. Якщо текст і
+кнопки не змінилися, Telegram відповідає «message is not modified», і це не вважається помилкою.
+Якщо панель видалено або вона застаріла для редагування, той самий вміст надсилається новим повідомленням,
+а ``on_resent`` отримує його ``message_id``, щоб наступні правки йшли вже в нову панель.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup
+
+from bot import metrics
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EDIT_DELAY = 0.3
+
+PanelKey = Tuple[int, int]
+# Викликається з ``message_id`` повідомлення, надісланого замість панелі, яку не вдалося відредагувати.
+ResentCallback = Callable[[int], Awaitable[None]]
+
+
+class _PendingEdit:
+    __slots__ = ('bot', 'text', 'markup', 'on_resent', 'task')
+
+    def __init__(
+        self, bot: Bot, text: str, markup: Optional[InlineKeyboardMarkup], on_resent: Optional[ResentCallback],
+    ) -> None:
+        self.bot = bot
+        self.text = text
+        self.markup = markup
+        self.on_resent = on_resent
+        self.task: Optional[asyncio.Task[None]] = None
+
+
+class PanelEditor:
+    """Відкладені й об'єднані правки повідомлень-панелей, ключ — (чат, ``message_id``)."""
+
+    def __init__(self, delay: float = DEFAULT_EDIT_DELAY) -> None:
+        self.delay = delay
+        self._pending: Dict[PanelKey, _PendingEdit] = {}
+        self._flushing: Set[asyncio.Task[None]] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def schedule(
+        self,
+        bot: Bot,
+        chat_id: int,
+        message_id: int,
+        text: str,
+        markup: Optional[InlineKeyboardMarkup] = None,
+        on_resent: Optional[ResentCallback] = None,
+    ) -> None:
+        """Ставить правку в чергу; якщо для панелі вже є відкладена, лише замінює її вміст."""
+        key = (chat_id, message_id)
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.bot, pending.text, pending.markup, pending.on_resent = bot, text, markup, on_resent
+            metrics.PANEL_EDITS.inc('coalesced')
+            return
+        pending = self._pending[key] = _PendingEdit(bot, text, markup, on_resent)
+        task = pending.task = asyncio.create_task(self._flush_later(key))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def edit_now(
+        self, bot: Bot, chat_id: int, message_id: int, text: str, markup: Optional[InlineKeyboardMarkup] = None,
+    ) -> Optional[int]:
+        """Негайна правка, що замінює відкладену: після неї можна надсилати наступні повідомлення.
+
+        Повертає ``message_id`` нового повідомлення, якщо панель довелося надіслати заново.
+        """
+        pending = self._pending.pop((chat_id, message_id), None)
+        if pending is not None and pending.task is not None:
+            pending.task.cancel()
+            metrics.PANEL_EDITS.inc('coalesced')
+        return await self._send(bot, chat_id, message_id, text, markup)
+
+    async def close(self) -> None:
+        """Надсилає всі відкладені правки, не чекаючи вікна, і дочікується тих, що вже надсилаються."""
+        for key in list(self._pending):
+            pending = self._pending.pop(key)
+            if pending.task is not None:
+                pending.task.cancel()
+            await self._deliver(key, pending)
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    async def _flush_later(self, key: PanelKey) -> None:
+        await asyncio.sleep(self.delay)
+        try:
+            await self._flush(key)
+        except Exception:
+            # Фонова задача: помилку нікому повернути, тож лише логуємо.
+            logger.exception('Не вдалося оновити панель %s у чаті %s', key[1], key[0])
+
+    async def _flush(self, key: PanelKey) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            await self._deliver(key, pending)
+
+    async def _deliver(self, key: PanelKey, pending: _PendingEdit) -> None:
+        resent_id = await self._send(pending.bot, key[0], key[1], pending.text, pending.markup)
+        if resent_id is not None and pending.on_resent is not None:
+            await pending.on_resent(resent_id)
+
+    async def _send(
+        self, bot: Bot, chat_id: int, message_id: int, text: str, markup: Optional[InlineKeyboardMarkup],
+    ) -> Optional[int]:
+        try:
+            await bot.edit_message_text(text, chat_id=chat_id, message_id=message_id, reply_markup=markup)
+        except TelegramBadRequest as exc:
+            if 'message is not modified' in exc.message:
+                metrics.PANEL_EDITS.inc('unchanged')
+                return None
+            logger.warning('Панель %s у чаті %s не редагується (%s), надсилаю новою', message_id, chat_id, exc.message)
+            metrics.PANEL_EDITS.inc('resent')
+            message = await bot.send_message(chat_id, text, reply_markup=markup)
+            return message.message_id
+        metrics.PANEL_EDITS.inc('edited')
+        return None
+
+
+__all__ = ['DEFAULT_EDIT_DELAY', 'PanelEditor', 'ResentCallback']
@@ -0,0 +1,86 @@
+"""Режим webhook: вбудований aiohttp-сервер замість long polling."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from bot.config import Settings
+from bot.metrics.server import add_metrics_route
+
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Відповідає Telegram одразу, а оновлення обробляє у фоні з обмеженням паралельності."""
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        max_workers: int,
+        secret_token: Optional[str] = None,
+        **data: Any,
+    ) -> None:
+        super().__init__(dispatcher=dispatcher, bot=bot, handle_in_background=True, secret_token=secret_token, **data)
+        self._workers = asyncio.Semaphore(max_workers)
+
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        async with self._workers:
+            await super()._background_feed_update(bot, update)
+
+    async def close(self) -> None:
+        if self._background_feed_update_tasks:
+            await asyncio.gather(*self._background_feed_update_tasks, return_exceptions=True)
+        await super().close()
+
+
+def build_webhook_app(dispatcher: Dispatcher, bot: Bot, settings: Settings) -> web.Application:
+    app = web.Application()
+    handler = BoundedRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        max_workers=settings.webhook_max_workers,
+        secret_token=settings.webhook_secret,
+    )
+    handler.register(app, path=settings.webhook_path)
+    setup_application(app, dispatcher, bot=bot)
+    if settings.metrics_on_webhook_server:
+        add_metrics_route(app, settings.metrics_path)
+    return app
+
+
+async def register_webhook(dispatcher: Dispatcher, bot: Bot, settings: Settings) -> None:
+    webhook_url = settings.webhook_url.rstrip('/') + settings.webhook_path
+    await bot.set_webhook(
+        webhook_url,
+        secret_token=settings.webhook_secret,
+        allowed_updates=dispatcher.resolve_used_update_types(),
+        drop_pending_updates=False,
+    )
+    logger.info('Webhook зареєстровано: %s', webhook_url)
+
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot, settings: Settings) -> None:
+    app = build_webhook_app(dispatcher, bot, settings)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=settings.webhook_host, port=settings.webhook_port)
+    await site.start()
+    logger.info('Webhook-сервер слухає %s:%s%s', settings.webhook_host, settings.webhook_port, settings.webhook_path)
+    try:
+        if settings.webhook_url:
+            # Реєстрація — після старту сервера: при холодному старті оновлення, що вже чекають, приходять
+            # одразу, не чекаючи ще одного запиту до Bot API.
+            await register_webhook(dispatcher, bot, settings)
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+__all__ = ['BoundedRequestHandler', 'build_webhook_app', 'register_webhook', 'run_webhook']